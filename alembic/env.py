@@ -7,17 +7,29 @@ from alembic import context
 
 # Import models and database configuration
 from app.models import Base
-from app.core.config import DATABASE_URL
+from app.core.config import DATABASE_SHARDS
+from app.core.migrations import PROGRESS_TABLE
+from app.core.tenancy import parse_shards
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
-# Override sqlalchemy.url with our DATABASE_URL from config
+# Every shard carries the full schema; migrate one at a time with
+#   alembic -x shard=<name> upgrade head
+# (without DATABASE_SHARDS there is one shard, on DATABASE_URL)
+shards = parse_shards(DATABASE_SHARDS)
+shard = context.get_x_argument(as_dictionary=True).get("shard")
+if shard is None and len(shards) == 1:
+    shard = next(iter(shards))
+if shard not in shards:
+    raise SystemExit(f"Unknown shard {shard!r}; configured shards: {', '.join(sorted(shards))}")
+
+# Override sqlalchemy.url with the shard's DSN
 # Remove async driver for Alembic (use standard postgresql driver)
 config.set_main_option(
     "sqlalchemy.url",
-    DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+    shards[shard].replace("postgresql+asyncpg://", "postgresql://")
 )
 
 # Interpret the config file for Python logging.
@@ -29,6 +41,11 @@ if config.config_file_name is not None:
 # This allows Alembic to detect model changes automatically
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate/`alembic check` away from the backfill bookkeeping table."""
+    return not (type_ == "table" and name == PROGRESS_TABLE)
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -53,6 +70,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -73,8 +92,13 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # One transaction per revision: zero-downtime helpers
+        # (app.core.migrations) commit mid-migration via autocommit blocks
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,40 @@
+"""add ticket_stats_daily rollup and tickets.acknowledged_at
+
+Revision ID: 002
+Revises: 00644f5a1945
+Create Date: 2026-10-19 09:00:00.000000
+
+After upgrading, populate the rollup once with:
+    python -m app.core.stats rebuild
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, Sequence[str], None] = '00644f5a1945'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tickets', sa.Column('acknowledged_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_table('ticket_stats_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('urgency_level', sa.String(), nullable=False),
+    sa.Column('ticket_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('ack_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('ack_seconds_total', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('day', 'status', 'urgency_level')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ticket_stats_daily')
+    op.drop_column('tickets', 'acknowledged_at')
@@ -0,0 +1,76 @@
+"""encrypt ticket PII and add blind index columns
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 11:00:00.000000
+
+Encrypts existing client_name/client_email/client_phone values in place
+(AES-GCM) and fills the HMAC blind index columns. Uses PII_DATA_KEY and
+PII_BLIND_INDEX_KEY from the environment - they must match the app's keys.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.crypto import blind_index, get_field_cipher
+from app.core.migrations import add_column, backfill, create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, Sequence[str], None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PII_FIELDS = ('client_name', 'client_email', 'client_phone')
+
+tickets = sa.table(
+    'tickets',
+    sa.column('id', sa.Integer),
+    *(sa.column(field, sa.String) for field in PII_FIELDS),
+    *(sa.column(f'{field}_bidx', sa.String) for field in PII_FIELDS),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for field in PII_FIELDS:
+        add_column('tickets', sa.Column(f'{field}_bidx', sa.String(length=64), nullable=True))
+
+    cipher = get_field_cipher()
+
+    def encrypt(row):
+        values = {}
+        for field in PII_FIELDS:
+            context = f'tickets.{field}'.encode()
+            value = getattr(row, field)
+            # Already-encrypted rows (a resumed run) keep their ciphertext
+            plaintext = cipher.decrypt(value, context, allow_plaintext=True)
+            values[field] = value if value != plaintext else cipher.encrypt(value, context)
+            values[f'{field}_bidx'] = blind_index(plaintext)
+        return values
+
+    backfill('004_encrypt_ticket_pii', tickets, transform=encrypt, columns=PII_FIELDS, batch_size=500)
+
+    for field in PII_FIELDS:
+        create_index_concurrently(op.f(f'ix_tickets_{field}_bidx'), 'tickets', [f'{field}_bidx'])
+        drop_index_concurrently(op.f(f'ix_tickets_{field}'), 'tickets')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    cipher = get_field_cipher()
+
+    def decrypt(row):
+        return {
+            field: cipher.decrypt(getattr(row, field), f'tickets.{field}'.encode(), allow_plaintext=True)
+            for field in PII_FIELDS
+        }
+
+    backfill('004_decrypt_ticket_pii', tickets, transform=decrypt, columns=PII_FIELDS, batch_size=500)
+
+    for field in PII_FIELDS:
+        create_index_concurrently(op.f(f'ix_tickets_{field}'), 'tickets', [field])
+        drop_index_concurrently(op.f(f'ix_tickets_{field}_bidx'), 'tickets')
+        op.drop_column('tickets', f'{field}_bidx')
@@ -0,0 +1,67 @@
+"""normalize client email/phone blind indexes for history lookups
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 12:00:00.000000
+
+Recomputes client_email_bidx (lowercased) and client_phone_bidx (E.164) for
+existing tickets in primary-key batches, and replaces the single-column
+blind index indexes with (blind index, created_at) composites.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.crypto import blind_index, get_field_cipher, normalize_for_index
+from app.core.migrations import backfill, create_index_concurrently, drop_index_concurrently
+from app.core.normalize import normalize_email, normalize_phone_for_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, Sequence[str], None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+tickets = sa.table(
+    'tickets',
+    sa.column('id', sa.Integer),
+    sa.column('client_email', sa.String),
+    sa.column('client_phone', sa.String),
+    sa.column('client_email_bidx', sa.String),
+    sa.column('client_phone_bidx', sa.String),
+)
+
+
+def _backfill_blind_indexes(name, email_normalizer, phone_normalizer) -> None:
+    """Recompute email/phone blind indexes in resumable primary-key batches."""
+    cipher = get_field_cipher()
+
+    def reindex(row):
+        email = cipher.decrypt(row.client_email, b'tickets.client_email')
+        phone = cipher.decrypt(row.client_phone, b'tickets.client_phone')
+        return {
+            'client_email_bidx': blind_index(email, email_normalizer),
+            'client_phone_bidx': blind_index(phone, phone_normalizer),
+        }
+
+    backfill(name, tickets, transform=reindex, columns=('client_email', 'client_phone'), batch_size=500)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _backfill_blind_indexes('005_normalize_client_bidx', normalize_email, normalize_phone_for_index)
+    create_index_concurrently('ix_tickets_client_email_bidx_created_at', 'tickets', ['client_email_bidx', 'created_at'])
+    create_index_concurrently('ix_tickets_client_phone_bidx_created_at', 'tickets', ['client_phone_bidx', 'created_at'])
+    drop_index_concurrently(op.f('ix_tickets_client_email_bidx'), 'tickets')
+    drop_index_concurrently(op.f('ix_tickets_client_phone_bidx'), 'tickets')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    create_index_concurrently(op.f('ix_tickets_client_phone_bidx'), 'tickets', ['client_phone_bidx'])
+    create_index_concurrently(op.f('ix_tickets_client_email_bidx'), 'tickets', ['client_email_bidx'])
+    drop_index_concurrently('ix_tickets_client_phone_bidx_created_at', 'tickets')
+    drop_index_concurrently('ix_tickets_client_email_bidx_created_at', 'tickets')
+    _backfill_blind_indexes('005_denormalize_client_bidx', normalize_for_index, normalize_for_index)
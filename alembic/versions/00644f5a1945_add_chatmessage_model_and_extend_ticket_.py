@@ -10,6 +10,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from app.core.migrations import add_column, backfill, create_index_concurrently, set_not_null
+
 
 # revision identifiers, used by Alembic.
 revision: str = '00644f5a1945'
@@ -30,12 +32,37 @@ def upgrade() -> None:
     sa.PrimaryKeyConstraint('id')
     )
     op.create_index(op.f('ix_chat_messages_id'), 'chat_messages', ['id'], unique=False)
-    op.add_column('tickets', sa.Column('client_fingerprint', sa.String(), nullable=True))
-    op.add_column('tickets', sa.Column('priority_score', sa.Integer(), nullable=False))
-    op.add_column('tickets', sa.Column('is_deleted', sa.Boolean(), nullable=False))
-    op.create_index(op.f('ix_tickets_client_fingerprint'), 'tickets', ['client_fingerprint'], unique=False)
     # ### end Alembic commands ###
 
+    # tickets is live and large: expand / backfill / contract instead of
+    # adding NOT NULL columns (fails on existing rows) and a blocking CREATE INDEX.
+    # Expand - nullable columns with constant defaults are metadata-only
+    add_column('tickets', sa.Column('client_fingerprint', sa.String(), nullable=True))
+    add_column('tickets', sa.Column('priority_score', sa.Integer(), server_default='0', nullable=True))
+    add_column('tickets', sa.Column('is_deleted', sa.Boolean(), server_default=sa.false(), nullable=True))
+
+    # Backfill - only rows still NULL (e.g. written before the default existed)
+    tickets = sa.table(
+        'tickets',
+        sa.column('id', sa.Integer),
+        sa.column('priority_score', sa.Integer),
+        sa.column('is_deleted', sa.Boolean),
+    )
+    backfill(
+        '00644f5a1945_tickets_defaults',
+        tickets,
+        values={
+            'priority_score': sa.func.coalesce(tickets.c.priority_score, 0),
+            'is_deleted': sa.func.coalesce(tickets.c.is_deleted, sa.false()),
+        },
+        where=sa.or_(tickets.c.priority_score.is_(None), tickets.c.is_deleted.is_(None)),
+    )
+
+    # Contract
+    set_not_null('tickets', 'priority_score')
+    set_not_null('tickets', 'is_deleted')
+    create_index_concurrently(op.f('ix_tickets_client_fingerprint'), 'tickets', ['client_fingerprint'])
+
 
 def downgrade() -> None:
     """Downgrade schema."""
@@ -0,0 +1,45 @@
+"""add near-duplicate link and spam flag to tickets
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import (
+    add_column,
+    create_foreign_key,
+    create_index_concurrently,
+    drop_index_concurrently,
+    set_not_null,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, Sequence[str], None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    add_column('tickets', sa.Column('duplicate_of_id', sa.Integer(), nullable=True))
+    # Constant default: existing rows read as false without a rewrite or backfill
+    add_column('tickets', sa.Column('is_spam', sa.Boolean(), server_default=sa.text('false'), nullable=True))
+    set_not_null('tickets', 'is_spam')
+    create_foreign_key('fk_tickets_duplicate_of_id', 'tickets', 'tickets', ['duplicate_of_id'], ['id'])
+    create_index_concurrently(op.f('ix_tickets_duplicate_of_id'), 'tickets', ['duplicate_of_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently(op.f('ix_tickets_duplicate_of_id'), 'tickets')
+    with op.batch_alter_table('tickets') as batch:
+        batch.drop_constraint('fk_tickets_duplicate_of_id', type_='foreignkey')
+        batch.drop_column('is_spam')
+        batch.drop_column('duplicate_of_id')
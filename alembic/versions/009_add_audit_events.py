@@ -0,0 +1,41 @@
+"""add monthly range-partitioned audit_events table
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, Sequence[str], None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partitioned parent only; monthly partitions (audit_events_YYYY_MM) are
+    # created on demand by the audit flusher. Old months can be detached or
+    # dropped without touching live data.
+    op.create_table('audit_events',
+    sa.Column('ts', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(length=32), nullable=False),
+    sa.Column('ticket_id', sa.Integer(), nullable=True),
+    postgresql_partition_by='RANGE (ts)'
+    )
+    op.create_index('ix_audit_events_user_id_ts', 'audit_events', ['user_id', 'ts'], unique=False)
+    op.create_index('ix_audit_events_ticket_id_ts', 'audit_events', ['ticket_id', 'ts'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_audit_events_ticket_id_ts', table_name='audit_events')
+    op.drop_index('ix_audit_events_user_id_ts', table_name='audit_events')
+    op.drop_table('audit_events')
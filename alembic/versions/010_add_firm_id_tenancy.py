@@ -0,0 +1,177 @@
+"""add firm_id to every table and lead every index with it (multi-tenancy)
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import DEFAULT_FIRM_ID
+from app.core.migrations import (
+    add_column,
+    create_index_concurrently,
+    drop_index_concurrently,
+    run_ddl,
+    set_not_null,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, Sequence[str], None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = (
+    'users',
+    'tickets',
+    'chat_messages',
+    'ticket_stats_daily',
+    'attachments',
+    'webhook_subscriptions',
+    'webhook_deliveries',
+    'audit_events',
+)
+
+# (new index, old index it replaces or None, table, columns)
+INDEXES = (
+    ('ix_tickets_firm_id_created_at', None, 'tickets', ['firm_id', 'created_at']),
+    ('ix_tickets_firm_id_client_email_bidx_created_at', 'ix_tickets_client_email_bidx_created_at',
+     'tickets', ['firm_id', 'client_email_bidx', 'created_at']),
+    ('ix_tickets_firm_id_client_phone_bidx_created_at', 'ix_tickets_client_phone_bidx_created_at',
+     'tickets', ['firm_id', 'client_phone_bidx', 'created_at']),
+    ('ix_tickets_firm_id_client_name_bidx', 'ix_tickets_client_name_bidx', 'tickets', ['firm_id', 'client_name_bidx']),
+    ('ix_tickets_firm_id_client_fingerprint', 'ix_tickets_client_fingerprint', 'tickets', ['firm_id', 'client_fingerprint']),
+    ('ix_tickets_firm_id_duplicate_of_id', 'ix_tickets_duplicate_of_id', 'tickets', ['firm_id', 'duplicate_of_id']),
+    ('ix_attachments_firm_id_sha256', 'ix_attachments_sha256', 'attachments', ['firm_id', 'sha256']),
+    ('ix_webhook_subscriptions_firm_id_is_active', None, 'webhook_subscriptions', ['firm_id', 'is_active']),
+    ('ix_webhook_deliveries_firm_id_subscription_id_created_at', 'ix_webhook_deliveries_subscription_id_created_at',
+     'webhook_deliveries', ['firm_id', 'subscription_id', 'created_at']),
+    ('ix_webhook_deliveries_firm_id_delivery_id', 'ix_webhook_deliveries_delivery_id',
+     'webhook_deliveries', ['firm_id', 'delivery_id']),
+)
+
+# Partitioned parent: CONCURRENTLY isn't supported, but the parent holds no
+# rows, so the plain build only touches the (small, recent) partitions
+AUDIT_INDEXES = (
+    ('ix_audit_events_firm_id_user_id_ts', 'ix_audit_events_user_id_ts', ['firm_id', 'user_id', 'ts']),
+    ('ix_audit_events_firm_id_ticket_id_ts', 'ix_audit_events_ticket_id_ts', ['firm_id', 'ticket_id', 'ts']),
+)
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _add_audit_firm_id() -> None:
+    """
+    audit_events is a partitioned parent, where set_not_null()'s NOT VALID
+    check can't be relied on. Add the column NOT NULL with its constant
+    default in one statement instead: catalog-only on Postgres 11+ (no
+    rewrite, no scan), and it cascades to every partition.
+    """
+    def column() -> sa.Column:
+        return sa.Column('firm_id', sa.String(length=64), server_default=DEFAULT_FIRM_ID, nullable=False)
+
+    if _is_postgres():
+        run_ddl(
+            lambda: op.add_column('audit_events', column(), if_not_exists=True),
+            'add column audit_events.firm_id'
+        )
+        return
+    op.add_column('audit_events', column())
+
+
+def _swap_unique(table: str, old: str, new: str, columns: list, old_is_index: bool = False) -> None:
+    """Replace a unique constraint/index with a firm-leading one."""
+    if _is_postgres():
+        # Build the new unique index without blocking writes, then attach it
+        create_index_concurrently(new, table, columns, unique=True)
+        run_ddl(
+            lambda: op.execute(sa.text(f'ALTER TABLE {table} ADD CONSTRAINT {new} UNIQUE USING INDEX {new}')),
+            f'attach unique constraint {new}'
+        )
+        if old_is_index:
+            drop_index_concurrently(old, table)
+        else:
+            run_ddl(lambda: op.drop_constraint(old, table, type_='unique'), f'drop constraint {old}')
+        return
+    with op.batch_alter_table(table) as batch:
+        if old_is_index:
+            batch.drop_index(old)
+        else:
+            batch.drop_constraint(old, type_='unique')
+        batch.create_unique_constraint(new, columns)
+
+
+def _swap_stats_primary_key(columns: list) -> None:
+    if _is_postgres():
+        create_index_concurrently('ticket_stats_daily_pkey_new', 'ticket_stats_daily', columns, unique=True)
+        run_ddl(
+            lambda: op.execute(sa.text(
+                'ALTER TABLE ticket_stats_daily DROP CONSTRAINT ticket_stats_daily_pkey, '
+                'ADD CONSTRAINT ticket_stats_daily_pkey PRIMARY KEY USING INDEX ticket_stats_daily_pkey_new'
+            )),
+            'swap ticket_stats_daily primary key'
+        )
+        return
+    with op.batch_alter_table('ticket_stats_daily', recreate='always') as batch:
+        batch.create_primary_key('ticket_stats_daily_pkey', columns)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Expand: existing rows belong to the default firm (constant default -
+    # no table rewrite), then tighten to NOT NULL without a long lock
+    for table in TABLES:
+        if table == 'audit_events':
+            _add_audit_firm_id()
+            continue
+        add_column(table, sa.Column('firm_id', sa.String(length=64), server_default=DEFAULT_FIRM_ID, nullable=True))
+        set_not_null(table, 'firm_id')
+
+    for new, old, table, columns in INDEXES:
+        create_index_concurrently(new, table, columns)
+        if old is not None:
+            drop_index_concurrently(old, table)
+    for new, old, columns in AUDIT_INDEXES:
+        op.create_index(new, 'audit_events', columns, unique=False)
+        op.drop_index(old, table_name='audit_events')
+
+    # Uniqueness is now per firm
+    _swap_unique('users', 'ix_users_email', 'uq_users_firm_id_email', ['firm_id', 'email'], old_is_index=True)
+    _swap_unique('attachments', 'uq_attachments_ticket_sha256', 'uq_attachments_firm_id_ticket_id_sha256',
+                 ['firm_id', 'ticket_id', 'sha256'])
+    drop_index_concurrently('ix_attachments_ticket_id', 'attachments')   # covered by the unique constraint
+    _swap_stats_primary_key(['firm_id', 'day', 'status', 'urgency_level'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Only safe while every row still belongs to a single firm
+    with op.batch_alter_table('ticket_stats_daily', recreate='always') as batch:
+        batch.drop_constraint('ticket_stats_daily_pkey', type_='primary')
+        batch.create_primary_key('ticket_stats_daily_pkey', ['day', 'status', 'urgency_level'])
+    op.create_index(op.f('ix_attachments_ticket_id'), 'attachments', ['ticket_id'], unique=False)
+    with op.batch_alter_table('attachments') as batch:
+        batch.drop_constraint('uq_attachments_firm_id_ticket_id_sha256', type_='unique')
+        batch.create_unique_constraint('uq_attachments_ticket_sha256', ['ticket_id', 'sha256'])
+    with op.batch_alter_table('users') as batch:
+        batch.drop_constraint('uq_users_firm_id_email', type_='unique')
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+
+    for new, old, columns in AUDIT_INDEXES:
+        op.create_index(old, 'audit_events', columns[1:], unique=False)
+        op.drop_index(new, table_name='audit_events')
+    for new, old, table, columns in reversed(INDEXES):
+        if old is not None:
+            op.create_index(old, table, columns[1:], unique=False)
+        op.drop_index(new, table_name=table)
+
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column('firm_id')
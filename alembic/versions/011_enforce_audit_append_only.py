@@ -0,0 +1,48 @@
+"""make audit_events append-only (reject UPDATE and DELETE)
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, Sequence[str], None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # A row trigger on the partitioned parent is cloned onto every partition,
+    # including ones the audit flusher creates later (Postgres 13+). Retention
+    # stays possible: DETACH/DROP PARTITION don't fire row triggers.
+    op.execute(sa.text("""
+        CREATE OR REPLACE FUNCTION audit_events_append_only() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'audit_events is append-only (% rejected)', TG_OP
+                USING ERRCODE = 'insufficient_privilege';
+        END;
+        $$ LANGUAGE plpgsql
+    """))
+    op.execute(sa.text("""
+        CREATE TRIGGER audit_events_append_only
+        BEFORE UPDATE OR DELETE ON audit_events
+        FOR EACH ROW EXECUTE FUNCTION audit_events_append_only()
+    """))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(sa.text('DROP TRIGGER IF EXISTS audit_events_append_only ON audit_events'))
+    op.execute(sa.text('DROP FUNCTION IF EXISTS audit_events_append_only()'))
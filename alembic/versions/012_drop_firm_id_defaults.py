@@ -0,0 +1,59 @@
+"""drop the firm_id server defaults left by 010 (contract step)
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import DEFAULT_FIRM_ID
+from app.core.migrations import run_ddl
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, Sequence[str], None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = (
+    'users',
+    'tickets',
+    'chat_messages',
+    'ticket_stats_daily',
+    'attachments',
+    'webhook_subscriptions',
+    'webhook_deliveries',
+    'audit_events',
+)
+
+
+def _set_default(table: str, default) -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # Catalog-only change: no rewrite, just a brief ACCESS EXCLUSIVE lock
+        run_ddl(
+            lambda: op.alter_column(table, 'firm_id', server_default=default),
+            f'set {table}.firm_id default to {default!r}'
+        )
+        return
+    with op.batch_alter_table(table) as batch:
+        batch.alter_column('firm_id', server_default=default)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The default only backfilled existing rows. Once every instance runs
+    # tenant-aware code, a write without a firm must fail (NOT NULL) rather
+    # than land in the default firm. Run after the rollout of 010 finished.
+    for table in TABLES:
+        _set_default(table, None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        _set_default(table, sa.text(f"'{DEFAULT_FIRM_ID}'"))
@@ -0,0 +1,265 @@
+# Append-only access audit log: in-memory ring buffer + background bulk flusher
+import asyncio
+import datetime
+import logging
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.core.config import (
+    AUDIT_BUFFER_CAPACITY,
+    AUDIT_FLUSH_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL_SECONDS,
+    AUDIT_OVERFLOW_POLICY,
+)
+from app.core.tenancy import shard_router
+from app.models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+# Actions recorded by the routers
+TICKETS_LIST = "tickets.list"
+CLIENT_HISTORY = "clients.history"
+ATTACHMENT_DOWNLOAD = "attachments.download"
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+# Delay before retrying a failed flush (events stay buffered meanwhile)
+RETRY_SECONDS = 5
+
+# (firm_id, ts, user_id, action, ticket_id) - column order of the COPY
+Record = Tuple[str, datetime.datetime, int, str, Optional[int]]
+COLUMNS = ("firm_id", "ts", "user_id", "action", "ticket_id")
+
+
+class AuditBuffer:
+    """
+    Bounded FIFO of pending audit records.
+
+    Loss is bounded by `capacity`: once full, the overflow policy drops
+    either the oldest buffered records or the incoming ones, and every drop
+    is counted so the loss is visible rather than silent.
+    """
+
+    def __init__(self, capacity: int, overflow_policy: str = DROP_OLDEST):
+        if overflow_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown audit overflow policy: {overflow_policy!r}")
+        self.capacity = capacity
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self._records: Deque[Record] = deque()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def extend(self, records: List[Record]) -> None:
+        overflow = len(self._records) + len(records) - self.capacity
+        if overflow > 0:
+            self.dropped += overflow
+            if self.overflow_policy == DROP_NEWEST:
+                records = records[:max(0, len(records) - overflow)]
+            else:
+                drop_buffered = min(overflow, len(self._records))
+                for _ in range(drop_buffered):
+                    self._records.popleft()
+                records = records[overflow - drop_buffered:]
+        self._records.extend(records)
+
+    def take(self, limit: int) -> List[Record]:
+        count = min(limit, len(self._records))
+        return [self._records.popleft() for _ in range(count)]
+
+    def requeue(self, records: List[Record]) -> None:
+        """Put records from a failed flush back at the front (still bounded)."""
+        room = self.capacity - len(self._records)
+        if room < len(records):
+            self.dropped += len(records) - room
+            records = records[len(records) - room:] if room > 0 else []
+        self._records.extendleft(reversed(records))
+
+
+def _month_start(ts: datetime.datetime) -> datetime.date:
+    return datetime.date(ts.year, ts.month, 1)
+
+
+def _next_month(day: datetime.date) -> datetime.date:
+    return datetime.date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+class AuditLog:
+    """
+    Records access events without a database write on the request path.
+
+    - record() appends to the in-memory buffer (O(rows), no I/O)
+    - A background task flushes every flush_interval seconds, or sooner
+      once batch_size records are waiting, with one COPY (asyncpg) or one
+      multi-row INSERT per firm in the batch, on that firm's shard
+    - On Postgres each month's partition is created the first time a
+      record for that month is flushed to a shard
+    - A failed flush puts its records back and is retried; shutdown
+      flushes whatever is left. What can be lost is bounded: overflow
+      beyond the buffer capacity (counted in `dropped`) and, on a hard
+      crash, the records not yet flushed.
+    """
+
+    def __init__(
+        self,
+        session_for: Callable[[str], AsyncSession],
+        capacity: int = AUDIT_BUFFER_CAPACITY,
+        batch_size: int = AUDIT_FLUSH_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        overflow_policy: str = AUDIT_OVERFLOW_POLICY
+    ):
+        self.session_for = session_for
+        self.buffer = AuditBuffer(capacity, overflow_policy)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failed_flushes = 0
+        self._partitions: Set[Tuple[str, datetime.date]] = set()
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        firm_id: str,
+        user_id: int,
+        action: str,
+        ticket_ids: Iterable[Optional[int]] = (None,)
+    ) -> None:
+        """Queue one record per ticket, all stamped with the same time."""
+        ts = datetime.datetime.now(datetime.timezone.utc)
+        self.buffer.extend([(firm_id, ts, user_id, action, ticket_id) for ticket_id in ticket_ids])
+        if len(self.buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write everything buffered now; returns records written."""
+        written = 0
+        async with self._lock:
+            while len(self.buffer):
+                batch = self.buffer.take(self.batch_size)
+                try:
+                    await self._write(batch)
+                except Exception:
+                    self.buffer.requeue(batch)
+                    self.failed_flushes += 1
+                    raise
+                written += len(batch)
+                self.written += len(batch)
+        return written
+
+    async def _write(self, batch: List[Record]) -> None:
+        by_firm: Dict[str, List[Record]] = defaultdict(list)
+        for record in batch:
+            by_firm[record[0]].append(record)
+        # A failure part-way re-queues the whole batch; firms already written
+        # are then written again, so duplicates are possible but loss is not
+        for firm_id, records in by_firm.items():
+            await self._write_firm(firm_id, records)
+
+    async def _write_firm(self, firm_id: str, records: List[Record]) -> None:
+        async with self.session_for(firm_id) as db:
+            conn = await db.connection()
+            if conn.dialect.name == "postgresql":
+                await self._ensure_partitions(conn, firm_id, {_month_start(r[1]) for r in records})
+            if conn.dialect.driver == "asyncpg":
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    AuditEvent.__tablename__, records=records, columns=COLUMNS
+                )
+            else:
+                await conn.execute(insert(AuditEvent), [dict(zip(COLUMNS, record)) for record in records])
+            await db.commit()
+
+    async def _ensure_partitions(self, conn: AsyncConnection, firm_id: str, months: Set[datetime.date]) -> None:
+        # Tracked per firm rather than per shard: at worst one redundant
+        # CREATE ... IF NOT EXISTS per firm and month
+        for month in sorted(m for m in months if (firm_id, m) not in self._partitions):
+            name = f"{AuditEvent.__tablename__}_{month:%Y_%m}"
+            await conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {AuditEvent.__tablename__} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            ))
+            self._partitions.add((firm_id, month))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(
+                    "Audit flush failed; %d records buffered, retrying in %ds",
+                    len(self.buffer), RETRY_SECONDS
+                )
+                await asyncio.sleep(RETRY_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self.buffer),
+            "written": self.written,
+            "dropped": self.buffer.dropped,
+            "failed_flushes": self.failed_flushes,
+            "overflow_policy": self.buffer.overflow_policy,
+        }
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final audit flush failed; %d records lost", len(self.buffer))
+
+
+async def query_audit_events(
+    db: AsyncSession,
+    user_id: Optional[int] = None,
+    ticket_id: Optional[int] = None,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    limit: int = 100
+) -> List[AuditEvent]:
+    """
+    Audit records for a lawyer and/or a ticket, newest first.
+
+    At least one of user_id / ticket_id is required so the query is served
+    by the (firm_id, user_id, ts) or (firm_id, ticket_id, ts) index (the
+    firm filter comes from the tenant-scoped session); a ts range additionally
+    prunes the monthly partitions that are scanned.
+    """
+    if user_id is None and ticket_id is None:
+        raise ValueError("query_audit_events() needs user_id or ticket_id")
+    stmt = select(AuditEvent)
+    if user_id is not None:
+        stmt = stmt.where(AuditEvent.user_id == user_id)
+    if ticket_id is not None:
+        stmt = stmt.where(AuditEvent.ticket_id == ticket_id)
+    if start is not None:
+        stmt = stmt.where(AuditEvent.ts >= start)
+    if end is not None:
+        stmt = stmt.where(AuditEvent.ts < end)
+    result = await db.execute(stmt.order_by(AuditEvent.ts.desc()).limit(limit))
+    return list(result.scalars())
+
+
+_audit_log: Optional[AuditLog] = None
+
+def get_audit_log() -> AuditLog:
+    """Process-wide audit log built from config on first use."""
+    global _audit_log
+    if _audit_log is None:
+        _audit_log = AuditLog(shard_router.session)
+    return _audit_log
@@ -0,0 +1,176 @@
+# Content-addressed blob storage for ticket attachments
+import hashlib
+import os
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import BLOB_STORE_PATH
+
+
+class BlobWriter(ABC):
+    """
+    Write handle for a single in-flight upload.
+
+    Chunks are appended with write(); the SHA-256 and byte count are tracked
+    incrementally so nothing is ever buffered whole in memory.
+    """
+
+    def __init__(self):
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    async def write(self, chunk: bytes) -> None:
+        self._sha256.update(chunk)
+        self.size += len(chunk)
+        await self._write(chunk)
+
+    @abstractmethod
+    async def _write(self, chunk: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def commit(self) -> str:
+        """Finalize the upload under its content hash; returns the hash."""
+
+    @abstractmethod
+    async def abort(self) -> None:
+        """Discard everything written so far."""
+
+
+class BlobStore(ABC):
+    """
+    Pluggable content-addressed store. Blobs are keyed by SHA-256 so identical
+    uploads are stored once no matter how many attachments reference them.
+    """
+
+    @abstractmethod
+    def open_writer(self) -> BlobWriter:
+        ...
+
+    @abstractmethod
+    async def exists(self, sha256: str) -> bool:
+        ...
+
+    @abstractmethod
+    def local_path(self, sha256: str) -> Optional[Path]:
+        """
+        Filesystem path for zero-copy serving, or None if the backend is not
+        file-based (callers then fall back to iter_chunks()).
+        """
+
+    @abstractmethod
+    def iter_chunks(
+        self,
+        sha256: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Yield bytes [start, end) of a blob (end=None: to the end) in chunks of at most chunk_size."""
+
+
+class LocalBlobWriter(BlobWriter):
+    """Writes to a temp file inside the store, then renames atomically."""
+
+    def __init__(self, store: "LocalBlobStore"):
+        super().__init__()
+        self._store = store
+        self._tmp_path = store.root / "tmp" / uuid.uuid4().hex
+        self._file = None
+
+    async def _write(self, chunk: bytes) -> None:
+        if self._file is None:
+            self._file = await run_in_threadpool(open, self._tmp_path, "wb")
+        await run_in_threadpool(self._file.write, chunk)
+
+    def _finalize(self, target: Path) -> None:
+        if self._file is None:
+            self._file = open(self._tmp_path, "wb")
+        self._file.close()
+        if target.exists():
+            # Deduplicated: identical content is already stored
+            os.unlink(self._tmp_path)
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self._tmp_path, target)
+
+    async def commit(self) -> str:
+        digest = self.sha256
+        await run_in_threadpool(self._finalize, self._store.path_for(digest))
+        return digest
+
+    def _discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        try:
+            os.unlink(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+    async def abort(self) -> None:
+        await run_in_threadpool(self._discard)
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Local filesystem backend (default).
+
+    Layout: <root>/ab/cd/<sha256>, fanned out to keep directories small.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        (self.root / "tmp").mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def open_writer(self) -> BlobWriter:
+        return LocalBlobWriter(self)
+
+    async def exists(self, sha256: str) -> bool:
+        return await run_in_threadpool(self.path_for(sha256).exists)
+
+    def local_path(self, sha256: str) -> Optional[Path]:
+        return self.path_for(sha256)
+
+    async def iter_chunks(
+        self,
+        sha256: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[bytes]:
+        file = await run_in_threadpool(open, self.path_for(sha256), "rb")
+        try:
+            await run_in_threadpool(file.seek, start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await run_in_threadpool(file.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await run_in_threadpool(file.close)
+
+
+_blob_store: Optional[BlobStore] = None
+
+def get_blob_store() -> BlobStore:
+    """
+    Dependency returning the process-wide blob store.
+    Override in app.dependency_overrides to plug in another backend.
+    """
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = LocalBlobStore(BLOB_STORE_PATH)
+    return _blob_store
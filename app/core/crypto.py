@@ -0,0 +1,151 @@
+# Field-level encryption for client PII: AES-GCM values + HMAC blind indexes
+import base64
+import hashlib
+import hmac
+import logging
+import os
+from functools import lru_cache
+from typing import Callable, Optional
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from sqlalchemy import String
+from sqlalchemy.types import TypeDecorator
+from app.core.config import (
+    ALLOW_DEV_PII_KEYS,
+    PII_ALLOW_PLAINTEXT,
+    PII_BLIND_INDEX_KEY,
+    PII_DATA_KEY,
+    SECRET_KEY,
+)
+
+logger = logging.getLogger(__name__)
+
+# Stored values look like "v1:<base64(nonce || ciphertext || tag)>"
+CIPHERTEXT_PREFIX = "v1:"
+NONCE_SIZE = 12
+
+
+def _load_key(configured: str, label: bytes) -> bytes:
+    """
+    Use the configured base64 key. Without one, refuse to start: a key derived
+    from the (often default) SECRET_KEY leaves PII effectively unencrypted.
+    ALLOW_DEV_PII_KEYS opts into that derivation for local development.
+    """
+    if configured:
+        key = base64.b64decode(configured)
+        if len(key) != 32:
+            raise ValueError("PII keys must be 32 bytes (base64-encoded)")
+        return key
+    if not ALLOW_DEV_PII_KEYS:
+        raise RuntimeError(
+            "PII_DATA_KEY and PII_BLIND_INDEX_KEY must be set "
+            "(or ALLOW_DEV_PII_KEYS=true for local development)"
+        )
+    logger.warning("Deriving PII key %r from SECRET_KEY (ALLOW_DEV_PII_KEYS); not for production", label.decode())
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=label
+    ).derive(SECRET_KEY.encode())
+
+
+class FieldCipher:
+    """
+    AES-256-GCM encryption plus deterministic HMAC-SHA256 blind indexes.
+
+    Built once per process (see get_field_cipher) so the key schedule is set
+    up a single time; each encrypt/decrypt is then one AEAD call (~µs).
+    """
+
+    def __init__(self, data_key: bytes, index_key: bytes, allow_plaintext: bool = False):
+        self._aead = AESGCM(data_key)
+        self._index_key = index_key
+        self.allow_plaintext = allow_plaintext
+
+    def encrypt(self, plaintext: str, context: bytes = b"") -> str:
+        nonce = os.urandom(NONCE_SIZE)
+        sealed = self._aead.encrypt(nonce, plaintext.encode("utf-8"), context)
+        return CIPHERTEXT_PREFIX + base64.b64encode(nonce + sealed).decode("ascii")
+
+    def decrypt(self, stored: str, context: bytes = b"", allow_plaintext: Optional[bool] = None) -> str:
+        """
+        Decrypt a stored value. Values without the ciphertext prefix (rows
+        written before migration 004) are only returned when plaintext is
+        allowed - by PII_ALLOW_PLAINTEXT or by the migration itself.
+        """
+        if not stored.startswith(CIPHERTEXT_PREFIX):
+            if not (self.allow_plaintext if allow_plaintext is None else allow_plaintext):
+                raise ValueError(f"Unencrypted value in {context.decode() or 'PII column'}")
+            if allow_plaintext is None:
+                logger.warning("Returning unencrypted value from %s", context.decode() or "PII column")
+            return stored
+        raw = base64.b64decode(stored[len(CIPHERTEXT_PREFIX):])
+        return self._aead.decrypt(raw[:NONCE_SIZE], raw[NONCE_SIZE:], context).decode("utf-8")
+
+    def blind_index(self, value: str) -> str:
+        """
+        Deterministic keyed hash for exact-match lookups.
+
+        Equal inputs give equal indexes, but the value can't be recovered
+        (or brute-forced) without the index key.
+        """
+        return hmac.new(self._index_key, value.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def get_field_cipher() -> FieldCipher:
+    """Process-wide cipher with cached data and index keys."""
+    return FieldCipher(
+        _load_key(PII_DATA_KEY, b"legal-intake pii data key"),
+        _load_key(PII_BLIND_INDEX_KEY, b"legal-intake pii blind index key"),
+        allow_plaintext=PII_ALLOW_PLAINTEXT
+    )
+
+
+def normalize_for_index(value: str) -> str:
+    """Canonical form used before blind-indexing (trimmed, case-folded)."""
+    return value.strip().casefold()
+
+
+def blind_index(
+    value: Optional[str],
+    normalize: Callable[[str], str] = normalize_for_index
+) -> Optional[str]:
+    """Blind index of the normalized value (None passes through)."""
+    if value is None:
+        return None
+    return get_field_cipher().blind_index(normalize(value))
+
+
+class EncryptedString(TypeDecorator):
+    """
+    String column stored as AES-GCM ciphertext, transparent to ORM code.
+
+    `context` is bound as associated data, so a ciphertext copied into a
+    different column fails to decrypt. Result processing hoists the cached
+    cipher once per statement, keeping per-row overhead to a single AEAD call.
+    """
+    impl = String
+    cache_ok = True
+
+    def __init__(self, context: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.context = context
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return get_field_cipher().encrypt(value, self.context.encode())
+
+    def result_processor(self, dialect, coltype) -> Callable:
+        decrypt = get_field_cipher().decrypt
+        context = self.context.encode()
+
+        def process(value: Optional[str]) -> Optional[str]:
+            if value is None:
+                return None
+            return decrypt(value, context)
+
+        return process
@@ -1,26 +1,20 @@
-# Database configuration using SQLAlchemy async engine
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+# Database configuration: declarative Base and per-request, tenant-scoped sessions
+from fastapi import Request
 from sqlalchemy.orm import declarative_base
-from app.core.config import DATABASE_URL
-
-# Create async engine for PostgreSQL with asyncpg driver
-engine = create_async_engine(DATABASE_URL, echo=True)
-
-# Session factory for creating database sessions
-AsyncSessionLocal = async_sessionmaker(
-    engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False
-)
+from app.core.tenancy import resolve_firm_id, shard_router
 
 # Base class for all SQLAlchemy models
 Base = declarative_base()
 
 # Dependency to get database session in route handlers
-async def get_db():
+async def get_db(request: Request):
     """
     Async generator that yields a database session.
     Ensures session is closed after request completes.
+
+    The session is opened on the request firm's shard (see
+    app.core.tenancy) and scoped to that firm: ORM queries only see its
+    rows and new rows are stamped with its firm_id.
     """
-    async with AsyncSessionLocal() as session:
+    async with shard_router.session(resolve_firm_id(request)) as session:
         yield session
@@ -0,0 +1,277 @@
+# Near-duplicate and spam detection over event_summary (MinHash + LSH)
+import asyncio
+import datetime
+import re
+import sys
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import (
+    DEDUPE_CAPACITY,
+    DEDUPE_SPAM_MIN_CLIENTS,
+    DEDUPE_SPAM_MIN_LENGTH,
+    DEDUPE_THRESHOLD,
+    DEDUPE_WARM_DAYS,
+)
+from app.models import Ticket
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS   # LSH threshold ~ (1/16)^(1/8) = 0.71
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(20260101)   # fixed seed: signatures must be stable across restarts
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)[:, None]
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)[:, None]
+
+_WORD_SEPARATORS = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_summary(text: str) -> str:
+    """
+    Case-fold and turn punctuation into single spaces, making trivial
+    rewording - casing, punctuation, spacing - invisible to the signature.
+    """
+    return _WORD_SEPARATORS.sub(" ", text.casefold()).strip()
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """32-bit hashes of the character k-shingles of normalized text."""
+    normalized = normalize_summary(text)
+    if len(normalized) <= SHINGLE_SIZE:
+        shingles = {normalized}
+    else:
+        shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """NUM_PERM-value MinHash signature, all permutations in one NumPy pass."""
+    hashes = shingle_hashes(text)[None, :]
+    permuted = ((_PERM_A * hashes + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimated_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+@dataclass
+class DedupeResult:
+    """What intake should do with a new submission."""
+    duplicate_of_id: Optional[int] = None
+    is_spam: bool = False
+    similarity: float = 0.0
+
+
+class MinHashLSHIndex:
+    """
+    In-process LSH index over recent ticket signatures.
+
+    Each signature is cut into BANDS bands; tickets sharing any identical
+    band become candidates and are verified by estimated Jaccard. Capacity
+    is bounded - the oldest entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEDUPE_THRESHOLD,
+        capacity: int = DEDUPE_CAPACITY,
+        spam_min_clients: int = DEDUPE_SPAM_MIN_CLIENTS,
+        spam_min_length: int = DEDUPE_SPAM_MIN_LENGTH
+    ):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.spam_min_clients = spam_min_clients
+        self.spam_min_length = spam_min_length
+        # ticket_id -> (signature, client key), insertion ordered for eviction
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, Optional[str]]]" = OrderedDict()
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray) -> List[bytes]:
+        return [band.tobytes() for band in signature.reshape(BANDS, ROWS_PER_BAND)]
+
+    def add(self, ticket_id: int, signature: np.ndarray, client_key: Optional[str] = None) -> None:
+        if ticket_id in self._entries:
+            return
+        self._entries[ticket_id] = (signature, client_key)
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(key, []).append(ticket_id)
+        while len(self._entries) > self.capacity:
+            self._evict()
+
+    def _evict(self) -> None:
+        ticket_id, (signature, _) = self._entries.popitem(last=False)
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            members = buckets.get(key)
+            if members is None:
+                continue
+            members.remove(ticket_id)
+            if not members:
+                del buckets[key]
+
+    def matches(self, signature: np.ndarray) -> List[Tuple[int, float]]:
+        """Tickets whose estimated Jaccard >= threshold, most similar first."""
+        candidates = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(key, ()))
+        scored = []
+        for ticket_id in candidates:
+            similarity = estimated_jaccard(signature, self._entries[ticket_id][0])
+            if similarity >= self.threshold:
+                scored.append((ticket_id, similarity))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored
+
+    def check(self, signature: np.ndarray, client_key: Optional[str], summary_length: Optional[int] = None) -> DedupeResult:
+        """
+        Classify a new submission against the index.
+
+        - Same client, similar text -> near-duplicate of their earliest match
+        - Similar long text from many distinct clients -> suspected templated
+          spam (summary_length is the normalized length; short, generic
+          summaries legitimately repeat across clients and are never flagged)
+        """
+        matches = self.matches(signature)
+        if not matches:
+            return DedupeResult()
+        clients = {self._entries[ticket_id][1] for ticket_id, _ in matches}
+        clients.add(client_key)
+        long_enough = summary_length is None or summary_length >= self.spam_min_length
+        if long_enough and len(clients) >= self.spam_min_clients:
+            return DedupeResult(is_spam=True, similarity=matches[0][1])
+        own = [(tid, sim) for tid, sim in matches if self._entries[tid][1] == client_key]
+        if own:
+            earliest = min(tid for tid, _ in own)
+            return DedupeResult(duplicate_of_id=earliest, similarity=max(sim for _, sim in own))
+        return DedupeResult(similarity=matches[0][1])
+
+
+_indexes: Dict[str, MinHashLSHIndex] = {}
+
+def get_dedupe_index(firm_id: str) -> MinHashLSHIndex:
+    """
+    Per-firm LSH index (warmed at startup by warm_dedupe_index).
+
+    Firms never share an index, so a ticket can't be linked to - or flagged
+    as spam because of - another firm's submissions.
+    """
+    index = _indexes.get(firm_id)
+    if index is None:
+        index = _indexes[firm_id] = MinHashLSHIndex()
+    return index
+
+
+async def warm_dedupe_index(db: AsyncSession, days: int = DEDUPE_WARM_DAYS) -> int:
+    """Load recent tickets into their firms' indexes, oldest first. Returns entries added."""
+    since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)
+    stream = await db.stream(
+        select(Ticket.firm_id, Ticket.id, Ticket.event_summary, Ticket.client_email_bidx)
+        .where(Ticket.created_at >= since, Ticket.is_deleted.is_(False))
+        .order_by(Ticket.id)
+        .execution_options(yield_per=1000)
+    )
+    added = 0
+    async for firm_id, ticket_id, summary, client_key in stream:
+        get_dedupe_index(firm_id).add(ticket_id, minhash_signature(summary), client_key)
+        added += 1
+    return added
+
+
+# ===== Offline batch clustering =====
+
+def cluster_signatures(
+    entries: Iterable[Tuple[int, np.ndarray]],
+    threshold: float = DEDUPE_THRESHOLD
+) -> List[List[int]]:
+    """
+    Group tickets into near-duplicate clusters (union-find over LSH candidates).
+    Returns clusters of size >= 2, each sorted by ticket id.
+    """
+    index = MinHashLSHIndex(threshold=threshold, capacity=sys.maxsize)
+    parent: Dict[int, int] = {}
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for ticket_id, signature in entries:
+        parent[ticket_id] = ticket_id
+        for other, _ in index.matches(signature):
+            root_a, root_b = find(ticket_id), find(other)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+        index.add(ticket_id, signature)
+
+    clusters: Dict[int, List[int]] = {}
+    for ticket_id in parent:
+        clusters.setdefault(find(ticket_id), []).append(ticket_id)
+    return [sorted(members) for members in clusters.values() if len(members) > 1]
+
+
+async def cluster_history(db: AsyncSession, apply: bool = False) -> List[List[int]]:
+    """
+    Cluster the whole tickets table, separately for each firm. With
+    apply=True, link every ticket in a cluster (that isn't already linked)
+    to the cluster's earliest ticket.
+    """
+    stream = await db.stream(
+        select(Ticket.firm_id, Ticket.id, Ticket.event_summary)
+        .where(Ticket.is_deleted.is_(False))
+        .order_by(Ticket.id)
+        .execution_options(yield_per=1000)
+    )
+    by_firm: Dict[str, List[Tuple[int, np.ndarray]]] = {}
+    async for firm_id, ticket_id, summary in stream:
+        by_firm.setdefault(firm_id, []).append((ticket_id, minhash_signature(summary)))
+    clusters = [
+        members
+        for signatures in by_firm.values()
+        for members in cluster_signatures(signatures)
+    ]
+
+    if apply:
+        for members in clusters:
+            await db.execute(
+                update(Ticket)
+                .where(Ticket.id.in_(members[1:]), Ticket.duplicate_of_id.is_(None))
+                .values(duplicate_of_id=members[0])
+            )
+        await db.commit()
+    return clusters
+
+
+async def _main(argv: list) -> int:
+    from app.core.tenancy import shard_router
+
+    if not argv[1:] or argv[1] != "cluster" or set(argv[2:]) - {"--apply"}:
+        print("Usage: python -m app.core.dedupe cluster [--apply]", file=sys.stderr)
+        return 2
+    for shard in shard_router.shards:
+        async with shard_router.shard_session(shard) as session:
+            clusters = await cluster_history(session, apply="--apply" in argv)
+        for members in clusters:
+            print(shard, " ".join(str(ticket_id) for ticket_id in members))
+        print(f"{shard}: {len(clusters)} near-duplicate clusters", file=sys.stderr)
+    await shard_router.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv)))
@@ -4,7 +4,8 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
-from app.core.security import decode_access_token
+from app.core.config import DEFAULT_FIRM_ID
+from app.core.security import decode_token_claims
 from app.models import User
 
 # OAuth2 scheme for extracting Bearer token from Authorization header
@@ -21,8 +22,10 @@ async def get_current_user(
     This dependency:
     1. Extracts the JWT from the Authorization header
     2. Decodes and validates the token
-    3. Queries the database for the user
-    4. Returns the User object or raises 401 Unauthorized
+    3. Checks the token's firm matches the firm the request was routed to
+       (get_db already opened a session on that firm's shard)
+    4. Queries the database for the user (scoped to that firm)
+    5. Returns the User object or raises 401 Unauthorized
     
     Usage: Add as dependency to protected routes
     Example: @router.get("/protected", dependencies=[Depends(get_current_user)])
@@ -35,8 +38,14 @@ async def get_current_user(
     )
     
     # Decode token and extract email (sub claim)
-    email = decode_access_token(token)
-    if email is None:
+    claims = decode_token_claims(token)
+    email = claims.get("sub") if claims else None
+    # Scoped tokens (e.g. attachment upload tokens) never authenticate a lawyer
+    if email is None or claims.get("scope") is not None:
+        raise credentials_exception
+
+    # Tokens issued before multi-tenancy carry no firm claim: default firm
+    if claims.get("firm", DEFAULT_FIRM_ID) != db.info.get("firm_id"):
         raise credentials_exception
     
     # Query database for user with this email
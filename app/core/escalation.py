@@ -0,0 +1,250 @@
+# SLA escalation: deadlines for tickets left in "New", backed by a timer wheel
+import asyncio
+import datetime
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import (
+    ESCALATION_ACTIONS,
+    ESCALATION_BATCH_TIMEOUT_SECONDS,
+    ESCALATION_PRIORITY_BUMP,
+    ESCALATION_SLA_MINUTES,
+    ESCALATION_TICK_SECONDS,
+)
+from app.core.notifications import Lead, get_notifier
+from app.core.tenancy import ShardRouter, shard_router
+from app.core.timerwheel import HierarchicalTimerWheel
+from app.models import Ticket
+
+logger = logging.getLogger(__name__)
+
+NEW_STATUS = "New"
+ACTIONS = {"renotify", "bump_priority"}
+
+# Delay before retrying a batch whose escalation failed (e.g. DB unavailable)
+RETRY_SECONDS = 60
+
+# Ticket ids are only unique within a shard, so timers are keyed by firm too
+TimerKey = Tuple[str, int]
+
+
+def parse_sla(raw: str) -> Dict[str, int]:
+    """Parse "urgency:minutes,...,*:minutes" into {urgency: seconds}."""
+    sla: Dict[str, int] = {}
+    for entry in raw.split(","):
+        urgency, _, minutes = entry.rpartition(":")
+        if urgency.strip():
+            sla[urgency.strip()] = int(float(minutes) * 60)
+    return sla
+
+
+def parse_actions(raw: str) -> Set[str]:
+    actions = {a.strip() for a in raw.split(",") if a.strip()}
+    unknown = actions - ACTIONS
+    if unknown:
+        raise ValueError(f"Unknown escalation actions: {sorted(unknown)}")
+    return actions
+
+
+def _epoch(value: datetime.datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+class EscalationScheduler:
+    """
+    Tracks one SLA deadline per unacknowledged ticket.
+
+    - register() at intake, cancel() when the status leaves "New" - both O(1)
+    - A background task advances the wheel every tick and escalates all
+      tickets that expired in that tick as one batch
+    - Escalated tickets are re-armed for another SLA period until acknowledged
+    - The DB is the source of truth: a conditional UPDATE guards each
+      escalation, so stale timers (or other workers) never double-escalate
+    - One wheel serves every firm; each firm's batch runs on its own shard
+    - Batches run as their own tasks under batch_timeout, so a slow database
+      never stops the wheel from advancing; failed batches are retried
+    """
+
+    def __init__(
+        self,
+        router: ShardRouter,
+        sla_seconds: Dict[str, int],
+        actions: Set[str],
+        priority_bump: int = ESCALATION_PRIORITY_BUMP,
+        tick_seconds: float = ESCALATION_TICK_SECONDS,
+        batch_timeout: float = ESCALATION_BATCH_TIMEOUT_SECONDS
+    ):
+        self.router = router
+        self.sla_seconds = sla_seconds
+        self.actions = actions
+        self.priority_bump = priority_bump
+        self.tick_seconds = tick_seconds
+        self.batch_timeout = batch_timeout
+        self.wheel = HierarchicalTimerWheel(start_tick=self._tick(time.time()))
+        self._task: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+
+    def _tick(self, epoch_seconds: float) -> int:
+        return int(epoch_seconds // self.tick_seconds)
+
+    def sla_for(self, urgency_level: str) -> Optional[int]:
+        return self.sla_seconds.get(urgency_level, self.sla_seconds.get("*"))
+
+    def register(self, firm_id: str, ticket_id: int, urgency_level: str, since: datetime.datetime) -> None:
+        """Arm (or re-arm) the deadline for a ticket that is in "New"."""
+        sla = self.sla_for(urgency_level)
+        if sla is None:
+            return
+        self.wheel.schedule((firm_id, ticket_id), self._tick(_epoch(since) + sla), urgency_level)
+
+    def cancel(self, firm_id: str, ticket_id: int) -> None:
+        self.wheel.cancel((firm_id, ticket_id))
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Re-register every ticket still in "New" on one shard (called at startup)."""
+        stream = await db.stream(
+            select(Ticket.firm_id, Ticket.id, Ticket.urgency_level, Ticket.created_at, Ticket.escalated_at)
+            .where(
+                Ticket.status == NEW_STATUS,
+                Ticket.is_deleted.is_(False)
+            )
+            .execution_options(yield_per=5000)
+        )
+        count = 0
+        async for firm_id, ticket_id, urgency_level, created_at, escalated_at in stream:
+            self.register(firm_id, ticket_id, urgency_level, escalated_at or created_at)
+            count += 1
+        logger.info("Escalation scheduler rebuilt with %d pending deadlines", count)
+        return count
+
+    async def escalate(self, keys: Iterable[TimerKey]) -> List[TimerKey]:
+        """Escalate expired (firm_id, ticket_id) timers, one batch per firm."""
+        by_firm: Dict[str, List[int]] = {}
+        for firm_id, ticket_id in keys:
+            by_firm.setdefault(firm_id, []).append(ticket_id)
+        escalated: List[TimerKey] = []
+        for firm_id, ticket_ids in by_firm.items():
+            escalated.extend((firm_id, ticket_id) for ticket_id in await self.escalate_firm(firm_id, ticket_ids))
+        return escalated
+
+    async def escalate_firm(self, firm_id: str, ticket_ids: List[int]) -> List[int]:
+        """
+        Escalate one firm's tickets whose deadline passed; returns the ids escalated.
+
+        The UPDATE only matches tickets still "New" and not escalated within
+        the last half SLA, so acknowledged tickets and duplicate timers are
+        skipped without extra reads.
+        """
+        ticket_ids = list(ticket_ids)
+        if not ticket_ids:
+            return []
+        now = datetime.datetime.now(datetime.timezone.utc)
+        min_sla = min(self.sla_seconds.values())
+        values = {"escalated_at": now}
+        if "bump_priority" in self.actions:
+            values["priority_score"] = Ticket.priority_score + self.priority_bump
+
+        async with self.router.session(firm_id) as db:
+            result = await db.execute(
+                update(Ticket)
+                .where(
+                    Ticket.id.in_(ticket_ids),
+                    Ticket.status == NEW_STATUS,
+                    Ticket.is_deleted.is_(False),
+                    or_(
+                        Ticket.escalated_at.is_(None),
+                        Ticket.escalated_at < now - datetime.timedelta(seconds=min_sla / 2)
+                    )
+                )
+                .values(**values)
+                .returning(Ticket.id, Ticket.urgency_level)
+                .execution_options(synchronize_session=False)
+            )
+            escalated = result.all()
+            # Still "New" but escalated recently (e.g. by another worker): keep tracking
+            skipped = set(ticket_ids) - {row.id for row in escalated}
+            pending = []
+            if skipped:
+                pending = (await db.execute(
+                    select(Ticket.id, Ticket.urgency_level, Ticket.escalated_at).where(
+                        Ticket.id.in_(skipped),
+                        Ticket.status == NEW_STATUS,
+                        Ticket.is_deleted.is_(False)
+                    )
+                )).all()
+            leads: List[Lead] = []
+            if escalated and "renotify" in self.actions:
+                rows = await db.execute(
+                    select(Ticket).where(Ticket.id.in_([row.id for row in escalated]))
+                )
+                leads = [
+                    Lead(t.id, t.client_name, t.client_email, t.urgency_level, firm_id, t.is_spam)
+                    for t in rows.scalars()
+                ]
+            await db.commit()
+
+        for row in escalated:
+            self.register(firm_id, row.id, row.urgency_level, now)
+        for row in pending:
+            self.register(firm_id, row.id, row.urgency_level, row.escalated_at or now)
+        if leads:
+            await get_notifier().notify_overdue(leads)
+        if escalated:
+            logger.warning(
+                "Escalated %d overdue tickets for firm %s: %s",
+                len(escalated), firm_id, [row.id for row in escalated]
+            )
+        return [row.id for row in escalated]
+
+    async def _escalate_batch(self, expired: List[Tuple[TimerKey, str]]) -> None:
+        try:
+            await asyncio.wait_for(self.escalate(key for key, _ in expired), self.batch_timeout)
+        except Exception:
+            logger.exception("Escalation of %d tickets failed; retrying in %ds", len(expired), RETRY_SECONDS)
+            retry_tick = self.wheel.current_tick + self._tick(RETRY_SECONDS)
+            for key, urgency_level in expired:
+                self.wheel.schedule(key, retry_tick, urgency_level)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            expired = self.wheel.advance(self._tick(time.time()))
+            if not expired:
+                continue
+            # Off the tick loop: the next tick comes on time even if this batch stalls
+            batch = asyncio.create_task(self._escalate_batch(expired))
+            self._batches.add(batch)
+            batch.add_done_callback(self._batches.discard)
+
+    async def start(self) -> None:
+        for shard in self.router.shards:
+            async with self.router.shard_session(shard) as db:
+                await self.rebuild(db)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for batch in list(self._batches):
+            batch.cancel()
+        await asyncio.gather(*self._batches, return_exceptions=True)
+
+
+_scheduler: Optional[EscalationScheduler] = None
+
+def get_escalation_scheduler() -> EscalationScheduler:
+    """Process-wide scheduler built from config on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = EscalationScheduler(
+            shard_router,
+            sla_seconds=parse_sla(ESCALATION_SLA_MINUTES),
+            actions=parse_actions(ESCALATION_ACTIONS)
+        )
+    return _scheduler
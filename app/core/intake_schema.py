@@ -0,0 +1,194 @@
+# Intake form contract: JSON Schema + localized validation messages, built once and served from memory
+import hashlib
+import json
+from dataclasses import dataclass
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from app.schemas import TicketCreate
+
+DEFAULT_LOCALE = "he"
+LOCALES = ("he", "en")
+
+# Fallback for error types without a message of their own
+DEFAULT_ERROR = "default"
+
+
+# ===== Error catalog =====
+# Keyed by Pydantic error type; "<field>.<type>" entries override the generic
+# wording for one field. $placeholders come from the field's constraints.
+
+MESSAGES: Dict[str, Dict[str, Template]] = {
+    "he": {
+        "missing": Template("שדה זה הוא חובה"),
+        "string_type": Template("יש להזין טקסט"),
+        "string_too_short": Template("חייב להכיל לפחות $min_length תווים"),
+        "string_too_long": Template("לא יכול להכיל יותר מ-$max_length תווים"),
+        "string_pattern_mismatch": Template("הערך אינו בפורמט הנדרש"),
+        "literal_error": Template("יש לבחור אחת מהאפשרויות: $expected"),
+        "value_error": Template("ערך לא תקין"),
+        "json_invalid": Template("גוף הבקשה אינו JSON תקין"),
+        "model_attributes_type": Template("גוף הבקשה חייב להיות אובייקט JSON"),
+        "client_name.string_too_short": Template("נא להזין שם"),
+        "client_email.value_error": Template("נא להזין כתובת דוא״ל תקינה"),
+        "client_phone.string_pattern_mismatch": Template("נא להזין מספר טלפון תקין"),
+        "event_summary.string_too_short": Template("נא להזין תיאור"),
+        DEFAULT_ERROR: Template("ערך לא תקין"),
+    },
+    "en": {
+        "missing": Template("This field is required"),
+        "string_type": Template("Please enter text"),
+        "string_too_short": Template("Must be at least $min_length characters"),
+        "string_too_long": Template("Cannot be longer than $max_length characters"),
+        "string_pattern_mismatch": Template("The value is not in the expected format"),
+        "literal_error": Template("Please choose one of: $expected"),
+        "value_error": Template("Invalid value"),
+        "json_invalid": Template("The request body is not valid JSON"),
+        "model_attributes_type": Template("The request body must be a JSON object"),
+        "client_name.string_too_short": Template("Please enter your name"),
+        "client_email.value_error": Template("Please enter a valid email address"),
+        "client_phone.string_pattern_mismatch": Template("Please enter a valid phone number"),
+        "event_summary.string_too_short": Template("Please describe your case"),
+        DEFAULT_ERROR: Template("Invalid value"),
+    },
+}
+
+# Which error types a JSON Schema keyword can produce
+_KEYWORD_ERRORS = (
+    ("minLength", "string_too_short"),
+    ("maxLength", "string_too_long"),
+    ("pattern", "string_pattern_mismatch"),
+    ("enum", "literal_error"),
+    ("format", "value_error"),
+)
+
+
+def _render(locale: str, field: Optional[str], error_type: str, params: Dict[str, Any]) -> str:
+    templates = MESSAGES.get(locale, MESSAGES[DEFAULT_LOCALE])
+    template = (
+        (field and templates.get(f"{field}.{error_type}"))
+        or templates.get(error_type)
+        or templates[DEFAULT_ERROR]
+    )
+    return template.safe_substitute(params)
+
+
+def _field_params(spec: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "min_length": spec.get("minLength"),
+        "max_length": spec.get("maxLength"),
+        "expected": ", ".join(spec.get("enum", ())),
+    }
+
+
+# ===== Precomputed schema =====
+
+@dataclass(frozen=True)
+class IntakeSchema:
+    """The serialized intake contract; `body` is sent as-is on every request."""
+    version: str
+    etag: str
+    body: bytes
+    # (locale, field, error type) -> message, for validating POST /intake
+    messages: Dict[Tuple[str, str, str], str]
+
+
+def build_intake_schema() -> IntakeSchema:
+    """
+    Render the TicketCreate JSON Schema and, per locale, every message each
+    field can produce. The version is a hash of the content, so it changes
+    exactly when the form contract does.
+    """
+    schema = TicketCreate.model_json_schema()
+    schema.pop("description", None)
+    required = set(schema.get("required", ()))
+
+    messages: Dict[Tuple[str, str, str], str] = {}
+    catalog: Dict[str, Dict[str, Dict[str, str]]] = {}
+    for locale in LOCALES:
+        catalog[locale] = {}
+        for field, spec in schema["properties"].items():
+            error_types = ["string_type"] + [error for keyword, error in _KEYWORD_ERRORS if keyword in spec]
+            if field in required:
+                error_types.insert(0, "missing")
+            rendered = {error: _render(locale, field, error, _field_params(spec)) for error in error_types}
+            catalog[locale][field] = rendered
+            messages.update({(locale, field, error): text for error, text in rendered.items()})
+
+    content = {"schema": schema, "messages": catalog, "locales": list(LOCALES), "default_locale": DEFAULT_LOCALE}
+    canonical = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    version = hashlib.sha256(canonical).hexdigest()[:16]
+    body = json.dumps({"version": version, **content}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return IntakeSchema(version=version, etag=f'"{version}"', body=body, messages=messages)
+
+
+# Built once, when the app starts (module import)
+INTAKE_SCHEMA = build_intake_schema()
+
+
+def schema_response(request: Request, cache_control: str) -> Response:
+    """200 with the precomputed body, or 304 when the client already has this version."""
+    headers = {"ETag": INTAKE_SCHEMA.etag, "Cache-Control": cache_control}
+    if INTAKE_SCHEMA.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=INTAKE_SCHEMA.body, media_type="application/json", headers=headers)
+
+
+# ===== Localized validation errors =====
+
+def negotiate_locale(request: Request) -> str:
+    """?lang= if supported, else the best supported Accept-Language, else Hebrew."""
+    lang = request.query_params.get("lang")
+    if lang in LOCALES:
+        return lang
+    ranked = []
+    for part in request.headers.get("accept-language", "").split(","):
+        tag, _, q = part.strip().partition(";q=")
+        try:
+            weight = float(q) if q else 1.0
+        except ValueError:
+            continue
+        language = tag.split("-", 1)[0].lower()
+        if language in LOCALES:
+            ranked.append((weight, language))
+    return max(ranked)[1] if ranked else DEFAULT_LOCALE
+
+
+def localize_errors(errors: List[Dict[str, Any]], locale: str) -> List[Dict[str, Any]]:
+    """Pydantic errors -> {type, loc, field, msg} with msg from the intake catalog (inputs are not echoed)."""
+    localized = []
+    for error in errors:
+        loc = list(error.get("loc", ()))
+        field = loc[1] if len(loc) > 1 and loc[0] == "body" and isinstance(loc[1], str) else None
+        error_type = error.get("type", DEFAULT_ERROR)
+        msg = INTAKE_SCHEMA.messages.get((locale, field, error_type)) or _render(
+            locale, field, error_type, error.get("ctx") or {}
+        )
+        localized.append({"type": error_type, "loc": loc, "field": field, "msg": msg})
+    return localized
+
+
+class LocalizedValidationRoute(APIRoute):
+    """Route class returning 422s with messages from the intake catalog instead of Pydantic's English."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def localized_handler(request: Request) -> Response:
+            try:
+                return await handler(request)
+            except RequestValidationError as exc:
+                locale = negotiate_locale(request)
+                return JSONResponse(
+                    status_code=422,
+                    content={
+                        "detail": localize_errors(exc.errors(), locale),
+                        "schema_version": INTAKE_SCHEMA.version,
+                    },
+                    headers={"Content-Language": locale, "Vary": "Accept-Language"}
+                )
+
+        return localized_handler
@@ -0,0 +1,325 @@
+# Structured, non-blocking logging: JSON lines written off the event loop, request ids, sampling, slow SQL
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import ACCESS_LOG, LOG_LEVEL, LOG_QUEUE_SIZE, LOG_SAMPLING, SQL_SLOW_QUERY_MS
+
+# Id of the request being handled (None outside a request)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "x-request-id"
+# Accept a caller's id only if it's short and printable (it ends up in every log line)
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+access_logger = logging.getLogger("app.access")
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+# Attributes every LogRecord has; anything else was passed via extra= and is emitted as a field
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+# ===== Formatting and filtering =====
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, request_id and any extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            payload["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request id (runs in the caller, before queueing)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+def parse_sampling(raw: str) -> Dict[str, float]:
+    """Parse "logger:rate,logger:rate" (rates clamped to 0..1)."""
+    rates: Dict[str, float] = {}
+    for entry in raw.split(","):
+        name, _, rate = entry.strip().rpartition(":")
+        if name and rate:
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fixed fraction of INFO/DEBUG records per logger (and its children).
+
+    Deterministic: a 0.1 rate keeps exactly every tenth record, so sampled
+    counts can be scaled back up. Kept records carry `sample_rate`.
+    Warnings and errors always pass. Thread-safe: records are filtered on
+    whichever thread logs them.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._lock = threading.Lock()
+        self._credit: Dict[str, float] = {}
+        self._rate_cache: Dict[str, Optional[float]] = {}
+
+    def _rate_for(self, name: str) -> Optional[float]:
+        if name not in self._rate_cache:
+            # Most specific configured prefix wins
+            rate = None
+            for prefix in sorted(self.rates, key=len, reverse=True):
+                if name == prefix or name.startswith(prefix + "."):
+                    rate = self.rates[prefix]
+                    break
+            self._rate_cache[name] = rate
+        return self._rate_cache[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        if rate is None or rate >= 1.0:
+            return True
+        with self._lock:
+            credit = self._credit.get(record.name, 1.0 - rate) + rate
+            if credit < 1.0:
+                self._credit[record.name] = credit
+                return False
+            self._credit[record.name] = credit - 1.0
+        record.sample_rate = rate
+        return True
+
+
+_traceback_formatter = logging.Formatter()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler over a bounded queue: when full, records are dropped and counted, never waited on."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve %-args and tracebacks now (they may reference objects that
+        # change or die), but leave JSON formatting to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# ===== Pipeline =====
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+_previous_root_handlers: List[logging.Handler] = []
+
+
+def setup_logging(
+    level: str = LOG_LEVEL,
+    queue_size: int = LOG_QUEUE_SIZE,
+    sampling: str = LOG_SAMPLING,
+    slow_query_ms: float = SQL_SLOW_QUERY_MS,
+    access_log: bool = ACCESS_LOG,
+    stream=None
+) -> None:
+    """
+    Route every logger through one bounded queue to a background thread
+    that formats JSON and writes it to stdout.
+
+    Request handlers only pay for building the record and a put_nowait();
+    formatting and the (possibly blocking) write happen on the listener
+    thread. Idempotent; undone by shutdown_logging().
+    """
+    global _listener, _queue_handler, _previous_root_handlers
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(queue_size))
+    _queue_handler.addFilter(RequestContextFilter())
+    rates = parse_sampling(sampling)
+    if rates:
+        _queue_handler.addFilter(SamplingFilter(rates))
+
+    root = logging.getLogger()
+    _previous_root_handlers = root.handlers
+    root.handlers = [_queue_handler]
+    root.setLevel(level.upper())
+    # uvicorn installs its own stdout handlers; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    # RequestContextMiddleware writes the access line (with request id and
+    # firm); uvicorn's own would be a duplicate of every request
+    if access_log:
+        logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+    # SQL is never echoed; only slow statements are logged (opt-in)
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+    # One INFO line per webhook POST; deliveries are already in webhook_deliveries
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if slow_query_ms > 0:
+        enable_slow_query_log(slow_query_ms)
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the listener thread."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    if _queue_handler.dropped:
+        logging.getLogger(__name__).warning("Log queue overflowed; %d records dropped", _queue_handler.dropped)
+    disable_slow_query_log()
+    _listener.stop()   # drains the queue before returning
+    logging.getLogger().handlers = _previous_root_handlers
+    _listener = _queue_handler = None
+
+
+# ===== Slow SQL =====
+
+_slow_query_ms: float = 0.0
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("query_start")
+    if not starts:   # enabled mid-statement
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    if elapsed_ms >= _slow_query_ms:
+        # Parameters are left out: they can hold client PII
+        slow_query_logger.warning(
+            "Slow query (%.1f ms)", elapsed_ms,
+            extra={"duration_ms": round(elapsed_ms, 1), "statement": " ".join(statement.split())[:2000]}
+        )
+
+
+def _handle_error(context) -> None:
+    # after_cursor_execute doesn't fire for a failed statement; drop its start time
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def enable_slow_query_log(threshold_ms: float) -> None:
+    """Time every statement on every engine (all shards) and log the ones over threshold_ms."""
+    global _slow_query_ms
+    _slow_query_ms = threshold_ms
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+def disable_slow_query_log() -> None:
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.remove(Engine, "handle_error", _handle_error)
+
+
+# ===== Request ids =====
+
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware: assigns each request an id (the caller's
+    X-Request-ID if valid, otherwise a new one), makes it visible to every
+    log record written while handling the request - background tasks
+    included - echoes it in the response, and writes one access line.
+    """
+
+    def __init__(self, app, access_log: bool = ACCESS_LOG):
+        self.app = app
+        self.access_log = access_log
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER.encode():
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers: List = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode(), request_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            if self.access_log:
+                access_logger.info(
+                    "%s %s %d", scope["method"], scope["path"], status_code,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                        "firm_id": scope.get("state", {}).get("firm_id"),
+                    }
+                )
+            request_id_var.reset(token)
@@ -0,0 +1,338 @@
+# Zero-downtime Alembic helpers: expand / backfill / contract without blocking intake
+#
+# Usage inside a migration:
+#
+#     from app.core.migrations import add_column, backfill, create_index_concurrently, set_not_null
+#
+#     def upgrade():
+#         add_column('tickets', sa.Column('score', sa.Integer(), server_default='0', nullable=True))  # expand
+#         backfill('007_score', tickets, values={'score': 0}, where=tickets.c.score.is_(None))       # backfill
+#         set_not_null('tickets', 'score')                                                            # contract
+#         create_index_concurrently('ix_tickets_score', 'tickets', ['score'])
+#
+# Every helper commits the migration transaction so far (autocommit block);
+# env.py runs with transaction_per_migration=True to expect that. Because
+# steps commit one by one, each is idempotent: a migration that failed
+# partway is resumed by simply running it again. Backfills read rows, so
+# migrations using them need online mode (not --sql).
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+import sqlalchemy as sa
+from sqlalchemy.exc import OperationalError
+from alembic import op
+
+logger = logging.getLogger("alembic.zero_downtime")
+
+# How long DDL may wait for a lock before giving up (and being retried).
+# Keeps a blocked ALTER from queueing every intake INSERT behind it.
+DEFAULT_LOCK_TIMEOUT = "2s"
+DEFAULT_ATTEMPTS = 5
+
+# Postgres SQLSTATE for lock_timeout expiry (lock_not_available)
+_LOCK_NOT_AVAILABLE = "55P03"
+
+# Bookkeeping table created on demand by backfill(); not part of the models
+PROGRESS_TABLE = "zero_downtime_backfill_progress"
+
+_progress = sa.table(
+    PROGRESS_TABLE,
+    sa.column("name", sa.String),
+    sa.column("last_pk", sa.BigInteger),
+)
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+@contextmanager
+def lock_timeout(timeout: str = DEFAULT_LOCK_TIMEOUT) -> Iterator[None]:
+    """Bound how long statements in the block may wait for locks (Postgres only)."""
+    if not _is_postgres():
+        yield
+        return
+    op.execute(sa.text(f"SET lock_timeout = '{timeout}'"))
+    try:
+        yield
+    finally:
+        op.execute(sa.text("RESET lock_timeout"))
+
+
+def _constraint_exists(table: str, name: str) -> bool:
+    return op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_constraint WHERE conname = :name AND conrelid = to_regclass(:table)"
+    ), {"name": name, "table": table}).first() is not None
+
+
+def _column_exists(table: str, column: str) -> bool:
+    return any(c["name"] == column for c in sa.inspect(op.get_bind()).get_columns(table))
+
+
+def _is_lock_timeout(exc: OperationalError) -> bool:
+    code = getattr(exc.orig, "pgcode", None) or getattr(exc.orig, "sqlstate", None)
+    return code == _LOCK_NOT_AVAILABLE
+
+
+def run_ddl(
+    statement: Callable[[], None],
+    description: str,
+    timeout: str = DEFAULT_LOCK_TIMEOUT,
+    attempts: int = DEFAULT_ATTEMPTS
+) -> None:
+    """
+    Run one short DDL step outside the migration transaction under a lock
+    timeout, retrying with backoff when the lock isn't granted in time.
+    """
+    with op.get_context().autocommit_block():
+        for attempt in range(1, attempts + 1):
+            try:
+                with lock_timeout(timeout):
+                    statement()
+                logger.info("%s: done", description)
+                return
+            except OperationalError as exc:
+                if not _is_lock_timeout(exc) or attempt == attempts:
+                    raise
+                delay = min(2 ** attempt, 30)
+                logger.warning(
+                    "%s: lock not acquired within %s (attempt %d/%d), retrying in %ds",
+                    description, timeout, attempt, attempts, delay
+                )
+                time.sleep(delay)
+
+
+# ===== Expand =====
+
+def add_column(table: str, column: sa.Column, **kwargs) -> None:
+    """
+    Expand step: add a column without a table rewrite.
+
+    The column must be nullable; a constant server_default is fine (metadata
+    only on Postgres 11+). Tighten it afterwards with set_not_null().
+    Already-present columns are skipped (ADD COLUMN IF NOT EXISTS).
+    """
+    if not column.nullable:
+        raise ValueError(f"{table}.{column.name}: add as nullable, then backfill and set_not_null()")
+
+    def add():
+        if _is_postgres():
+            op.add_column(table, column, if_not_exists=True)
+        elif not _column_exists(table, column.name):
+            op.add_column(table, column)
+
+    run_ddl(add, f"add column {table}.{column.name}", **kwargs)
+
+
+# ===== Backfill =====
+
+def _load_progress(bind, name: str) -> int:
+    bind.execute(sa.text(
+        f"CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} "
+        "(name VARCHAR PRIMARY KEY, last_pk BIGINT NOT NULL)"
+    ))
+    last_pk = bind.execute(
+        sa.select(_progress.c.last_pk).where(_progress.c.name == name)
+    ).scalar_one_or_none()
+    return last_pk or 0
+
+
+def _save_progress(bind, name: str, last_pk: int) -> None:
+    updated = bind.execute(
+        _progress.update().where(_progress.c.name == name).values(last_pk=last_pk)
+    )
+    if updated.rowcount == 0:
+        bind.execute(_progress.insert().values(name=name, last_pk=last_pk))
+
+
+def _estimate_rows(bind, table: sa.TableClause) -> int:
+    """Planner estimate on Postgres (no full scan), exact count elsewhere."""
+    if bind.dialect.name == "postgresql":
+        estimate = bind.execute(
+            sa.text("SELECT reltuples::bigint FROM pg_class WHERE relname = :t"),
+            {"t": table.name}
+        ).scalar_one_or_none()
+        if estimate is not None and estimate >= 0:
+            return estimate
+    return bind.execute(sa.select(sa.func.count()).select_from(table)).scalar_one()
+
+
+def backfill(
+    name: str,
+    table: sa.TableClause,
+    values: Optional[Dict[str, object]] = None,
+    transform: Optional[Callable[[sa.Row], Dict[str, object]]] = None,
+    columns: Sequence[str] = (),
+    where: Optional[sa.ColumnElement] = None,
+    pk: str = "id",
+    batch_size: int = 1000,
+    pause_seconds: float = 0.1
+) -> int:
+    """
+    Backfill step: update rows in throttled, resumable primary-key batches.
+
+    - values: SET applied to each batch in one range UPDATE (constants or SQL)
+    - transform: Python-side per-row values, given a row of pk + `columns`
+    - where: optional filter, e.g. tickets.c.score.is_(None)
+
+    Each batch commits on its own so row locks are held only briefly, and
+    the last processed primary key is recorded under `name` so an
+    interrupted run resumes where it stopped. Batches must be idempotent
+    (a batch may be repeated after a crash). Returns rows processed.
+    """
+    if (values is None) == (transform is None):
+        raise ValueError("backfill() needs exactly one of values= or transform=")
+
+    pk_col = table.c[pk]
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_pk = _load_progress(bind, name)
+        total = _estimate_rows(bind, table)
+        if last_pk:
+            logger.info("%s: resuming after %s=%s", name, pk, last_pk)
+
+        processed = 0
+        started = time.monotonic()
+        while True:
+            stmt = sa.select(pk_col, *(table.c[c] for c in columns)).where(pk_col > last_pk)
+            if where is not None:
+                stmt = stmt.where(where)
+            rows = bind.execute(stmt.order_by(pk_col).limit(batch_size)).all()
+            if not rows:
+                break
+
+            first, last = rows[0][0], rows[-1][0]
+            if values is not None:
+                update = table.update().where(pk_col.between(first, last))
+                if where is not None:
+                    update = update.where(where)
+                bind.execute(update.values(**values))
+            else:
+                params: List[dict] = []
+                for row in rows:
+                    changes = transform(row)
+                    if changes:
+                        params.append({"_pk": row[0], **changes})
+                if params:
+                    keys = [k for k in params[0] if k != "_pk"]
+                    bind.execute(
+                        table.update()
+                        .where(pk_col == sa.bindparam("_pk"))
+                        .values({k: sa.bindparam(k) for k in keys}),
+                        params
+                    )
+
+            last_pk = last
+            processed += len(rows)
+            _save_progress(bind, name, last_pk)
+
+            elapsed = max(time.monotonic() - started, 1e-6)
+            logger.info(
+                "%s: %d rows (~%d%%), %s=%s, %.0f rows/s",
+                name, processed, min(100, processed * 100 // max(total, 1)),
+                pk, last_pk, processed / elapsed
+            )
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+        bind.execute(_progress.delete().where(_progress.c.name == name))
+    logger.info("%s: backfill complete (%d rows)", name, processed)
+    return processed
+
+
+# ===== Contract =====
+
+def set_not_null(table: str, column: str, **kwargs) -> None:
+    """
+    Contract step: make a backfilled column NOT NULL without a long lock.
+
+    Postgres: add a NOT VALID check, validate it (SHARE UPDATE EXCLUSIVE -
+    writes keep flowing), then SET NOT NULL, which reuses the validated
+    check instead of scanning under ACCESS EXCLUSIVE (PG 12+). Every step
+    tolerates having already run.
+    """
+    if not _is_postgres():
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column(column, nullable=False)
+        return
+
+    check = f"{table}_{column}_not_null"
+
+    def add_check():
+        if not _constraint_exists(table, check):
+            op.execute(sa.text(
+                f'ALTER TABLE {table} ADD CONSTRAINT {check} CHECK ("{column}" IS NOT NULL) NOT VALID'
+            ))
+
+    run_ddl(add_check, f"add NOT VALID check {check}", **kwargs)
+    run_ddl(
+        lambda: op.execute(sa.text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}")),
+        f"validate {check}", **kwargs
+    )
+    run_ddl(
+        lambda: op.alter_column(table, column, nullable=False),
+        f"set {table}.{column} NOT NULL", **kwargs
+    )
+    run_ddl(
+        lambda: op.execute(sa.text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {check}")),
+        f"drop {check}", **kwargs
+    )
+
+
+def create_foreign_key(name: str, source: str, referent: str, local_cols: List[str], remote_cols: List[str], **kwargs) -> None:
+    """Add a foreign key as NOT VALID, then validate it without blocking writes."""
+    if not _is_postgres():
+        with op.batch_alter_table(source) as batch:
+            batch.create_foreign_key(name, referent, local_cols, remote_cols)
+        return
+    def add_foreign_key():
+        if not _constraint_exists(source, name):
+            op.execute(sa.text(
+                f"ALTER TABLE {source} ADD CONSTRAINT {name} FOREIGN KEY ({', '.join(local_cols)}) "
+                f"REFERENCES {referent} ({', '.join(remote_cols)}) NOT VALID"
+            ))
+
+    run_ddl(add_foreign_key, f"add NOT VALID foreign key {name}", **kwargs)
+    run_ddl(
+        lambda: op.execute(sa.text(f"ALTER TABLE {source} VALIDATE CONSTRAINT {name}")),
+        f"validate {name}", **kwargs
+    )
+
+
+# ===== Indexes =====
+
+def _drop_invalid_index(name: str) -> None:
+    """A failed CONCURRENTLY build leaves an INVALID index behind; clear it first."""
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        logger.warning("index %s: dropping INVALID leftover from an earlier attempt", name)
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+
+def create_index_concurrently(name: str, table: str, columns: List[str], unique: bool = False, **kwargs) -> None:
+    """Build an index with CREATE INDEX CONCURRENTLY (plain CREATE INDEX elsewhere)."""
+    def build():
+        if _is_postgres():
+            _drop_invalid_index(name)
+        op.create_index(
+            name, table, columns,
+            unique=unique,
+            if_not_exists=True,
+            postgresql_concurrently=True
+        )
+
+    started = time.monotonic()
+    run_ddl(build, f"create index {name} concurrently", **kwargs)
+    logger.info("index %s: built in %.1fs", name, time.monotonic() - started)
+
+
+def drop_index_concurrently(name: str, table: str, **kwargs) -> None:
+    """Drop an index with DROP INDEX CONCURRENTLY (plain DROP INDEX elsewhere)."""
+    run_ddl(
+        lambda: op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True),
+        f"drop index {name} concurrently", **kwargs
+    )
@@ -0,0 +1,45 @@
+# Canonical forms of client identifiers, so repeat clients match across submissions
+import re
+from typing import Optional
+from app.core.config import DEFAULT_PHONE_COUNTRY_CODE
+
+_NON_DIGITS = re.compile(r"\D")
+
+# E.164 allows at most 15 digits after the "+"
+_MAX_E164_DIGITS = 15
+_MIN_E164_DIGITS = 8
+
+
+def normalize_email(email: str) -> str:
+    """Lowercased, trimmed email ("Jane@X.com " -> "jane@x.com")."""
+    return email.strip().casefold()
+
+
+def normalize_phone(phone: str, country_code: str = DEFAULT_PHONE_COUNTRY_CODE) -> Optional[str]:
+    """
+    Best-effort E.164 form of a phone number, or None if it can't be one.
+
+    Handles the formats clients actually type:
+    - "+972-50-123-4567" / "00972 50 1234567" -> "+972501234567"
+    - "050-1234567" (national, trunk prefix 0) -> "+972501234567"
+    - "972501234567" (country code without "+") -> "+972501234567"
+    """
+    raw = phone.strip()
+    digits = _NON_DIGITS.sub("", raw)
+    if raw.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith("0"):
+        digits = country_code + digits[1:]
+    elif not digits.startswith(country_code):
+        digits = country_code + digits
+
+    if not _MIN_E164_DIGITS <= len(digits) <= _MAX_E164_DIGITS:
+        return None
+    return "+" + digits
+
+
+def normalize_phone_for_index(phone: str) -> str:
+    """Phone canonical form for blind indexing (falls back to the bare digits)."""
+    return normalize_phone(phone) or _NON_DIGITS.sub("", phone)
@@ -0,0 +1,379 @@
+# Lead notification subsystem: pooled async SMTP, precompiled templates, per-lawyer digests
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.message import EmailMessage
+from functools import partial
+from string import Template
+from typing import Callable, Dict, List, Optional
+import aiosmtplib
+from app.core.config import (
+    DEFAULT_FIRM_ID,
+    LEAD_NOTIFICATION_RECIPIENTS,
+    NOTIFICATION_DIGEST_WINDOW_SECONDS,
+    NOTIFICATION_SENDER,
+    SMTP_HOST,
+    SMTP_PASSWORD,
+    SMTP_POOL_SIZE,
+    SMTP_PORT,
+    SMTP_STARTTLS,
+    SMTP_USERNAME,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGE = "he"
+# Recipient firm suffix that opts a lawyer into every firm's leads
+ALL_FIRMS = "*"
+
+
+@dataclass(frozen=True)
+class Lead:
+    """The ticket fields a lawyer needs in a new-lead notification."""
+    ticket_id: int
+    client_name: str
+    client_email: str
+    urgency_level: str
+    firm_id: str = DEFAULT_FIRM_ID
+    # Flagged by the near-duplicate detector; shown, never silently dropped
+    suspected_spam: bool = False
+
+
+# ===== Templates =====
+# Compiled once at import; rendering is a single substitute() per field.
+
+TEMPLATES: Dict[str, Dict[str, Template]] = {
+    "he": {
+        "spam_marker": Template("[חשד לספאם] "),
+        "single_subject": Template("${spam}פנייה חדשה #$ticket_id ($urgency_level)"),
+        "single_body": Template(
+            "התקבלה פנייה חדשה.\n\n"
+            "מספר פנייה: $ticket_id\n"
+            "שם הלקוח: $client_name\n"
+            "אימייל: $client_email\n"
+            "דחיפות: $urgency_level\n"
+        ),
+        "digest_subject": Template("$count פניות חדשות"),
+        "digest_line": Template("$spam#$ticket_id | $client_name | $client_email | $urgency_level"),
+        "digest_body": Template("התקבלו $count פניות חדשות:\n\n$lines\n"),
+        "overdue_subject": Template("דחוף: $count פניות ממתינות ללא מענה"),
+        "overdue_body": Template("הפניות הבאות עדיין בסטטוס חדש לאחר חלוף זמן הטיפול:\n\n$lines\n"),
+    },
+    "en": {
+        "spam_marker": Template("[Suspected spam] "),
+        "single_subject": Template("${spam}New lead #$ticket_id ($urgency_level)"),
+        "single_body": Template(
+            "A new client lead was submitted.\n\n"
+            "Ticket ID: $ticket_id\n"
+            "Client name: $client_name\n"
+            "Client email: $client_email\n"
+            "Urgency: $urgency_level\n"
+        ),
+        "digest_subject": Template("$count new leads"),
+        "digest_line": Template("$spam#$ticket_id | $client_name | $client_email | $urgency_level"),
+        "digest_body": Template("$count new client leads were submitted:\n\n$lines\n"),
+        "overdue_subject": Template("Overdue: $count unacknowledged leads"),
+        "overdue_body": Template("These leads are still New past their SLA:\n\n$lines\n"),
+    },
+}
+
+
+def _lead_fields(lead: Lead, templates: Dict[str, Template]) -> dict:
+    """Template fields of a lead, with $spam set to the marker for suspected spam."""
+    spam = templates["spam_marker"].substitute() if lead.suspected_spam else ""
+    return {**vars(lead), "spam": spam}
+
+
+def render_leads(leads: List[Lead], language: str) -> tuple:
+    """Render (subject, body) for one lead or a digest of several."""
+    templates = TEMPLATES.get(language, TEMPLATES[DEFAULT_LANGUAGE])
+    if len(leads) == 1:
+        fields = _lead_fields(leads[0], templates)
+        return (
+            templates["single_subject"].substitute(fields),
+            templates["single_body"].substitute(fields),
+        )
+    line = templates["digest_line"]
+    lines = "\n".join(line.substitute(_lead_fields(lead, templates)) for lead in leads)
+    return (
+        templates["digest_subject"].substitute(count=len(leads)),
+        templates["digest_body"].substitute(count=len(leads), lines=lines),
+    )
+
+
+def render_overdue(leads: List[Lead], language: str) -> tuple:
+    """Render (subject, body) for an SLA escalation of unacknowledged leads."""
+    templates = TEMPLATES.get(language, TEMPLATES[DEFAULT_LANGUAGE])
+    line = templates["digest_line"]
+    lines = "\n".join(line.substitute(_lead_fields(lead, templates)) for lead in leads)
+    return (
+        templates["overdue_subject"].substitute(count=len(leads)),
+        templates["overdue_body"].substitute(lines=lines),
+    )
+
+
+def header_safe(value: str) -> str:
+    """Collapse CR/LF and other whitespace runs: lead fields end up in the Subject header."""
+    return " ".join(value.split())
+
+
+def parse_recipients(raw: str) -> Dict[str, str]:
+    """Parse "email:lang[:firm],..." into {email: lang} (lang defaults to Hebrew)."""
+    recipients: Dict[str, str] = {}
+    for entry in raw.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        email, _, rest = entry.partition(":")
+        language = rest.partition(":")[0]
+        recipients[email.strip()] = language.strip() or DEFAULT_LANGUAGE
+    return recipients
+
+
+def parse_recipient_firms(raw: str) -> Dict[str, str]:
+    """
+    {email: firm} from "email:lang[:firm]" entries. Without a firm a lawyer
+    belongs to DEFAULT_FIRM_ID; ALL_FIRMS ("*") explicitly opts into every firm.
+    """
+    firms: Dict[str, str] = {}
+    for entry in raw.split(","):
+        email, _, rest = entry.strip().partition(":")
+        if email:
+            firm = rest.partition(":")[2].strip()
+            firms[email.strip()] = firm.lower() or DEFAULT_FIRM_ID
+    return firms
+
+
+# ===== SMTP connection pool =====
+
+class SMTPPool:
+    """
+    Bounded pool of persistent SMTP connections.
+
+    Connections are opened lazily, reused across messages (LIFO, so the
+    warmest connection is used first) and transparently reopened once if the
+    server dropped them while idle.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        size: int = 2,
+        username: str = "",
+        password: str = "",
+        start_tls: bool = False,
+        timeout: float = 10.0
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._idle: List[aiosmtplib.SMTP] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            start_tls=self.start_tls,
+            timeout=self.timeout
+        )
+        await client.connect()
+        if self.username:
+            await client.login(self.username, self.password)
+        self.connections_opened += 1
+        return client
+
+    async def send(self, message: EmailMessage) -> None:
+        async with self._slots:
+            client = self._idle.pop() if self._idle else None
+            try:
+                if client is None or not client.is_connected:
+                    client = await self._connect()
+                try:
+                    await client.send_message(message)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # Idle connection was closed server-side; retry once on a fresh one
+                    client = await self._connect()
+                    await client.send_message(message)
+            except BaseException:
+                if client is not None:
+                    client.close()
+                raise
+            self._idle.append(client)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for client in idle:
+            try:
+                await client.quit()
+            except aiosmtplib.SMTPException:
+                client.close()
+
+
+# ===== Latency reporting =====
+
+class LatencyStats:
+    """Per-message send latency (count, mean, max and recent percentiles)."""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._recent = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self._recent.append(seconds)
+
+    def summary(self) -> dict:
+        recent = sorted(self._recent)
+
+        def pct(p: float) -> Optional[float]:
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3)
+
+        return {
+            "sent": self.count,
+            "failed": self.failures,
+            "mean_ms": round(self.total_seconds / self.count * 1000, 3) if self.count else None,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(self.max_seconds * 1000, 3) if self.count else None,
+        }
+
+
+# ===== Notifier =====
+
+class LeadNotifier:
+    """
+    Groups bursts of new-lead notifications into one email per lawyer.
+
+    The first lead for a lawyer opens a digest window; every lead arriving
+    before it closes joins the same email. A lone lead is sent with the
+    single-lead template. Each recipient only gets the leads of its firm in
+    recipient_firms (DEFAULT_FIRM_ID when absent), unless mapped to ALL_FIRMS.
+    """
+
+    def __init__(
+        self,
+        pool: SMTPPool,
+        recipients: Dict[str, str],
+        sender: str,
+        window_seconds: float,
+        recipient_firms: Optional[Dict[str, str]] = None
+    ):
+        self.pool = pool
+        self.recipients = recipients
+        self.recipient_firms = recipient_firms or {}
+        self.sender = sender
+        self.window_seconds = window_seconds
+        self.latency = LatencyStats()
+        self._pending: Dict[str, List[Lead]] = {}
+        self._timers: Dict[str, asyncio.Task] = {}
+
+    def _recipients_for(self, firm_id: str) -> List[str]:
+        return [
+            recipient for recipient in self.recipients
+            if self.recipient_firms.get(recipient, DEFAULT_FIRM_ID) in (firm_id, ALL_FIRMS)
+        ]
+
+    def notify_new_lead(self, lead: Lead) -> None:
+        """Queue a lead for every lawyer of its firm (never blocks)."""
+        for recipient in self._recipients_for(lead.firm_id):
+            self._pending.setdefault(recipient, []).append(lead)
+            if recipient not in self._timers:
+                self._timers[recipient] = asyncio.create_task(self._flush_after(recipient))
+
+    async def notify_overdue(self, leads: List[Lead]) -> None:
+        """Send an escalation for one firm's overdue leads to its lawyers right away."""
+        if not leads:
+            return
+        await asyncio.gather(*(
+            self._send(recipient, partial(self._build_message, recipient, leads, render_overdue), len(leads))
+            for recipient in self._recipients_for(leads[0].firm_id)
+        ))
+
+    def _build_message(self, recipient: str, leads: List[Lead], render=render_leads) -> EmailMessage:
+        subject, body = render(leads, self.recipients.get(recipient, DEFAULT_LANGUAGE))
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = header_safe(subject)
+        message.set_content(body)
+        return message
+
+    async def _flush_after(self, recipient: str) -> None:
+        try:
+            await asyncio.sleep(self.window_seconds)
+        finally:
+            self._timers.pop(recipient, None)
+        await self._flush(recipient)
+
+    async def _flush(self, recipient: str) -> None:
+        leads = self._pending.pop(recipient, [])
+        if not leads:
+            return
+        await self._send(recipient, partial(self._build_message, recipient, leads), len(leads))
+
+    async def _send(self, recipient: str, build: Callable[[], EmailMessage], lead_count: int) -> None:
+        # The leads have already left _pending: whatever fails here (rendering,
+        # headers, SMTP) is logged and counted, never an unretrieved task error
+        started = time.perf_counter()
+        try:
+            await self.pool.send(build())
+        except Exception:
+            self.latency.failures += 1
+            logger.exception("Lead notification to %s failed (%d leads)", recipient, lead_count)
+            return
+        elapsed = time.perf_counter() - started
+        self.latency.record(elapsed)
+        logger.info(
+            "Lead notification sent to %s (%d leads) in %.1f ms",
+            recipient, lead_count, elapsed * 1000
+        )
+
+    async def drain(self) -> None:
+        """Send everything pending now (used at shutdown)."""
+        timers, self._timers = self._timers, {}
+        for task in timers.values():
+            task.cancel()
+        await asyncio.gather(*timers.values(), return_exceptions=True)
+        await asyncio.gather(*(self._flush(r) for r in list(self._pending)))
+
+    async def close(self) -> None:
+        await self.drain()
+        await self.pool.close()
+
+
+_notifier: Optional[LeadNotifier] = None
+
+def get_notifier() -> LeadNotifier:
+    """Process-wide notifier built from config on first use."""
+    global _notifier
+    if _notifier is None:
+        _notifier = LeadNotifier(
+            pool=SMTPPool(
+                SMTP_HOST,
+                SMTP_PORT,
+                size=SMTP_POOL_SIZE,
+                username=SMTP_USERNAME,
+                password=SMTP_PASSWORD,
+                start_tls=SMTP_STARTTLS
+            ),
+            recipients=parse_recipients(LEAD_NOTIFICATION_RECIPIENTS),
+            sender=NOTIFICATION_SENDER,
+            window_seconds=NOTIFICATION_DIGEST_WINDOW_SECONDS,
+            recipient_firms=parse_recipient_firms(LEAD_NOTIFICATION_RECIPIENTS)
+        )
+    return _notifier
@@ -3,7 +3,10 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, ATTACHMENT_UPLOAD_TOKEN_MINUTES
+
+# "scope" claim of upload tokens; lawyer access tokens carry no scope
+UPLOAD_SCOPE = "attachments.upload"
 
 # Password hashing context using bcrypt (slow, salted algorithm)
 # bcrypt is specifically designed for password hashing with built-in salt
@@ -49,20 +52,36 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def decode_access_token(token: str) -> Optional[str]:
+def decode_token_claims(token: str) -> Optional[dict]:
     """
     Decode and validate a JWT token.
-    
-    Args:
-        token: JWT token string
-    
+
     Returns:
-        The 'sub' (subject) claim from token, or None if invalid
+        The full claims payload (sub, firm, exp), or None if invalid
     """
     try:
-        # Decode JWT and extract payload
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        return email
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
+
+def create_upload_token(firm_id: str, ticket_id: int) -> str:
+    """
+    Short-lived token allowing attachment uploads to one ticket.
+
+    Returned to the client by POST /intake; ticket ids are sequential, so the
+    id alone must not be enough to attach files to someone else's ticket.
+    """
+    return create_access_token(
+        data={"sub": f"ticket:{ticket_id}", "firm": firm_id, "scope": UPLOAD_SCOPE},
+        expires_delta=timedelta(minutes=ATTACHMENT_UPLOAD_TOKEN_MINUTES)
+    )
+
+def verify_upload_token(token: Optional[str], firm_id: str, ticket_id: int) -> bool:
+    """True if token is a valid, unexpired upload token for this firm's ticket."""
+    claims = decode_token_claims(token) if token else None
+    return (
+        claims is not None
+        and claims.get("scope") == UPLOAD_SCOPE
+        and claims.get("firm") == firm_id
+        and claims.get("sub") == f"ticket:{ticket_id}"
+    )
@@ -0,0 +1,239 @@
+# Incrementally maintained intake analytics (ticket_stats_daily rollup)
+import asyncio
+import datetime
+import sys
+from typing import Optional
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Ticket, TicketStatsDaily
+
+# Status every ticket starts in; leaving it counts as "acknowledged"
+NEW_STATUS = "New"
+
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    """Normalize a timestamp to aware UTC (naive values are assumed UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+def bucket_day(created_at: datetime.datetime) -> datetime.date:
+    """
+    Map a ticket's created_at to its rollup day.
+
+    Always bucketed in UTC so incremental writes and full rebuilds agree
+    regardless of the database session timezone.
+    """
+    return _as_utc(created_at).date()
+
+
+def seconds_between(start: datetime.datetime, end: datetime.datetime) -> int:
+    """Whole seconds from start to end, tolerant of naive/aware mixes."""
+    return int((_as_utc(end) - _as_utc(start)).total_seconds())
+
+
+def _insert_for(db: AsyncSession):
+    """Pick the dialect-specific INSERT that supports ON CONFLICT upserts."""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert
+    return postgresql.insert
+
+
+async def _bump(
+    db: AsyncSession,
+    firm_id: str,
+    day: datetime.date,
+    status: str,
+    urgency_level: str,
+    tickets: int = 0,
+    ack_count: int = 0,
+    ack_seconds: int = 0
+) -> None:
+    """
+    Atomically add deltas to one rollup row (INSERT ... ON CONFLICT DO UPDATE).
+
+    Runs on the caller's session so the rollup commits or rolls back together
+    with the ticket write that caused it.
+    """
+    insert = _insert_for(db)
+    stmt = insert(TicketStatsDaily).values(
+        firm_id=firm_id,
+        day=day,
+        status=status,
+        urgency_level=urgency_level,
+        ticket_count=tickets,
+        ack_count=ack_count,
+        ack_seconds_total=ack_seconds
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["firm_id", "day", "status", "urgency_level"],
+        set_={
+            "ticket_count": TicketStatsDaily.ticket_count + stmt.excluded.ticket_count,
+            "ack_count": TicketStatsDaily.ack_count + stmt.excluded.ack_count,
+            "ack_seconds_total": TicketStatsDaily.ack_seconds_total + stmt.excluded.ack_seconds_total,
+        }
+    )
+    await db.execute(stmt)
+
+
+async def record_ticket_created(db: AsyncSession, ticket: Ticket) -> None:
+    """Count a freshly flushed ticket in its (firm, day, status, urgency) bucket."""
+    await _bump(
+        db,
+        ticket.firm_id,
+        bucket_day(ticket.created_at),
+        ticket.status,
+        ticket.urgency_level,
+        tickets=1
+    )
+
+
+async def record_status_change(
+    db: AsyncSession,
+    ticket: Ticket,
+    old_status: str,
+    acknowledged_seconds: Optional[int] = None
+) -> None:
+    """
+    Move a ticket between status buckets after a transition.
+
+    acknowledged_seconds is passed only on the ticket's first transition out
+    of "New" and feeds the time-to-acknowledge accumulators.
+    """
+    day = bucket_day(ticket.created_at)
+    await _bump(db, ticket.firm_id, day, old_status, ticket.urgency_level, tickets=-1)
+    await _bump(
+        db,
+        ticket.firm_id,
+        day,
+        ticket.status,
+        ticket.urgency_level,
+        tickets=1,
+        ack_count=1 if acknowledged_seconds is not None else 0,
+        ack_seconds=acknowledged_seconds or 0
+    )
+
+
+async def get_stats(
+    db: AsyncSession,
+    start: datetime.date,
+    end: datetime.date
+) -> dict:
+    """
+    Summarize the rollup for [start, end] (inclusive).
+
+    Reads at most days x statuses x urgencies rows - independent of the
+    number of tickets in the range. A firm-scoped session sees only that
+    firm's rollup rows.
+    """
+    result = await db.execute(
+        select(TicketStatsDaily).where(
+            TicketStatsDaily.day >= start,
+            TicketStatsDaily.day <= end
+        )
+    )
+
+    by_status: dict = {}
+    by_urgency: dict = {}
+    by_day: dict = {}
+    ack_count = 0
+    ack_seconds = 0
+    for row in result.scalars():
+        if row.ticket_count:
+            by_status[row.status] = by_status.get(row.status, 0) + row.ticket_count
+            by_urgency[row.urgency_level] = by_urgency.get(row.urgency_level, 0) + row.ticket_count
+            key = row.day.isoformat()
+            by_day[key] = by_day.get(key, 0) + row.ticket_count
+        ack_count += row.ack_count
+        ack_seconds += row.ack_seconds_total
+
+    return {
+        "start": start,
+        "end": end,
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_urgency": by_urgency,
+        "by_day": dict(sorted(by_day.items())),
+        "acknowledged": ack_count,
+        "avg_time_to_acknowledge_seconds": (ack_seconds / ack_count) if ack_count else None,
+    }
+
+
+async def rebuild_stats(db: AsyncSession, batch_size: int = 1000) -> int:
+    """
+    Recompute ticket_stats_daily from the tickets table.
+
+    Streams tickets in batches, aggregates in memory (one entry per bucket)
+    and swaps the rollup contents in a single transaction. On an unscoped
+    shard session this rebuilds every firm on the shard.
+    Returns the number of tickets counted.
+
+    On PostgreSQL the rollup is locked against writes (reads still work)
+    before the scan: intake and status changes bump the rollup in the same
+    transaction as the ticket write, so they wait for the swap instead of
+    committing an increment the rebuild would then discard.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text(f"LOCK TABLE {TicketStatsDaily.__tablename__} IN EXCLUSIVE MODE"))
+
+    buckets: dict = {}
+    counted = 0
+    stream = await db.stream(
+        select(
+            Ticket.firm_id,
+            Ticket.created_at,
+            Ticket.status,
+            Ticket.urgency_level,
+            Ticket.acknowledged_at
+        )
+        .where(Ticket.is_deleted.is_(False))
+        .execution_options(yield_per=batch_size)
+    )
+    async for firm_id, created_at, status, urgency_level, acknowledged_at in stream:
+        key = (firm_id, bucket_day(created_at), status, urgency_level)
+        bucket = buckets.setdefault(key, [0, 0, 0])
+        bucket[0] += 1
+        if acknowledged_at is not None:
+            bucket[1] += 1
+            bucket[2] += seconds_between(created_at, acknowledged_at)
+        counted += 1
+
+    await db.execute(delete(TicketStatsDaily))
+    if buckets:
+        await db.execute(
+            TicketStatsDaily.__table__.insert(),
+            [
+                {
+                    "firm_id": firm_id,
+                    "day": day,
+                    "status": status,
+                    "urgency_level": urgency_level,
+                    "ticket_count": tickets,
+                    "ack_count": acks,
+                    "ack_seconds_total": ack_seconds,
+                }
+                for (firm_id, day, status, urgency_level), (tickets, acks, ack_seconds) in buckets.items()
+            ]
+        )
+    await db.commit()
+    return counted
+
+
+async def _main(argv: list) -> int:
+    from app.core.tenancy import shard_router
+
+    if argv[1:] != ["rebuild"]:
+        print("Usage: python -m app.core.stats rebuild", file=sys.stderr)
+        return 2
+    for shard in shard_router.shards:
+        async with shard_router.shard_session(shard) as session:
+            counted = await rebuild_stats(session)
+        print(f"Rebuilt ticket_stats_daily on shard {shard} from {counted} tickets")
+    await shard_router.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv)))
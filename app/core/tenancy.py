@@ -0,0 +1,274 @@
+# Multi-tenant routing: firm resolution, hash-sharded engines and tenant-scoped sessions
+import hashlib
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional
+from fastapi import HTTPException, Request, status
+from sqlalchemy import String, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Mapped, Session, mapped_column, with_loader_criteria
+from app.core.config import (
+    DATABASE_SHARDS,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DEFAULT_FIRM_ID,
+    FIRM_HOSTS,
+    FIRM_IDS,
+    FIRM_SHARD_OVERRIDES,
+    TENANT_BASE_DOMAIN,
+)
+from app.core.security import decode_token_claims
+
+# Lowercase slug, e.g. "cohen-levi" (appears in URLs and hostnames)
+FIRM_ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9-]{0,63}$")
+# Literal /intake/... path segments that must never be taken for a firm
+RESERVED_FIRM_IDS = frozenset({"schema"})
+
+DEFAULT_SHARD = "default"
+
+
+# ===== Configuration parsing =====
+
+def parse_mapping(raw: str) -> Dict[str, str]:
+    """Parse "key:value,key:value" (whitespace tolerant)."""
+    mapping: Dict[str, str] = {}
+    for entry in raw.split(","):
+        key, _, value = entry.strip().partition(":")
+        if key and value:
+            mapping[key.strip().lower()] = value.strip()
+    return mapping
+
+
+def parse_shards(raw: str, default_url: str = DATABASE_URL) -> Dict[str, str]:
+    """
+    Parse "name=DSN,name=DSN" into {name: DSN}.
+
+    Without DATABASE_SHARDS the deployment has a single shard on DATABASE_URL.
+    """
+    shards: Dict[str, str] = {}
+    for entry in raw.split(","):
+        name, _, dsn = entry.strip().partition("=")
+        if name and dsn:
+            shards[name.strip()] = dsn.strip()
+    return shards or {DEFAULT_SHARD: default_url}
+
+
+def parse_firm_ids(raw: str, default_firm: str = DEFAULT_FIRM_ID, multi_tenant: bool = False) -> FrozenSet[str]:
+    """
+    The firms requests may resolve to: FIRM_IDS plus DEFAULT_FIRM_ID.
+
+    Without FIRM_IDS the deployment serves DEFAULT_FIRM_ID only, so a
+    multi-tenant setup (shards, overrides, intake hosts) must list its firms;
+    anything else is a configuration error.
+    """
+    firms = {f.strip().lower() for f in raw.split(",") if f.strip()}
+    if multi_tenant and not firms:
+        raise ValueError("FIRM_IDS must list the firms when multi-tenant routing is configured")
+    firms.add(default_firm.lower())
+    invalid = sorted(f for f in firms if not FIRM_ID_PATTERN.match(f) or f in RESERVED_FIRM_IDS)
+    if invalid:
+        raise ValueError(f"Invalid firm ids: {invalid}")
+    return frozenset(firms)
+
+
+def rendezvous_shard(firm_id: str, shard_names: Iterable[str]) -> str:
+    """
+    Highest-random-weight (rendezvous) hash of a firm onto a shard.
+
+    Adding a shard only moves the firms that now hash to it; every other
+    firm keeps its shard.
+    """
+    def weight(shard: str) -> bytes:
+        return hashlib.sha256(f"{shard}\x00{firm_id}".encode("utf-8")).digest()
+
+    return max(shard_names, key=weight)
+
+
+# ===== Shard router =====
+
+class ShardRouter:
+    """
+    Maps firms to database shards and owns one engine (pool) per shard.
+
+    A firm's shard is its FIRM_SHARD_OVERRIDES entry if present, otherwise
+    its rendezvous hash over the configured shards - so moving a large firm
+    to a dedicated database is a config change (copy its rows, add the shard
+    and the override), not a code change. Engines are created on first use.
+    """
+
+    def __init__(
+        self,
+        shards: Dict[str, str],
+        overrides: Optional[Dict[str, str]] = None,
+        pool_size: int = DB_POOL_SIZE,
+        max_overflow: int = DB_MAX_OVERFLOW,
+        **engine_kwargs
+    ):
+        unknown = set((overrides or {}).values()) - set(shards)
+        if unknown:
+            raise ValueError(f"FIRM_SHARD_OVERRIDES references unknown shards: {sorted(unknown)}")
+        self.dsns = shards
+        self.overrides = overrides or {}
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.engine_kwargs = engine_kwargs
+        # Only hash onto shards that aren't reserved for specific firms
+        dedicated = set(self.overrides.values())
+        self._hashed = sorted(set(shards) - dedicated) or sorted(shards)
+        self._engines: Dict[str, AsyncEngine] = {}
+        self._sessionmakers: Dict[str, async_sessionmaker] = {}
+
+    @property
+    def shards(self) -> List[str]:
+        return sorted(self.dsns)
+
+    def shard_for(self, firm_id: str) -> str:
+        return self.overrides.get(firm_id) or rendezvous_shard(firm_id, self._hashed)
+
+    def engine(self, shard: str) -> AsyncEngine:
+        engine = self._engines.get(shard)
+        if engine is None:
+            dsn = self.dsns[shard]
+            kwargs = dict(self.engine_kwargs)
+            if not dsn.startswith("sqlite"):
+                kwargs.setdefault("pool_size", self.pool_size)
+                kwargs.setdefault("max_overflow", self.max_overflow)
+                kwargs.setdefault("pool_pre_ping", True)
+            engine = self._engines[shard] = create_async_engine(dsn, **kwargs)
+        return engine
+
+    def sessionmaker(self, shard: str) -> async_sessionmaker:
+        maker = self._sessionmakers.get(shard)
+        if maker is None:
+            maker = self._sessionmakers[shard] = async_sessionmaker(
+                self.engine(shard),
+                class_=AsyncSession,
+                expire_on_commit=False
+            )
+        return maker
+
+    def session(self, firm_id: str) -> AsyncSession:
+        """Session on the firm's shard, scoped to that firm (see scoping below)."""
+        return self.sessionmaker(self.shard_for(firm_id))(info={"firm_id": firm_id})
+
+    def shard_session(self, shard: str) -> AsyncSession:
+        """Unscoped session on one shard, for cross-firm maintenance and startup tasks."""
+        return self.sessionmaker(shard)()
+
+    async def dispose(self) -> None:
+        for engine in self._engines.values():
+            await engine.dispose()
+
+
+# ===== Tenant-scoped ORM access =====
+
+class TenantScoped:
+    """
+    Mixin for every tenant-owned model.
+
+    In a session opened for a firm (ShardRouter.session), ORM SELECT, UPDATE
+    and DELETE statements are filtered to that firm and new objects are
+    stamped with it, so routers never have to repeat the firm filter.
+    """
+    firm_id: Mapped[str] = mapped_column(String(64), nullable=False)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_statement_to_firm(state) -> None:
+    firm_id = state.session.info.get("firm_id")
+    if firm_id is None or state.is_column_load or state.is_relationship_load:
+        return
+    if state.is_select or state.is_update or state.is_delete:
+        state.statement = state.statement.options(with_loader_criteria(
+            TenantScoped,
+            lambda cls: cls.firm_id == firm_id,
+            include_aliases=True
+        ))
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_new_objects_with_firm(session: Session, flush_context, instances) -> None:
+    firm_id = session.info.get("firm_id")
+    if firm_id is None:
+        return
+    for obj in session.new:
+        if not isinstance(obj, TenantScoped):
+            continue
+        if obj.firm_id is None:
+            obj.firm_id = firm_id
+        elif obj.firm_id != firm_id:
+            raise ValueError(f"Cannot write a {type(obj).__name__} for firm {obj.firm_id!r} in a {firm_id!r} session")
+
+
+# ===== Request tenant resolution =====
+
+def firm_from_host(host: str) -> Optional[str]:
+    """Firm for an intake host: explicit FIRM_HOSTS entry or <firm>.<TENANT_BASE_DOMAIN>."""
+    host = host.split(":", 1)[0].lower()
+    if host in _FIRM_HOSTS:
+        return _FIRM_HOSTS[host]
+    if TENANT_BASE_DOMAIN and host.endswith("." + TENANT_BASE_DOMAIN.lower()):
+        subdomain = host[:-len(TENANT_BASE_DOMAIN) - 1]
+        if "." not in subdomain:
+            return subdomain
+    return None
+
+
+def _check_firm(firm_id: str) -> str:
+    # Public intake creates per-firm state (dedupe index, tickets), so only
+    # configured firms are accepted
+    if firm_id not in _KNOWN_FIRMS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown firm"
+        )
+    return firm_id
+
+
+def _bearer_claims(request: Request) -> Optional[dict]:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return decode_token_claims(token)
+
+
+def resolve_firm_id(request: Request) -> str:
+    """
+    Which firm a request belongs to, in order of precedence:
+
+    1. A `firm_id` path parameter (e.g. POST /intake/{firm_id})
+    2. The `firm` claim of a valid bearer token (lawyer requests)
+    3. The request host (FIRM_HOSTS or a TENANT_BASE_DOMAIN subdomain)
+    4. DEFAULT_FIRM_ID
+
+    Resolved once per request and cached on request.state.
+    """
+    cached = getattr(request.state, "firm_id", None)
+    if cached is not None:
+        return cached
+
+    firm_id = request.path_params.get("firm_id")
+    if firm_id is None:
+        claims = _bearer_claims(request)
+        if claims is not None:
+            firm_id = claims.get("firm", DEFAULT_FIRM_ID)
+    if firm_id is None:
+        firm_id = firm_from_host(request.headers.get("host", "")) or DEFAULT_FIRM_ID
+
+    request.state.firm_id = _check_firm(firm_id.lower())
+    return request.state.firm_id
+
+
+_FIRM_HOSTS = {host: firm.lower() for host, firm in parse_mapping(FIRM_HOSTS).items()}
+_SHARD_OVERRIDES = parse_mapping(FIRM_SHARD_OVERRIDES)
+_KNOWN_FIRMS = parse_firm_ids(
+    FIRM_IDS,
+    multi_tenant=bool(
+        len(parse_shards(DATABASE_SHARDS)) > 1 or _SHARD_OVERRIDES or _FIRM_HOSTS or TENANT_BASE_DOMAIN
+    )
+)
+
+shard_router = ShardRouter(
+    parse_shards(DATABASE_SHARDS),
+    overrides={firm: shard for firm, shard in _SHARD_OVERRIDES.items()}
+)
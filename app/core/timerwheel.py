@@ -0,0 +1,103 @@
+# Hierarchical timer wheel: O(1) insert/cancel for very large numbers of deadlines
+from typing import Any, Dict, Hashable, List, Tuple
+
+
+class HierarchicalTimerWheel:
+    """
+    Timers keyed by an arbitrary hashable (e.g. a ticket id), measured in
+    integer ticks.
+
+    Level L has `2**slot_bits` slots, each spanning `2**(slot_bits*L)` ticks.
+    A timer is placed in the lowest level whose range covers its delay and
+    cascades down a level each time that level's slot comes round, so
+    insert and cancel are O(1) and advancing costs O(expired + cascaded).
+
+    With the defaults (64 slots x 4 levels) one wheel covers 64**4 ticks -
+    ~194 days at one-second ticks. Longer timers park in the top level and
+    are re-placed on each cascade until they come into range.
+    """
+
+    def __init__(self, start_tick: int, slot_bits: int = 6, levels: int = 4):
+        self._bits = slot_bits
+        self._mask = (1 << slot_bits) - 1
+        self._levels = levels
+        self._span = 1 << (slot_bits * levels)
+        self._slots: List[List[Dict[Hashable, Tuple[int, Any]]]] = [
+            [{} for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        # key -> (level, slot) for O(1) cancel; level -1 means "due now"
+        self._where: Dict[Hashable, Tuple[int, int]] = {}
+        self._due: Dict[Hashable, Tuple[int, Any]] = {}
+        self.current_tick = start_tick
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def _place(self, key: Hashable, expiry: int, payload: Any) -> None:
+        delta = expiry - self.current_tick
+        if delta <= 0:
+            self._due[key] = (expiry, payload)
+            self._where[key] = (-1, 0)
+            return
+        # Out-of-range timers park at the top level's furthest slot
+        placement = min(expiry, self.current_tick + self._span - 1)
+        delta = placement - self.current_tick
+        level = 0
+        while delta >= 1 << (self._bits * (level + 1)):
+            level += 1
+        slot = (placement >> (self._bits * level)) & self._mask
+        self._slots[level][slot][key] = (expiry, payload)
+        self._where[key] = (level, slot)
+
+    def schedule(self, key: Hashable, expiry_tick: int, payload: Any = None) -> None:
+        """Add or replace the timer for `key`."""
+        self.cancel(key)
+        self._place(key, expiry_tick, payload)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Remove the timer for `key`; returns False if there was none."""
+        where = self._where.pop(key, None)
+        if where is None:
+            return False
+        level, slot = where
+        if level < 0:
+            del self._due[key]
+        else:
+            del self._slots[level][slot][key]
+        return True
+
+    def advance(self, now_tick: int) -> List[Tuple[Hashable, Any]]:
+        """Move time forward to `now_tick`, returning expired (key, payload)s."""
+        expired: List[Tuple[Hashable, Any]] = []
+        self._collect_due(expired)
+        while self.current_tick < now_tick:
+            self.current_tick += 1
+            tick = self.current_tick
+            # Cascade every level whose slot boundary is crossed, highest first
+            cascading = [
+                level for level in range(1, self._levels)
+                if tick & ((1 << (self._bits * level)) - 1) == 0
+            ]
+            for level in reversed(cascading):
+                slot = (tick >> (self._bits * level)) & self._mask
+                entries, self._slots[level][slot] = self._slots[level][slot], {}
+                for key, (expiry, payload) in entries.items():
+                    self._place(key, expiry, payload)
+            bucket = self._slots[0][tick & self._mask]
+            if bucket:
+                self._slots[0][tick & self._mask] = {}
+                for key, (_, payload) in bucket.items():
+                    del self._where[key]
+                    expired.append((key, payload))
+            self._collect_due(expired)
+        return expired
+
+    def _collect_due(self, expired: List[Tuple[Hashable, Any]]) -> None:
+        if self._due:
+            for key, (_, payload) in self._due.items():
+                del self._where[key]
+                expired.append((key, payload))
+            self._due = {}
@@ -0,0 +1,169 @@
+# Streaming multipart parser: request body -> blob store, no in-memory buffering
+from dataclasses import dataclass
+from typing import List, Optional
+import python_multipart
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import parse_options_header
+from fastapi import HTTPException, Request, status
+from app.core.blobstore import BlobStore, BlobWriter
+
+# Form field that carries the file
+FILE_FIELD = "file"
+
+
+@dataclass
+class StoredUpload:
+    """Result of a streamed upload (the blob is already committed)."""
+    sha256: str
+    size: int
+    filename: str
+    content_type: str
+
+
+class _FilePartCollector:
+    """
+    python-multipart callbacks for a single file part.
+
+    Callbacks are synchronous, so they only slice data into `pending`;
+    the async caller drains it to the blob store between body chunks.
+    """
+
+    def __init__(self):
+        self.pending: List[bytes] = []
+        self.filename: Optional[str] = None
+        self.content_type = "application/octet-stream"
+        self.in_file_part = False
+        self.seen_file = False
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: dict = {}
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        self.in_file_part = name == FILE_FIELD and not self.seen_file
+        if self.in_file_part:
+            self.seen_file = True
+            filename = options.get(b"filename", b"")
+            self.filename = filename.decode("utf-8", errors="replace") or "upload"
+            content_type = self._headers.get(b"content-type")
+            if content_type:
+                self.content_type = content_type.decode("latin-1")
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self.in_file_part:
+            self.pending.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        self.in_file_part = False
+
+
+async def _drain(
+    collector: _FilePartCollector,
+    writer: BlobWriter,
+    buffer: bytearray,
+    chunk_size: int,
+    max_bytes: int,
+    final: bool = False
+) -> None:
+    """Move parsed bytes into fixed-size chunks and write them out."""
+    for piece in collector.pending:
+        if writer.size + len(buffer) + len(piece) > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Attachment exceeds {max_bytes} bytes"
+            )
+        buffer.extend(piece)
+        while len(buffer) >= chunk_size:
+            await writer.write(bytes(buffer[:chunk_size]))
+            del buffer[:chunk_size]
+    collector.pending.clear()
+    if final and buffer:
+        await writer.write(bytes(buffer))
+        buffer.clear()
+
+
+async def stream_upload_to_store(
+    request: Request,
+    store: BlobStore,
+    max_bytes: int,
+    chunk_size: int
+) -> StoredUpload:
+    """
+    Parse a multipart/form-data body as it arrives and stream the `file`
+    part into the blob store.
+
+    - Hashes (SHA-256) and size-checks incrementally
+    - Memory stays at roughly one chunk regardless of file size
+    - Partial blobs are discarded on any error
+    """
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected multipart/form-data with a boundary"
+        )
+
+    # Reject obviously oversized bodies before reading anything
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + 64 * 1024:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Attachment exceeds {max_bytes} bytes"
+        )
+
+    collector = _FilePartCollector()
+    parser = python_multipart.MultipartParser(boundary, {
+        "on_part_begin": collector.on_part_begin,
+        "on_header_field": collector.on_header_field,
+        "on_header_value": collector.on_header_value,
+        "on_header_end": collector.on_header_end,
+        "on_headers_finished": collector.on_headers_finished,
+        "on_part_data": collector.on_part_data,
+        "on_part_end": collector.on_part_end,
+    })
+    writer = store.open_writer()
+    buffer = bytearray()
+    try:
+        async for body_chunk in request.stream():
+            parser.write(body_chunk)
+            await _drain(collector, writer, buffer, chunk_size, max_bytes)
+        parser.finalize()
+        await _drain(collector, writer, buffer, chunk_size, max_bytes, final=True)
+        if not collector.seen_file:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Missing '{FILE_FIELD}' form field"
+            )
+        sha256 = await writer.commit()
+    except FormParserError:
+        await writer.abort()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid multipart data"
+        )
+    except BaseException:
+        await writer.abort()
+        raise
+
+    return StoredUpload(
+        sha256=sha256,
+        size=writer.size,
+        filename=collector.filename,
+        content_type=collector.content_type
+    )
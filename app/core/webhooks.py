@@ -0,0 +1,596 @@
+# Outbound webhooks: per-subscriber queues, batched HMAC-signed POSTs, retries and circuit breakers
+import asyncio
+import datetime
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import random
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+import httpx
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import (
+    WEBHOOK_ALLOW_PRIVATE_URLS,
+    WEBHOOK_BACKOFF_BASE_SECONDS,
+    WEBHOOK_BACKOFF_MAX_SECONDS,
+    WEBHOOK_BATCH_WINDOW_SECONDS,
+    WEBHOOK_BREAKER_FAILURES,
+    WEBHOOK_BREAKER_RESET_SECONDS,
+    WEBHOOK_MAX_ATTEMPTS,
+    WEBHOOK_MAX_CONNECTIONS,
+    WEBHOOK_QUEUE_SIZE,
+    WEBHOOK_RELOAD_SECONDS,
+    WEBHOOK_TIMEOUT_SECONDS,
+)
+from app.core.tenancy import ShardRouter, shard_router
+from app.models import Ticket, WebhookDelivery, WebhookSubscription
+
+logger = logging.getLogger(__name__)
+
+TICKET_CREATED = "ticket.created"
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+DELIVERY_ID_HEADER = "X-Webhook-Id"
+
+# Client errors worth retrying; any other 4xx is permanent
+_RETRYABLE_STATUS = {408, 409, 425, 429}
+
+
+# ===== Events and signing =====
+
+@dataclass(frozen=True)
+class WebhookEvent:
+    """One event as it appears in a webhook payload."""
+    id: str
+    type: str
+    created_at: str
+    data: Dict[str, Any]
+
+    @classmethod
+    def ticket_created(cls, ticket: Ticket) -> "WebhookEvent":
+        return cls(
+            id=str(uuid.uuid4()),
+            type=TICKET_CREATED,
+            created_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            data={
+                "ticket_id": ticket.id,
+                "client_name": ticket.client_name,
+                "client_email": ticket.client_email,
+                "client_phone": ticket.client_phone,
+                "event_summary": ticket.event_summary,
+                "urgency_level": ticket.urgency_level,
+                "status": ticket.status,
+                "duplicate_of_id": ticket.duplicate_of_id,
+                "is_spam": ticket.is_spam,
+                "created_at": ticket.created_at.isoformat(),
+            },
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type, "created_at": self.created_at, "data": self.data}
+
+
+def sign_payload(secret: str, timestamp: int, body: bytes) -> str:
+    """
+    Signature header value: "t=<unix ts>,v1=<hex HMAC-SHA256 of 't.body'>".
+
+    The timestamp is covered by the MAC so receivers can reject replays.
+    """
+    mac = hmac.new(secret.encode("utf-8"), f"{timestamp}.".encode("ascii") + body, hashlib.sha256)
+    return f"t={timestamp},v1={mac.hexdigest()}"
+
+
+def verify_signature(
+    secret: str,
+    header: str,
+    body: bytes,
+    tolerance_seconds: int = 300,
+    now: Optional[float] = None
+) -> bool:
+    """Receiver-side check of a signature header (used by tests and integrators)."""
+    try:
+        parts = dict(item.split("=", 1) for item in header.split(","))
+        timestamp = int(parts["t"])
+    except (KeyError, ValueError):
+        return False
+    if abs((now if now is not None else time.time()) - timestamp) > tolerance_seconds:
+        return False
+    expected = sign_payload(secret, timestamp, body)
+    return hmac.compare_digest(expected, header)
+
+
+# ===== Endpoint safety =====
+
+class UnsafeWebhookURL(ValueError):
+    """The URL is not https or resolves to a non-public address."""
+
+
+async def _resolve(host: str, port: int) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+async def check_webhook_url(url: str, allow_private: bool = WEBHOOK_ALLOW_PRIVATE_URLS) -> Optional[str]:
+    """
+    Refuse endpoints that would turn deliveries (which carry client PII) into
+    SSRF: anything but https, and hosts resolving to loopback, private,
+    link-local (e.g. 169.254.169.254) or otherwise non-global addresses.
+
+    Returns the checked address to connect to (None when allow_private
+    skips the check). Resolution errors (socket.gaierror) propagate.
+    """
+    if allow_private:
+        return None
+    parsed = httpx.URL(url)
+    if parsed.scheme != "https":
+        raise UnsafeWebhookURL("webhook URLs must use https")
+    try:
+        addresses = [str(ipaddress.ip_address(parsed.host))]
+    except ValueError:
+        addresses = await _resolve(parsed.host, parsed.port or 443)
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+            ip = ip.ipv4_mapped
+        if not ip.is_global:
+            raise UnsafeWebhookURL(f"{parsed.host} resolves to non-public address {ip}")
+    return addresses[0].split("%", 1)[0]
+
+
+def pin_request(url: str, address: Optional[str]) -> Tuple[httpx.URL, Dict[str, str], Dict[str, Any]]:
+    """
+    (url, headers, extensions) that dial `address` - the one check_webhook_url
+    approved - instead of letting httpx resolve the host a second time (a DNS
+    rebind in between would otherwise reach an internal host). Host header
+    and TLS SNI/certificate check keep the original hostname.
+    """
+    parsed = httpx.URL(url)
+    if address is None or address == parsed.host:
+        return parsed, {}, {}
+    return (
+        parsed.copy_with(host=address),
+        {"Host": parsed.netloc.decode("ascii")},
+        {"sni_hostname": parsed.host},
+    )
+
+
+# ===== Retry policy =====
+
+def backoff_delay(
+    attempt: int,
+    base: float = WEBHOOK_BACKOFF_BASE_SECONDS,
+    cap: float = WEBHOOK_BACKOFF_MAX_SECONDS,
+    rng: Callable[[], float] = random.random
+) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**(attempt-1))]."""
+    return rng() * min(cap, base * (2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint breaker: closed -> open after `failure_threshold`
+    consecutive failures; after `reset_seconds` one trial request is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = WEBHOOK_BREAKER_FAILURES,
+        reset_seconds: float = WEBHOOK_BREAKER_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until a request may be attempted (0 unless open)."""
+        if self.state != self.OPEN:
+            return 0.0
+        return self.reset_seconds - (self._clock() - self._opened_at)
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+
+
+# ===== Subscribers =====
+
+@dataclass(frozen=True)
+class Subscriber:
+    """Immutable snapshot of an active WebhookSubscription row."""
+    id: int
+    firm_id: str
+    url: str
+    secret: str
+    event_types: FrozenSet[str]
+    batch_size: int
+
+    @classmethod
+    def from_row(cls, row: WebhookSubscription) -> "Subscriber":
+        return cls(
+            id=row.id,
+            firm_id=row.firm_id,
+            url=row.url,
+            secret=row.secret,
+            event_types=frozenset(t.strip() for t in row.event_types.split(",") if t.strip()),
+            batch_size=max(1, row.max_batch_size) if row.supports_batching else 1,
+        )
+
+
+@dataclass
+class _Outbox:
+    """A subscriber's queue, worker task and breaker."""
+    subscriber: Subscriber
+    queue: asyncio.Queue
+    breaker: CircuitBreaker
+    task: Optional[asyncio.Task] = None
+    dropped: int = 0
+    delivered: int = 0
+    failed: int = 0
+    in_flight: int = 0
+
+
+class WebhookDispatcher:
+    """
+    Fans a firm's events out to its matching subscribers without blocking the caller.
+
+    - publish() only enqueues; each subscriber has its own bounded queue and
+      worker, so a slow CRM never delays intake or other subscribers
+    - All workers share one pooled httpx.AsyncClient (keep-alive connections)
+    - Batching subscribers get up to batch_size events per POST, collected
+      for at most batch_window seconds
+    - Failed POSTs retry with exponential backoff + jitter; a per-endpoint
+      circuit breaker pauses deliveries to an endpoint that keeps failing
+    - Every attempt is written to the firm's webhook_deliveries log via
+      session_for(firm_id)
+    - Before each POST the endpoint is re-checked (check_webhook_url) and
+      dialled at the checked address (pin_request), and the
+      subscription's is_active re-read, so a subscription deleted through
+      another worker stops receiving events at once; subscriptions are also
+      reloaded from every shard each reload_seconds to pick up new ones
+    """
+
+    def __init__(
+        self,
+        session_for: Optional[Callable[[str], AsyncSession]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        batch_window: float = WEBHOOK_BATCH_WINDOW_SECONDS,
+        queue_size: int = WEBHOOK_QUEUE_SIZE,
+        max_attempts: int = WEBHOOK_MAX_ATTEMPTS,
+        backoff: Callable[[int], float] = backoff_delay,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+        router: Optional[ShardRouter] = None,
+        reload_seconds: float = WEBHOOK_RELOAD_SECONDS,
+        allow_private_urls: bool = WEBHOOK_ALLOW_PRIVATE_URLS
+    ):
+        self.session_for = session_for
+        self.client = client or httpx.AsyncClient(
+            timeout=WEBHOOK_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=WEBHOOK_MAX_CONNECTIONS,
+                max_keepalive_connections=WEBHOOK_MAX_CONNECTIONS,
+                keepalive_expiry=60
+            ),
+            headers={"User-Agent": "legal-intake-webhooks/1.0"}
+        )
+        self.batch_window = batch_window
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.breaker_factory = breaker_factory
+        self.router = router
+        self.reload_seconds = reload_seconds
+        self.allow_private_urls = allow_private_urls
+        self._reload_task: Optional[asyncio.Task] = None
+        # Subscription ids are only unique per shard, so outboxes are keyed by firm too
+        self._outboxes: Dict[Tuple[str, int], _Outbox] = {}
+
+    # ----- Subscriptions -----
+
+    def add(self, subscriber: Subscriber) -> None:
+        """Start (or update) delivery to a subscriber."""
+        key = (subscriber.firm_id, subscriber.id)
+        outbox = self._outboxes.get(key)
+        if outbox is not None:
+            outbox.subscriber = subscriber
+            return
+        outbox = _Outbox(subscriber, asyncio.Queue(self.queue_size), self.breaker_factory())
+        outbox.task = asyncio.create_task(self._worker(outbox))
+        self._outboxes[key] = outbox
+
+    def remove(self, firm_id: str, subscription_id: int) -> None:
+        """Stop delivering to a subscriber; queued events are discarded."""
+        outbox = self._outboxes.pop((firm_id, subscription_id), None)
+        if outbox is not None and outbox.task is not None:
+            outbox.task.cancel()
+
+    async def load(self, db: AsyncSession) -> int:
+        """
+        Sync with one shard's subscriptions: start (or update) a worker for each
+        active one, stop those deactivated since. Returns the active count.
+        """
+        rows = await db.execute(select(WebhookSubscription))
+        count = 0
+        for row in rows.scalars():
+            if row.is_active:
+                self.add(Subscriber.from_row(row))
+                count += 1
+            else:
+                self.remove(row.firm_id, row.id)
+        return count
+
+    async def _load_all(self) -> int:
+        count = 0
+        for shard in self.router.shards:
+            async with self.router.shard_session(shard) as db:
+                count += await self.load(db)
+        return count
+
+    async def _reload(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_seconds)
+            try:
+                await self._load_all()
+            except Exception:
+                logger.exception("Reloading webhook subscriptions failed")
+
+    async def start(self) -> None:
+        """Load every shard's subscriptions, then keep them in sync (called at startup)."""
+        logger.info("Webhook dispatcher started with %d subscribers", await self._load_all())
+        self._reload_task = asyncio.create_task(self._reload())
+
+    # ----- Publishing -----
+
+    def publish(self, firm_id: str, event: WebhookEvent) -> None:
+        """Queue an event for every subscriber of the firm and type (never blocks)."""
+        for outbox in self._outboxes.values():
+            subscriber = outbox.subscriber
+            if subscriber.firm_id != firm_id or event.type not in subscriber.event_types:
+                continue
+            try:
+                outbox.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                outbox.dropped += 1
+                logger.error(
+                    "Webhook queue for subscription %d is full; dropped event %s",
+                    outbox.subscriber.id, event.id
+                )
+
+    # ----- Delivery -----
+
+    async def _next_batch(self, outbox: _Outbox) -> List[WebhookEvent]:
+        batch = [await outbox.queue.get()]
+        size = outbox.subscriber.batch_size
+        if size > 1:
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(outbox.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        return batch
+
+    async def _worker(self, outbox: _Outbox) -> None:
+        while True:
+            batch = await self._next_batch(outbox)
+            outbox.in_flight = len(batch)
+            try:
+                if await self.deliver(outbox, batch):
+                    outbox.delivered += len(batch)
+                else:
+                    outbox.failed += len(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                outbox.failed += len(batch)
+                logger.exception("Webhook worker for subscription %d failed a batch", outbox.subscriber.id)
+            finally:
+                outbox.in_flight = 0
+                for _ in batch:
+                    outbox.queue.task_done()
+
+    def _encode(self, subscriber: Subscriber, batch: List[WebhookEvent]) -> bytes:
+        if subscriber.batch_size > 1:
+            payload: Any = {"events": [event.as_dict() for event in batch]}
+        else:
+            payload = batch[0].as_dict()
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    async def _is_active(self, subscriber: Subscriber) -> bool:
+        """Re-read is_active (True without a database, or if the read fails)."""
+        if self.session_for is None:
+            return True
+        try:
+            async with self.session_for(subscriber.firm_id) as db:
+                return bool(await db.scalar(
+                    select(WebhookSubscription.is_active).where(WebhookSubscription.id == subscriber.id)
+                ))
+        except Exception:
+            logger.exception("Could not check subscription %d; delivering anyway", subscriber.id)
+            return True
+
+    async def deliver(self, outbox: _Outbox, batch: List[WebhookEvent]) -> bool:
+        """POST one batch until it succeeds, fails permanently or runs out of attempts."""
+        subscriber = outbox.subscriber
+        body = self._encode(subscriber, batch)
+        delivery_id = str(uuid.uuid4())
+
+        for attempt in range(1, self.max_attempts + 1):
+            wait = outbox.breaker.retry_after()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            if not await self._is_active(subscriber):
+                logger.info(
+                    "Subscription %d was deleted; dropping %d events",
+                    subscriber.id, len(batch)
+                )
+                self.remove(subscriber.firm_id, subscriber.id)
+                return False
+            status_code: Optional[int] = None
+            error: Optional[str] = None
+            retry_after = 0.0
+            started = time.perf_counter()
+            try:
+                # Resolved and checked on every attempt, then dialled by address
+                address = await check_webhook_url(subscriber.url, self.allow_private_urls)
+            except UnsafeWebhookURL as exc:
+                await self._log(subscriber, delivery_id, len(batch), attempt, False, None, f"Blocked: {exc}", 0)
+                logger.error("Webhook %s to subscription %d blocked: %s", delivery_id, subscriber.id, exc)
+                return False
+            except OSError as exc:
+                address, error = None, f"{type(exc).__name__}: {exc}"[:500]
+
+            url, pinned_headers, extensions = pin_request(subscriber.url, address)
+            headers = {
+                **pinned_headers,
+                "Content-Type": "application/json",
+                DELIVERY_ID_HEADER: delivery_id,
+                SIGNATURE_HEADER: sign_payload(subscriber.secret, int(time.time()), body),
+            }
+            try:
+                if error is None:
+                    response = await self.client.post(url, content=body, headers=headers, extensions=extensions)
+                    status_code = response.status_code
+                    if response.status_code == 429:
+                        retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            except httpx.HTTPError as exc:
+                error = f"{type(exc).__name__}: {exc}"[:500]
+            duration_ms = int((time.perf_counter() - started) * 1000)
+
+            succeeded = status_code is not None and 200 <= status_code < 300
+            await self._log(subscriber, delivery_id, len(batch), attempt, succeeded, status_code, error, duration_ms)
+            if succeeded:
+                outbox.breaker.record_success()
+                return True
+
+            outbox.breaker.record_failure()
+            permanent = status_code is not None and 400 <= status_code < 500 and status_code not in _RETRYABLE_STATUS
+            if permanent:
+                logger.error(
+                    "Webhook %s to subscription %d rejected with %d; not retrying",
+                    delivery_id, subscriber.id, status_code
+                )
+                return False
+            if attempt < self.max_attempts:
+                await asyncio.sleep(max(self.backoff(attempt), retry_after))
+
+        logger.error(
+            "Webhook %s to subscription %d failed after %d attempts (%d events)",
+            delivery_id, subscriber.id, self.max_attempts, len(batch)
+        )
+        return False
+
+    async def _log(
+        self,
+        subscriber: Subscriber,
+        delivery_id: str,
+        event_count: int,
+        attempt: int,
+        succeeded: bool,
+        status_code: Optional[int],
+        error: Optional[str],
+        duration_ms: int
+    ) -> None:
+        if self.session_for is None:
+            return
+        try:
+            async with self.session_for(subscriber.firm_id) as db:
+                await db.execute(insert(WebhookDelivery).values(
+                    firm_id=subscriber.firm_id,
+                    subscription_id=subscriber.id,
+                    delivery_id=delivery_id,
+                    event_count=event_count,
+                    attempt=attempt,
+                    succeeded=succeeded,
+                    status_code=status_code,
+                    error=error,
+                    duration_ms=duration_ms,
+                ))
+                await db.commit()
+        except Exception:
+            # The log must never stall deliveries
+            logger.exception("Could not record webhook delivery %s", delivery_id)
+
+    # ----- Lifecycle -----
+
+    def status(self, firm_id: str) -> List[Dict[str, Any]]:
+        """Queue depth, breaker state and counters per subscriber of a firm (this process)."""
+        return [
+            {
+                "subscription_id": outbox.subscriber.id,
+                "circuit": outbox.breaker.state,
+                "queued": outbox.queue.qsize() + outbox.in_flight,
+                "delivered": outbox.delivered,
+                "failed": outbox.failed,
+                "dropped": outbox.dropped,
+            }
+            for outbox in self._outboxes.values()
+            if outbox.subscriber.firm_id == firm_id
+        ]
+
+    async def drain(self, timeout: float) -> None:
+        """Wait (up to `timeout`) for queued events to be delivered."""
+        joins = [outbox.queue.join() for outbox in self._outboxes.values()]
+        if not joins:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*joins), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Webhook queues not drained within %.0fs; pending events are lost", timeout)
+
+    async def close(self, drain_timeout: float = 10.0) -> None:
+        if self._reload_task is not None:
+            self._reload_task.cancel()
+            await asyncio.gather(self._reload_task, return_exceptions=True)
+            self._reload_task = None
+        await self.drain(drain_timeout)
+        outboxes, self._outboxes = list(self._outboxes.values()), {}
+        for outbox in outboxes:
+            outbox.task.cancel()
+        await asyncio.gather(*(o.task for o in outboxes), return_exceptions=True)
+        await self.client.aclose()
+
+
+def _parse_retry_after(value: Optional[str]) -> float:
+    try:
+        return max(0.0, float(value)) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+_dispatcher: Optional[WebhookDispatcher] = None
+
+def get_webhook_dispatcher() -> WebhookDispatcher:
+    """Process-wide dispatcher built from config on first use."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = WebhookDispatcher(shard_router.session, router=shard_router)
+    return _dispatcher
@@ -1,18 +1,67 @@
 # Main FastAPI application entry point
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routers import auth, intake, tickets
+from app.core.audit import get_audit_log
+from app.core.crypto import get_field_cipher
+from app.core.dedupe import warm_dedupe_index
+from app.core.escalation import get_escalation_scheduler
+from app.core.logs import RequestContextMiddleware, setup_logging, shutdown_logging
+from app.core.notifications import get_notifier
+from app.core.tenancy import shard_router
+from app.core.webhooks import get_webhook_dispatcher
+from app.routers import auth, intake, tickets, stats, attachments, clients, webhooks, audit, notifications
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start/stop long-lived background subsystems with the app."""
+    # JSON logs via a queue + writer thread (never block the event loop on stdout)
+    setup_logging()
+    # Fail fast when the PII keys are missing, not on the first intake
+    get_field_cipher()
+    for shard in shard_router.shards:
+        async with shard_router.shard_session(shard) as session:
+            # Load recent event summaries into each firm's near-duplicate index
+            await warm_dedupe_index(session)
+    # Start a delivery worker per active webhook subscription (reloaded periodically)
+    await get_webhook_dispatcher().start()
+    # Re-arm SLA deadlines for every ticket still in "New"
+    await get_escalation_scheduler().start()
+    # Background flusher for the access audit log
+    await get_audit_log().start()
+    yield
+    await get_escalation_scheduler().stop()
+    # Give queued webhooks a chance to go out, then close pooled HTTP connections
+    await get_webhook_dispatcher().close()
+    # Flush pending lead digests and close pooled SMTP connections
+    await get_notifier().close()
+    # Write out buffered audit records last, after every other request path has stopped
+    await get_audit_log().stop()
+    # Close every shard's connection pool
+    await shard_router.dispose()
+    # Last: write out queued log lines
+    shutdown_logging()
 
 # Initialize FastAPI application
 app = FastAPI(
     title="Legal Intake API",
     description="Secure API for capturing client case details and lawyer management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Request id on every log line (and X-Request-ID on every response) + access log
+app.add_middleware(RequestContextMiddleware)
+
 # Include routers
 app.include_router(auth.router)      # Phase 1: Authentication endpoints
 app.include_router(intake.router)    # Phase 2 & 3: Public intake with background tasks
 app.include_router(tickets.router)   # Phase 3: Protected ticket retrieval
+app.include_router(clients.router)   # Repeat-client ticket history
+app.include_router(stats.router)     # Analytics: rollup-backed dashboard stats
+app.include_router(attachments.router)  # Streamed document uploads and downloads
+app.include_router(webhooks.router)  # Outbound CRM webhook subscriptions
+app.include_router(audit.router)     # Access audit log queries
+app.include_router(notifications.router)  # Lead notifier metrics
 
 @app.get("/")
 async def root():
@@ -22,7 +71,13 @@ async def root():
         "status": "running",
         "endpoints": {
             "auth": "/auth/register, /auth/token",
-            "intake": "/intake (POST)",
-            "tickets": "/tickets (GET - Protected)"
+            "intake": "/intake, /intake/{firm_id} (POST), /intake/schema (GET)",
+            "tickets": "/tickets (GET - Protected)",
+            "clients": "/clients/{email_or_phone}/tickets (GET - Protected)",
+            "stats": "/stats (GET - Protected)",
+            "attachments": "/intake/{ticket_id}/attachments (POST), /tickets/{ticket_id}/attachments (GET - Protected)",
+            "webhooks": "/webhooks (GET, POST - Protected)",
+            "audit": "/audit?user_id=|ticket_id= (GET - Protected)",
+            "notifications": "/notifications/stats (GET - Protected)"
         }
     }
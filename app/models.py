@@ -1,49 +1,74 @@
 import datetime
-from sqlalchemy import Column, Integer, String, DateTime, text, func, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Date, text, func, ForeignKey, Index, UniqueConstraint, event, inspect
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import Optional, List
 
 # Import the Base class from the database configuration file
 from app.core.database import Base 
+from app.core.crypto import EncryptedString, blind_index, normalize_for_index
+from app.core.normalize import normalize_email, normalize_phone_for_index
+from app.core.tenancy import TenantScoped
 from sqlalchemy.orm import relationship
 
-class User(Base):
+class User(TenantScoped, Base):
     """
     SQLAlchemy Model for the Lawyer/Authenticated User.
     (Phase 1 Focus: Security)
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # The same address may belong to lawyers at two different firms
+        UniqueConstraint("firm_id", "email", name="uq_users_firm_id_email"),
+    )
 
     # Primary Key - auto-incrementing integer
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     
-    # Required for login (must be unique)
-    email: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
+    # Required for login (unique within the firm)
+    email: Mapped[str] = mapped_column(String, nullable=False)
     
     # Hashed password (Phase 1) - Stores the bcrypt hash string.
     # Note: Hashing logic lives in the CRUD layer, not here.
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
 
-    messages: Mapped[List["ChatMessage"]] = relationship("ChatMessage", back_populates="user")
+    chat_messages: Mapped[List["ChatMessage"]] = relationship("ChatMessage", back_populates="user")
     
     def __repr__(self) -> str:
         return f"User(id={self.id!r}, email={self.email!r})"
 
 
-class Ticket(Base):
+class Ticket(TenantScoped, Base):
     """
     SQLAlchemy Model for client case submissions.
     (Phase 2 Focus: Persistence)
     """
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Every index leads with firm_id (all queries are per firm)
+        Index("ix_tickets_firm_id_created_at", "firm_id", "created_at"),
+        # Client history lookups: equality on the identifier, newest first
+        Index("ix_tickets_firm_id_client_email_bidx_created_at", "firm_id", "client_email_bidx", "created_at"),
+        Index("ix_tickets_firm_id_client_phone_bidx_created_at", "firm_id", "client_phone_bidx", "created_at"),
+        Index("ix_tickets_firm_id_client_name_bidx", "firm_id", "client_name_bidx"),
+        Index("ix_tickets_firm_id_client_fingerprint", "firm_id", "client_fingerprint"),
+        Index("ix_tickets_firm_id_duplicate_of_id", "firm_id", "duplicate_of_id"),
+    )
 
     # Primary Key
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     
-    # Client Contact Details
-    client_name: Mapped[str] = mapped_column(String, index=True, nullable=False)
-    client_email: Mapped[str] = mapped_column(String, index=True, nullable=False)
-    client_phone: Mapped[str] = mapped_column(String, index=True, nullable=False)
+    # Client Contact Details - encrypted at rest (AES-GCM), plaintext in Python
+    client_name: Mapped[str] = mapped_column(EncryptedString("tickets.client_name"), nullable=False)
+    client_email: Mapped[str] = mapped_column(EncryptedString("tickets.client_email"), nullable=False)
+    client_phone: Mapped[str] = mapped_column(EncryptedString("tickets.client_phone"), nullable=False)
+
+    # Blind indexes (HMAC of the normalized value) for exact-match lookups:
+    # names are case-folded, emails lowercased, phones converted to E.164,
+    # e.g. Ticket.client_phone_bidx == blind_index("050-1234567", normalize_phone_for_index).
+    # Maintained by the before_insert/before_update listeners below.
+    client_name_bidx: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    client_email_bidx: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    client_phone_bidx: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
 
     # Case Details
     event_summary: Mapped[str] = mapped_column(String, nullable=False)
@@ -51,9 +76,17 @@ class Ticket(Base):
     status: Mapped[str] = mapped_column(String, default="New") # e.g., 'New', 'Acknowledged'
     
     # Client fingerprint and security
-    client_fingerprint: Mapped[Optional[str]] = mapped_column(String, nullable=True, index = True)
-    priority_score: Mapped[int] = mapped_column(Integer, default = 0)
-    is_deleted: Mapped[bool] = mapped_column(default=False)
+    client_fingerprint: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    priority_score: Mapped[int] = mapped_column(Integer, default = 0, server_default="0")
+    is_deleted: Mapped[bool] = mapped_column(default=False, server_default=text("false"))
+
+    # Near-duplicate / spam detection (see app.core.dedupe)
+    duplicate_of_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        ForeignKey("tickets.id"),
+        nullable=True
+    )
+    is_spam: Mapped[bool] = mapped_column(default=False, server_default=text("false"))
 
     # Timestamps - Important for tracking submissions
     # Use func.now() for server_default as a cross-database compatible approach,
@@ -69,12 +102,46 @@ class Ticket(Base):
         nullable=False,
         server_default=func.now() # Use func.now() for consistency
     )
+
+    # Last SLA escalation while still "New" (see app.core.escalation)
+    escalated_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+
+    # Set on the first transition out of "New" - drives time-to-acknowledge stats
+    acknowledged_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
     
     def __repr__(self) -> str:
         return f"Ticket(id={self.id!r}, status={self.status!r}, client_email={self.client_email!r})"
+
+
+# Encrypted columns that have a blind-index companion, with their normalizers
+BLIND_INDEXED_FIELDS = {
+    "client_name": normalize_for_index,
+    "client_email": normalize_email,
+    "client_phone": normalize_phone_for_index,
+}
+
+@event.listens_for(Ticket, "before_insert")
+def _set_blind_indexes(mapper, connection, target: Ticket) -> None:
+    """Compute *_bidx columns for a new ticket from its plaintext attributes."""
+    for field, normalize in BLIND_INDEXED_FIELDS.items():
+        setattr(target, f"{field}_bidx", blind_index(getattr(target, field), normalize))
+
+@event.listens_for(Ticket, "before_update")
+def _refresh_blind_indexes(mapper, connection, target: Ticket) -> None:
+    """Recompute blind indexes only for PII fields changed in this flush."""
+    state = inspect(target)
+    for field, normalize in BLIND_INDEXED_FIELDS.items():
+        if state.attrs[field].history.has_changes():
+            setattr(target, f"{field}_bidx", blind_index(getattr(target, field), normalize))
     
 
-class ChatMessage(Base):
+class ChatMessage(TenantScoped, Base):
     """
     SQLAlchemy Model for chat messages.
     (Phase 3 Focus: User Interaction)
@@ -106,4 +173,164 @@ class ChatMessage(Base):
     user: Mapped[Optional["User"]] = relationship("User", back_populates="chat_messages")
 
     def repr(self) -> str:
-        return f"ChatMessage(id={self.id!r}, ticket_id={self.ticket_id!r}, message={self.message!r})"
\ No newline at end of file
+        return f"ChatMessage(id={self.id!r}, ticket_id={self.ticket_id!r}, message={self.message!r})"
+
+
+class TicketStatsDaily(TenantScoped, Base):
+    """
+    Rollup of ticket counts per (created day, status, urgency).
+    (Analytics Focus: Dashboard queries scale with days, not tickets)
+
+    Maintained incrementally by intake and status transitions in the same
+    transaction as the ticket write; rebuilt from scratch by app.core.stats.
+    """
+    __tablename__ = "ticket_stats_daily"
+
+    firm_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    day: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+    status: Mapped[str] = mapped_column(String, primary_key=True)
+    urgency_level: Mapped[str] = mapped_column(String, primary_key=True)
+
+    # Tickets created on `day` that currently sit in `status`
+    ticket_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    # Time-to-acknowledge accumulators (only populated on non-"New" rows)
+    ack_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    ack_seconds_total: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+
+    def __repr__(self) -> str:
+        return (
+            f"TicketStatsDaily(day={self.day!r}, status={self.status!r}, "
+            f"urgency_level={self.urgency_level!r}, ticket_count={self.ticket_count!r})"
+        )
+
+
+class Attachment(TenantScoped, Base):
+    """
+    SQLAlchemy Model for documents attached to a ticket (court notices, contracts).
+    (Attachments Focus: Streamed uploads)
+
+    File bytes live in the blob store, keyed by sha256; rows with the same
+    hash share a single stored blob.
+    """
+    __tablename__ = "attachments"
+    __table_args__ = (
+        UniqueConstraint("firm_id", "ticket_id", "sha256", name="uq_attachments_firm_id_ticket_id_sha256"),
+        Index("ix_attachments_firm_id_sha256", "firm_id", "sha256"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    ticket_id: Mapped[int] = mapped_column(Integer, ForeignKey("tickets.id"), nullable=False)
+
+    filename: Mapped[str] = mapped_column(String, nullable=False)
+    content_type: Mapped[str] = mapped_column(String, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"Attachment(id={self.id!r}, ticket_id={self.ticket_id!r}, sha256={self.sha256!r})"
+
+
+class WebhookSubscription(TenantScoped, Base):
+    """
+    SQLAlchemy Model for an outbound webhook endpoint (e.g. the firm's CRM).
+    (Integrations Focus: Mirroring intake into external systems)
+
+    Payloads are signed with `secret` (HMAC-SHA256); subscribers that set
+    supports_batching receive up to max_batch_size events per POST.
+    """
+    __tablename__ = "webhook_subscriptions"
+    __table_args__ = (
+        Index("ix_webhook_subscriptions_firm_id_is_active", "firm_id", "is_active"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    url: Mapped[str] = mapped_column(String, nullable=False)
+    secret: Mapped[str] = mapped_column(EncryptedString("webhook_subscriptions.secret"), nullable=False)
+
+    # Comma-separated event types, e.g. "ticket.created"
+    event_types: Mapped[str] = mapped_column(String, nullable=False, default="ticket.created")
+    supports_batching: Mapped[bool] = mapped_column(default=False, server_default=text("false"))
+    max_batch_size: Mapped[int] = mapped_column(Integer, nullable=False, default=100, server_default="100")
+    is_active: Mapped[bool] = mapped_column(default=True, server_default=text("true"))
+
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"WebhookSubscription(id={self.id!r}, url={self.url!r}, is_active={self.is_active!r})"
+
+
+class WebhookDelivery(TenantScoped, Base):
+    """
+    SQLAlchemy Model for the webhook delivery log - one row per HTTP attempt.
+    (Integrations Focus: Auditing and debugging CRM sync)
+    """
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        Index("ix_webhook_deliveries_firm_id_subscription_id_created_at", "firm_id", "subscription_id", "created_at"),
+        Index("ix_webhook_deliveries_firm_id_delivery_id", "firm_id", "delivery_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    subscription_id: Mapped[int] = mapped_column(Integer, ForeignKey("webhook_subscriptions.id"), nullable=False)
+
+    # Same delivery_id for every retry of one batch (sent as X-Webhook-Id)
+    delivery_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    attempt: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    succeeded: Mapped[bool] = mapped_column(nullable=False)
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    duration_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"WebhookDelivery(id={self.id!r}, subscription_id={self.subscription_id!r}, "
+            f"attempt={self.attempt!r}, succeeded={self.succeeded!r})"
+        )
+
+
+class AuditEvent(TenantScoped, Base):
+    """
+    SQLAlchemy Model for the append-only access audit log.
+    (Compliance Focus: Which lawyer viewed which ticket, and when)
+
+    On Postgres the table is range-partitioned by month on `ts`; partitions
+    are created on demand by app.core.audit. Rows are only ever inserted in
+    bulk by the audit flusher, so there is no surrogate key.
+    """
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        Index("ix_audit_events_firm_id_user_id_ts", "firm_id", "user_id", "ts"),
+        Index("ix_audit_events_firm_id_ticket_id_ts", "firm_id", "ticket_id", "ts"),
+        {"postgresql_partition_by": "RANGE (ts)"},
+    )
+    __mapper_args__ = {"primary_key": ["firm_id", "ts", "user_id", "action", "ticket_id"]}
+
+    ts: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    action: Mapped[str] = mapped_column(String(32), nullable=False)
+    ticket_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"AuditEvent(ts={self.ts!r}, user_id={self.user_id!r}, "
+            f"action={self.action!r}, ticket_id={self.ticket_id!r})"
+        )
@@ -0,0 +1,218 @@
+# Ticket attachments: streamed public upload, protected range-capable download
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.core.audit import ATTACHMENT_DOWNLOAD, get_audit_log
+from app.core.blobstore import BlobStore, get_blob_store
+from app.core.config import ATTACHMENT_CHUNK_SIZE, ATTACHMENT_MAX_BYTES
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.security import verify_upload_token
+from app.core.uploads import stream_upload_to_store
+from app.models import Attachment, Ticket, User
+from app.schemas import AttachmentResponse
+
+router = APIRouter(tags=["Attachments"])
+
+# Single byte range; multi-range requests are answered with the whole file
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+@router.post(
+    "/intake/{ticket_id}/attachments",
+    response_model=AttachmentResponse,
+    status_code=status.HTTP_201_CREATED
+)
+@router.post(
+    "/intake/{firm_id}/{ticket_id}/attachments",
+    response_model=AttachmentResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def upload_attachment(
+    ticket_id: int,
+    request: Request,
+    upload_token: Optional[str] = Header(None, alias="X-Upload-Token"),
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store)
+):
+    """
+    Attach a document to a freshly submitted ticket (multipart field "file").
+
+    Security: no lawyer login, but requires the ticket's upload token
+    (X-Upload-Token, returned by POST /intake) and the ticket must be "New"
+
+    Performance:
+    - The body is parsed as it arrives and written in fixed-size chunks;
+      memory use is flat regardless of file size
+    - SHA-256 and the size limit are enforced incrementally (413 on overflow)
+    - Identical content is stored once; re-uploading to the same ticket
+      returns the existing attachment
+    """
+    if not verify_upload_token(upload_token, db.info["firm_id"], ticket_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired upload token"
+        )
+
+    result = await db.execute(
+        select(Ticket.id, Ticket.status).where(
+            Ticket.id == ticket_id,
+            Ticket.is_deleted.is_(False)
+        )
+    )
+    ticket = result.one_or_none()
+    if ticket is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found"
+        )
+    if ticket.status != "New":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Attachments can only be added to new tickets"
+        )
+    # Release the pooled connection while the (possibly slow) upload streams
+    await db.rollback()
+
+    upload = await stream_upload_to_store(
+        request,
+        store,
+        max_bytes=ATTACHMENT_MAX_BYTES,
+        chunk_size=ATTACHMENT_CHUNK_SIZE
+    )
+
+    existing_stmt = select(Attachment).where(
+        Attachment.ticket_id == ticket_id,
+        Attachment.sha256 == upload.sha256
+    )
+    existing = (await db.execute(existing_stmt)).scalar_one_or_none()
+    if existing is not None:
+        return existing
+
+    attachment = Attachment(
+        ticket_id=ticket_id,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        size_bytes=upload.size,
+        sha256=upload.sha256
+    )
+    db.add(attachment)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Concurrent upload of the same file to the same ticket won the race
+        await db.rollback()
+        return (await db.execute(existing_stmt)).scalar_one()
+    await db.refresh(attachment)
+
+    return attachment
+
+@router.get("/tickets/{ticket_id}/attachments", response_model=List[AttachmentResponse])
+async def list_attachments(
+    ticket_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List attachment metadata for a ticket.
+
+    Security: PROTECTED - Requires valid JWT token
+    """
+    result = await db.execute(
+        select(Attachment)
+        .where(Attachment.ticket_id == ticket_id)
+        .order_by(Attachment.id)
+    )
+    return result.scalars().all()
+
+@router.get("/tickets/{ticket_id}/attachments/{attachment_id}")
+async def download_attachment(
+    ticket_id: int,
+    attachment_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    store: BlobStore = Depends(get_blob_store)
+):
+    """
+    Download an attachment's bytes.
+
+    Security: PROTECTED - Requires valid JWT token
+
+    Performance:
+    - Honors Range requests (206 Partial Content) for resumable downloads
+    - FileResponse advertises the file path to servers supporting the ASGI
+      pathsend extension, which can then use sendfile (zero-copy)
+    - Backends without local files are streamed chunk by chunk
+    """
+    result = await db.execute(
+        select(Attachment).where(
+            Attachment.id == attachment_id,
+            Attachment.ticket_id == ticket_id
+        )
+    )
+    attachment = result.scalar_one_or_none()
+    if attachment is None or not await store.exists(attachment.sha256):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attachment not found"
+        )
+
+    get_audit_log().record(current_user.firm_id, current_user.id, ATTACHMENT_DOWNLOAD, [ticket_id])
+    path = store.local_path(attachment.sha256)
+    if path is not None:
+        return FileResponse(
+            path,
+            media_type=attachment.content_type,
+            filename=attachment.filename
+        )
+    return _stream_attachment(request, store, attachment)
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" range into [start, end); None means "send everything".
+    Raises 416 when the range lies outside the file.
+    """
+    match = _BYTE_RANGE.match(header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        start, end = max(0, size - int(last)), size   # suffix: last N bytes
+    else:
+        start, end = int(first), min(size, int(last) + 1) if last else size
+    if start >= size or start >= end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+def _stream_attachment(request: Request, store: BlobStore, attachment: Attachment) -> StreamingResponse:
+    """Serve a blob through BlobStore.iter_chunks, honoring a single Range."""
+    size = attachment.size_bytes
+    quoted = quote(attachment.filename)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": (
+            f"attachment; filename*=utf-8''{quoted}" if quoted != attachment.filename
+            else f'attachment; filename="{attachment.filename}"'
+        ),
+    }
+    byte_range = _parse_range(request.headers.get("range", ""), size)
+    start, end = byte_range or (0, size)
+    headers["Content-Length"] = str(end - start)
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+
+    return StreamingResponse(
+        store.iter_chunks(attachment.sha256, start, end, chunk_size=ATTACHMENT_CHUNK_SIZE),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range is not None else status.HTTP_200_OK,
+        media_type=attachment.content_type,
+        headers=headers
+    )
@@ -0,0 +1,56 @@
+# Access audit log queries for compliance reviews (Protected)
+import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.audit import get_audit_log, query_audit_events
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.models import User
+from app.schemas import AuditEventResponse
+
+router = APIRouter(prefix="/audit", tags=["Audit"])
+
+@router.get("", response_model=List[AuditEventResponse])
+async def read_audit_events(
+    user_id: Optional[int] = Query(None, description="Lawyer whose access to list (only your own)"),
+    ticket_id: Optional[int] = Query(None, description="Ticket whose viewers to list"),
+    start: Optional[datetime.datetime] = Query(None, description="From (inclusive)"),
+    end: Optional[datetime.datetime] = Query(None, description="Until (exclusive)"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Who viewed what, newest first.
+
+    Security: PROTECTED - Requires valid JWT token
+    - A lawyer's access history is itself sensitive: user_id may only be the
+      caller's own id (the default). There is no admin/compliance role yet.
+    - ticket_id queries (who viewed a ticket) are open to every lawyer of
+      the firm
+
+    Performance:
+    - Served by the (firm_id, user_id, ts) or (firm_id, ticket_id, ts)
+      index; a time range also prunes monthly partitions
+    - Records reach the table within AUDIT_FLUSH_INTERVAL_SECONDS
+    """
+    if user_id is not None and user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only list your own access history"
+        )
+    if ticket_id is None:
+        user_id = current_user.id
+    return await query_audit_events(db, user_id, ticket_id, start, end, limit)
+
+@router.get("/stats")
+async def read_audit_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Audit buffer depth, records written and records dropped (this process).
+
+    Security: PROTECTED - Requires valid JWT token
+    """
+    return get_audit_log().stats()
@@ -20,7 +20,7 @@ async def register(
     
     Security Requirements:
     - Passwords are hashed using bcrypt (slow, salted algorithm)
-    - Email must be unique
+    - Email must be unique within the firm (resolved from the request host)
     
     This endpoint is typically run once during initial setup.
     """
@@ -62,7 +62,8 @@ async def login(
     - Returns JWT access token on successful authentication
     
     The JWT payload includes:
-    - sub (subject): User's email (unique identifier)
+    - sub (subject): User's email (unique within the firm)
+    - firm: The user's firm, which routes later requests to its shard
     - exp (expiration): Token expiration timestamp
     """
     # Query user by email (username field in OAuth2 form)
@@ -77,7 +78,7 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create JWT with user's email in the 'sub' claim
-    access_token = create_access_token(data={"sub": user.email})
+    # Create JWT with user's email in the 'sub' claim and their firm
+    access_token = create_access_token(data={"sub": user.email, "firm": user.firm_id})
     
     return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,53 @@
+# Client history: every ticket from a repeat client (Protected)
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.core.audit import CLIENT_HISTORY, get_audit_log
+from app.core.crypto import blind_index
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.normalize import normalize_email, normalize_phone, normalize_phone_for_index
+from app.models import Ticket, User
+from app.schemas import TicketResponse
+
+router = APIRouter(prefix="/clients", tags=["Lawyer Tickets"])
+
+@router.get("/{key}/tickets", response_model=List[TicketResponse])
+async def get_client_tickets(
+    key: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Retrieve a client's full ticket history, newest first.
+
+    Security: PROTECTED - Requires valid JWT token
+
+    `key` is the client's email or phone in any common format
+    ("Jane@X.com", "+972-50-123-4567", "050 1234567"). It is normalized
+    (lowercase / E.164) exactly as at intake, so all variants match.
+
+    Performance:
+    - One query on the (firm_id, blind index, created_at) composite index;
+      no table scan and no in-database decryption
+    """
+    if "@" in key:
+        column, index = Ticket.client_email_bidx, blind_index(key, normalize_email)
+    elif normalize_phone(key) is not None:
+        column, index = Ticket.client_phone_bidx, blind_index(key, normalize_phone_for_index)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Key must be an email address or phone number"
+        )
+
+    result = await db.execute(
+        select(Ticket)
+        .where(column == index, Ticket.is_deleted.is_(False))
+        .order_by(Ticket.created_at.desc())
+    )
+    tickets = result.scalars().all()
+
+    get_audit_log().record(current_user.firm_id, current_user.id, CLIENT_HISTORY, [t.id for t in tickets])
+    return tickets
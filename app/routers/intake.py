@@ -1,36 +1,75 @@
 # Public intake endpoint for client submissions (Phase 2 & 3)
-import time
-from fastapi import APIRouter, Depends, BackgroundTasks, status
+from fastapi import APIRouter, Depends, BackgroundTasks, Request, status
+from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.crypto import blind_index
 from app.core.database import get_db
+from app.core.dedupe import get_dedupe_index, minhash_signature, normalize_summary
+from app.core.escalation import get_escalation_scheduler
+from app.core.intake_schema import INTAKE_SCHEMA, LocalizedValidationRoute, schema_response
+from app.core.normalize import normalize_email
+from app.core.notifications import Lead, get_notifier
+from app.core.security import create_upload_token
+from app.core.stats import record_ticket_created
+from app.core.webhooks import WebhookEvent, get_webhook_dispatcher
 from app.models import Ticket
 from app.schemas import TicketCreate
 
-router = APIRouter(prefix="/intake", tags=["Public Intake"])
+router = APIRouter(prefix="/intake", tags=["Public Intake"], route_class=LocalizedValidationRoute)
 
-def send_notification_email(ticket_id: int, client_email: str):
+# /intake/schema may change on deploy: cache briefly, revalidate with the ETag.
+# /intake/schema/{version} never changes: cache forever.
+SCHEMA_CACHE_CONTROL = "public, max-age=300, stale-while-revalidate=86400"
+VERSIONED_SCHEMA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+async def send_notification_email(
+    firm_id: str,
+    ticket_id: int,
+    client_name: str,
+    client_email: str,
+    urgency_level: str,
+    suspected_spam: bool = False
+):
     """
-    Background task that simulates sending email notification to lawyer.
-    
+    Background task that hands the new lead to the lawyer notifier.
+
     Phase 3 Requirement: Demonstrates background task processing.
-    This simulates a long-running operation (email sending) that happens
-    asynchronously after the API response is returned to the client.
-    
-    In production, this would:
-    - Connect to an email service (SendGrid, SES, etc.)
-    - Send formatted email to lawyer with ticket details
-    - Log the notification for audit purposes
+    The notifier groups bursts of leads into one digest per lawyer and
+    sends them over a pooled, persistent SMTP connection, so this returns
+    immediately instead of opening a connection per email.
     """
-    # Simulate long-running email operation (3 seconds)
-    time.sleep(3)
-    
-    # Log notification (in production, this would be actual email sending)
-    print(f"[BACKGROUND TASK] New Client Lead Email Sent!")
-    print(f"  Ticket ID: {ticket_id}")
-    print(f"  Client Email: {client_email}")
-    print(f"  Notification completed at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    get_notifier().notify_new_lead(Lead(
+        ticket_id=ticket_id,
+        client_name=client_name,
+        client_email=client_email,
+        urgency_level=urgency_level,
+        firm_id=firm_id,
+        suspected_spam=suspected_spam
+    ))
+
+@router.get("/schema")
+async def get_intake_schema(request: Request):
+    """
+    JSON Schema of the intake form plus its validation messages (he/en).
+
+    Built once at startup from TicketCreate, so the form and the API can't
+    drift apart. No database access; answers 304 to a matching If-None-Match.
+    Clients that pin a version should fetch /intake/schema/{version}.
+    """
+    return schema_response(request, SCHEMA_CACHE_CONTROL)
+
+@router.get("/schema/{version}")
+async def get_versioned_intake_schema(version: str, request: Request):
+    """The same document under an immutable URL; stale versions redirect to the current one."""
+    if version != INTAKE_SCHEMA.version:
+        return RedirectResponse(
+            request.url_for("get_versioned_intake_schema", version=INTAKE_SCHEMA.version).path,
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT
+        )
+    return schema_response(request, VERSIONED_SCHEMA_CACHE_CONTROL)
 
 @router.post("", status_code=status.HTTP_201_CREATED)
+@router.post("/{firm_id}", status_code=status.HTTP_201_CREATED)
 async def create_ticket(
     ticket_data: TicketCreate,
     background_tasks: BackgroundTasks,
@@ -40,19 +79,31 @@ async def create_ticket(
     Public endpoint for potential clients to submit case details (Phase 2 & 3).
     
     Security: UNAUTHENTICATED - Anyone can submit a ticket
+
+    The firm comes from the path (/intake/{firm_id}) or the intake host
+    (e.g. cohen.intake.example.com); get_db routes to that firm's shard.
     
     Phase 3 Concurrency Requirement:
     - Uses BackgroundTasks to send email notification asynchronously
     - Returns 201 Created IMMEDIATELY, before background task completes
-    - Background task simulates 3-second email sending operation
+    - Background task queues the lead for the pooled SMTP notifier
     
     Flow:
-    1. Validate input data (Pydantic)
-    2. Save ticket to database
-    3. Queue background task for email notification
+    1. Validate input data (Pydantic; 422 messages in the client's language,
+       from the same catalog /intake/schema publishes)
+    2. Save ticket to database (and bump the analytics rollup),
+       linking near-duplicates and flagging likely spam
+    3. Queue background task for email notification and the CRM webhook
     4. Return response immediately (non-blocking)
     5. Background task executes after response is sent
     """
+    # Near-duplicate / spam check against the in-memory LSH index (sub-ms)
+    firm_id = db.info["firm_id"]
+    index = get_dedupe_index(firm_id)
+    signature = minhash_signature(ticket_data.event_summary)
+    client_key = blind_index(ticket_data.client_email, normalize_email)
+    verdict = index.check(signature, client_key, len(normalize_summary(ticket_data.event_summary)))
+
     # Create new ticket from validated data
     new_ticket = Ticket(
         client_name=ticket_data.client_name,
@@ -60,25 +111,49 @@ async def create_ticket(
         client_phone=ticket_data.client_phone,
         event_summary=ticket_data.event_summary,
         urgency_level=ticket_data.urgency_level,
-        status="New"  # All new tickets start with "New" status
+        status="New",  # All new tickets start with "New" status
+        duplicate_of_id=verdict.duplicate_of_id,
+        is_spam=verdict.is_spam
     )
     
-    # Save to database
+    # Save to database (flush + refresh first so created_at is known)
     db.add(new_ticket)
-    await db.commit()
+    await db.flush()
     await db.refresh(new_ticket)
+
+    # Update the analytics rollup in the same transaction as the ticket
+    await record_ticket_created(db, new_ticket)
+    await db.commit()
+    index.add(new_ticket.id, signature, client_key)
     
+    # Suspected spam still goes through every step below, marked as such:
+    # the heuristic can be wrong, and a lawyer decides
+    # Start the SLA clock; cancelled when the ticket leaves "New"
+    get_escalation_scheduler().register(
+        firm_id,
+        new_ticket.id,
+        new_ticket.urgency_level,
+        new_ticket.created_at
+    )
+    # Mirror into subscribed CRMs (enqueue only; delivery is async and batched)
+    get_webhook_dispatcher().publish(firm_id, WebhookEvent.ticket_created(new_ticket))
     # Add background task AFTER saving ticket
     # This task will run after the response is returned to client
     background_tasks.add_task(
         send_notification_email,
+        firm_id=firm_id,
         ticket_id=new_ticket.id,
-        client_email=new_ticket.client_email
+        client_name=new_ticket.client_name,
+        client_email=new_ticket.client_email,
+        urgency_level=new_ticket.urgency_level,
+        suspected_spam=new_ticket.is_spam
     )
     
     # Return immediately (background task runs asynchronously)
     return {
         "message": "Ticket submitted successfully",
         "ticket_id": new_ticket.id,
-        "status": new_ticket.status
+        "status": new_ticket.status,
+        # Needed (as X-Upload-Token) to attach documents to this ticket
+        "upload_token": create_upload_token(firm_id, new_ticket.id)
     }
@@ -0,0 +1,18 @@
+# Lead notifier operational metrics (Protected)
+from fastapi import APIRouter, Depends
+from app.core.dependencies import get_current_user
+from app.core.notifications import get_notifier
+from app.models import User
+
+router = APIRouter(prefix="/notifications", tags=["Notifications"])
+
+@router.get("/stats")
+async def read_notification_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Per-message SMTP send latency for lead notifications (this process).
+
+    Security: PROTECTED - Requires valid JWT token
+    """
+    return get_notifier().latency.summary()
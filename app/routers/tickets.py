@@ -1,12 +1,16 @@
 # Protected ticket retrieval for lawyers (Phase 3)
+import datetime
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.core.audit import TICKETS_LIST, get_audit_log
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.escalation import get_escalation_scheduler
+from app.core.stats import NEW_STATUS, record_status_change, seconds_between
 from app.models import Ticket, User
-from app.schemas import TicketResponse
+from app.schemas import TicketResponse, TicketStatusUpdate
 
 router = APIRouter(prefix="/tickets", tags=["Lawyer Tickets"])
 
@@ -46,6 +50,10 @@ async def get_all_tickets(
     Without eager loading, accessing ticket.comments in a loop would trigger
     1 query for tickets + N queries for each ticket's comments = N+1 queries
     With eager loading: 2 queries total (1 for tickets, 1 for all comments)
+
+    Compliance: every returned ticket is recorded in the access audit log.
+    Records are buffered in memory and bulk-flushed in the background, so
+    this adds no database writes to the request.
     """
     # Query all tickets from database
     # Order by created_at descending (newest first)
@@ -53,5 +61,57 @@ async def get_all_tickets(
         select(Ticket).order_by(Ticket.created_at.desc())
     )
     tickets = result.scalars().all()
-    
+
+    get_audit_log().record(current_user.firm_id, current_user.id, TICKETS_LIST, [t.id for t in tickets])
     return tickets
+
+@router.patch("/{ticket_id}/status", response_model=TicketResponse)
+async def update_ticket_status(
+    ticket_id: int,
+    status_update: TicketStatusUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Move a ticket to a new status (e.g. "New" -> "Acknowledged").
+
+    Security: PROTECTED - Requires valid JWT token
+
+    The first transition out of "New" stamps acknowledged_at; the analytics
+    rollup is adjusted in the same transaction as the status write.
+    """
+    # Lock the row so concurrent transitions can't double-count the rollup
+    result = await db.execute(
+        select(Ticket)
+        .where(Ticket.id == ticket_id, Ticket.is_deleted.is_(False))
+        .with_for_update()
+    )
+    ticket = result.scalar_one_or_none()
+    if ticket is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found"
+        )
+
+    old_status = ticket.status
+    if status_update.status == old_status:
+        return ticket
+
+    acknowledged_seconds = None
+    if old_status == NEW_STATUS and ticket.acknowledged_at is None:
+        ticket.acknowledged_at = datetime.datetime.now(datetime.timezone.utc)
+        acknowledged_seconds = seconds_between(ticket.created_at, ticket.acknowledged_at)
+
+    ticket.status = status_update.status
+    await record_status_change(db, ticket, old_status, acknowledged_seconds)
+    await db.commit()
+    await db.refresh(ticket)
+
+    # Stop (or restart) the SLA escalation clock
+    scheduler = get_escalation_scheduler()
+    if ticket.status == NEW_STATUS:
+        scheduler.register(ticket.firm_id, ticket.id, ticket.urgency_level, datetime.datetime.now(datetime.timezone.utc))
+    else:
+        scheduler.cancel(ticket.firm_id, ticket.id)
+
+    return ticket
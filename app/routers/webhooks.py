@@ -0,0 +1,137 @@
+# Outbound webhook subscriptions (CRM sync) and their delivery log (Protected)
+import secrets
+import socket
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.webhooks import Subscriber, UnsafeWebhookURL, check_webhook_url, get_webhook_dispatcher
+from app.models import User, WebhookDelivery, WebhookSubscription
+from app.schemas import (
+    WebhookDeliveryResponse,
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionCreated,
+    WebhookSubscriptionResponse,
+)
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+async def _get_subscription(db: AsyncSession, subscription_id: int) -> WebhookSubscription:
+    subscription = await db.get(WebhookSubscription, subscription_id)
+    if subscription is None or not subscription.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhook subscription not found"
+        )
+    return subscription
+
+@router.post("", response_model=WebhookSubscriptionCreated, status_code=status.HTTP_201_CREATED)
+async def create_subscription(
+    subscription_data: WebhookSubscriptionCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Register an endpoint to receive intake events.
+
+    Security: PROTECTED - Requires valid JWT token
+
+    The signing secret is returned only in this response. Deliveries start
+    immediately; receivers verify the X-Webhook-Signature header.
+
+    The URL must be https and resolve to public addresses only.
+    """
+    try:
+        await check_webhook_url(str(subscription_data.url))
+    except UnsafeWebhookURL as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except socket.gaierror:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Webhook host could not be resolved"
+        )
+    subscription = WebhookSubscription(
+        url=str(subscription_data.url),
+        secret=subscription_data.secret or secrets.token_urlsafe(32),
+        event_types=",".join(subscription_data.event_types),
+        supports_batching=subscription_data.supports_batching,
+        max_batch_size=subscription_data.max_batch_size
+    )
+    db.add(subscription)
+    await db.commit()
+    await db.refresh(subscription)
+
+    get_webhook_dispatcher().add(Subscriber.from_row(subscription))
+    return subscription
+
+@router.get("", response_model=List[WebhookSubscriptionResponse])
+async def list_subscriptions(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List active webhook subscriptions.
+
+    Security: PROTECTED - Requires valid JWT token
+    """
+    result = await db.execute(
+        select(WebhookSubscription)
+        .where(WebhookSubscription.is_active.is_(True))
+        .order_by(WebhookSubscription.id)
+    )
+    return result.scalars().all()
+
+@router.get("/status")
+async def read_dispatcher_status(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue depth, circuit-breaker state and delivery counters per subscriber
+    (this process).
+
+    Security: PROTECTED - Requires valid JWT token
+    """
+    return get_webhook_dispatcher().status(current_user.firm_id)
+
+@router.delete("/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_subscription(
+    subscription_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stop deliveries to an endpoint. The row (and its delivery log) is kept.
+
+    Security: PROTECTED - Requires valid JWT token
+    """
+    subscription = await _get_subscription(db, subscription_id)
+    subscription.is_active = False
+    await db.commit()
+
+    get_webhook_dispatcher().remove(current_user.firm_id, subscription_id)
+
+@router.get("/{subscription_id}/deliveries", response_model=List[WebhookDeliveryResponse])
+async def list_deliveries(
+    subscription_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Most recent delivery attempts for a subscription, newest first.
+
+    Security: PROTECTED - Requires valid JWT token
+
+    Performance:
+    - Served by the (firm_id, subscription_id, created_at) index
+    """
+    await _get_subscription(db, subscription_id)
+    result = await db.execute(
+        select(WebhookDelivery)
+        .where(WebhookDelivery.subscription_id == subscription_id)
+        .order_by(WebhookDelivery.created_at.desc(), WebhookDelivery.id.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
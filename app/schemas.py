@@ -1,7 +1,7 @@
 # Pydantic schemas for request/response validation
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
-from typing import Optional
+from pydantic import AnyHttpUrl, BaseModel, EmailStr, Field
+from datetime import datetime, date
+from typing import Dict, List, Literal, Optional
 
 # ===== Authentication Schemas =====
 
@@ -26,13 +26,24 @@ class TokenData(BaseModel):
 
 # ===== Ticket Schemas =====
 
+# Every status a ticket can be in (each is a ticket_stats_daily bucket)
+TicketStatus = Literal["New", "Acknowledged", "Closed"]
+
+# Also the SLA keys in ESCALATION_SLA_MINUTES
+UrgencyLevel = Literal["Low", "Medium", "High", "Court Date Soon"]
+
 class TicketCreate(BaseModel):
-    """Schema for creating a new ticket (public intake)"""
-    client_name: str
+    """
+    Schema for creating a new ticket (public intake).
+
+    Constraints here are the single source for the intake form: they are
+    published (with localized messages) by GET /intake/schema.
+    """
+    client_name: str = Field(..., min_length=1, max_length=200)
     client_email: EmailStr
-    client_phone: str
-    event_summary: str
-    urgency_level: str = "Low"  # Default to Low
+    client_phone: str = Field(..., pattern=r"^\+?[0-9\s().-]{7,20}$")
+    event_summary: str = Field(..., min_length=1, max_length=10000)
+    urgency_level: UrgencyLevel = "Low"  # Default to Low
 
 class TicketResponse(BaseModel):
     """Schema for ticket response"""
@@ -43,6 +54,8 @@ class TicketResponse(BaseModel):
     event_summary: str
     urgency_level: str
     status: str
+    duplicate_of_id: Optional[int] = None
+    is_spam: bool = False
     created_at: datetime
     updated_at: datetime
 
@@ -50,6 +63,98 @@ class TicketResponse(BaseModel):
         from_attributes = True  # Enables ORM mode for SQLAlchemy models
 
 
+class TicketStatusUpdate(BaseModel):
+    """Schema for moving a ticket to a new status (e.g. 'Acknowledged')"""
+    status: TicketStatus
+
+
+class AttachmentResponse(BaseModel):
+    """Schema for attachment metadata (bytes are served separately)"""
+    id: int
+    ticket_id: int
+    filename: str
+    content_type: str
+    size_bytes: int
+    sha256: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# ==== Webhook Schemas ====
+
+class WebhookSubscriptionCreate(BaseModel):
+    """Schema for registering an outbound webhook endpoint (e.g. the CRM)"""
+    url: AnyHttpUrl
+    secret: Optional[str] = Field(None, min_length=16, description="HMAC key; generated when omitted")
+    event_types: List[str] = ["ticket.created"]
+    supports_batching: bool = False
+    max_batch_size: int = Field(100, ge=1, le=1000)
+
+
+class WebhookSubscriptionResponse(BaseModel):
+    """Schema for a webhook subscription (the secret is never returned)"""
+    id: int
+    url: str
+    event_types: str
+    supports_batching: bool
+    max_batch_size: int
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookSubscriptionCreated(WebhookSubscriptionResponse):
+    """Returned once at creation - the only time the signing secret is shown"""
+    secret: str
+
+
+class WebhookDeliveryResponse(BaseModel):
+    """Schema for one entry in the webhook delivery log"""
+    id: int
+    delivery_id: str
+    event_count: int
+    attempt: int
+    succeeded: bool
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    duration_ms: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# ==== Audit Schemas ====
+
+class AuditEventResponse(BaseModel):
+    """Schema for one access audit record"""
+    ts: datetime
+    user_id: int
+    action: str
+    ticket_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+# ==== Analytics Schemas ====
+
+class StatsResponse(BaseModel):
+    """Schema for intake analytics served from the daily rollup"""
+    start: date
+    end: date
+    total: int
+    by_status: Dict[str, int]
+    by_urgency: Dict[str, int]
+    by_day: Dict[str, int]
+    acknowledged: int
+    avg_time_to_acknowledge_seconds: Optional[float] = None
+
+
 # ==== Chat Schemas ====
 
 class ChatMessageCreate(BaseModel):
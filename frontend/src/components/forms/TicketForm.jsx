@@ -1,48 +1,126 @@
-import { useState } from 'react'
+import { useEffect, useState } from 'react'
 import { useTranslation } from 'react-i18next'
 import Input from '../shared/Input'
 import TextArea from '../shared/TextArea'
 import Select from '../shared/Select'
 import Button from '../shared/Button'
 
+// Same origin by default (the Vite dev server proxies /intake to the API)
+const API_URL = import.meta.env.VITE_API_URL || ''
+
+const EMPTY_FORM = {
+  client_name: '',
+  client_email: '',
+  client_phone: '',
+  event_summary: '',
+  urgency_level: 'Low'
+}
+
+const URGENCY_LABELS = {
+  'Low': 'ticketForm.urgencyLow',
+  'Medium': 'ticketForm.urgencyMedium',
+  'High': 'ticketForm.urgencyHigh',
+  'Court Date Soon': 'ticketForm.urgencyCourtDate'
+}
+
+// Loose client-side check; the server's email validation has the final word
+const EMAIL_PATTERN = /^[^\s@]+@[^\s@]+\.[^\s@]+$/
+
+// The server's schema messages exist in its locales only (he, en)
+function contractLocale(contract, language) {
+  const lang = (language || '').split('-')[0]
+  return contract.locales.includes(lang) ? lang : contract.default_locale
+}
+
+// Mirror of the server's rules, driven by GET /intake/schema: returns
+// { field: message } using the same messages the API would send in a 422
+function validate(contract, locale, formData) {
+  const { properties, required = [] } = contract.schema
+  const messages = contract.messages[locale]
+  const errors = {}
+
+  for (const [field, spec] of Object.entries(properties)) {
+    const value = formData[field] ?? ''
+    let errorType = null
+
+    if (value === '') {
+      if (required.includes(field)) errorType = 'missing'
+    } else if (spec.minLength !== undefined && value.length < spec.minLength) {
+      errorType = 'string_too_short'
+    } else if (spec.maxLength !== undefined && value.length > spec.maxLength) {
+      errorType = 'string_too_long'
+    } else if (spec.pattern && !new RegExp(spec.pattern).test(value)) {
+      errorType = 'string_pattern_mismatch'
+    } else if (spec.format === 'email' && !EMAIL_PATTERN.test(value)) {
+      errorType = 'value_error'
+    } else if (spec.enum && !spec.enum.includes(value)) {
+      errorType = 'literal_error'
+    }
+
+    if (errorType) errors[field] = messages[field][errorType]
+  }
+  return errors
+}
+
 function TicketForm() {
-  const { t } = useTranslation()
+  const { t, i18n } = useTranslation()
+  const [contract, setContract] = useState(null)
   const [loading, setLoading] = useState(false)
   const [submitted, setSubmitted] = useState(false)
-  const [formData, setFormData] = useState({
-    client_name: '',
-    client_email: '',
-    client_phone: '',
-    event_summary: '',
-    urgency_level: 'Low'
-  })
-
-  const urgencyOptions = [
-    { value: 'Low', label: t('ticketForm.urgencyLow') },
-    { value: 'Medium', label: t('ticketForm.urgencyMedium') },
-    { value: 'Court Date Soon', label: t('ticketForm.urgencyHigh') }
-  ]
+  const [errors, setErrors] = useState({})
+  const [formData, setFormData] = useState(EMPTY_FORM)
+
+  useEffect(() => {
+    // Fields, constraints and error messages come from the API, so the form
+    // can't drift from the server's validation. Without it the form still
+    // works: the server validates and its 422 messages are shown instead.
+    fetch(`${API_URL}/intake/schema`)
+      .then(response => (response.ok ? response.json() : null))
+      .then(setContract)
+      .catch(() => setContract(null))
+  }, [])
+
+  const locale = contract ? contractLocale(contract, i18n.language) : undefined
+
+  const urgencyOptions = (contract?.schema.properties.urgency_level.enum || Object.keys(URGENCY_LABELS))
+    .map(value => ({ value, label: t(URGENCY_LABELS[value] || value, value) }))
+
+  const updateField = (field) => (e) => {
+    setFormData({ ...formData, [field]: e.target.value })
+    setErrors({ ...errors, [field]: null })
+  }
 
   const handleSubmit = async (e) => {
     e.preventDefault()
+
+    if (contract) {
+      const clientErrors = validate(contract, locale, formData)
+      setErrors(clientErrors)
+      if (Object.keys(clientErrors).length > 0) return
+    }
+
     setLoading(true)
-    
     try {
-      // TODO: API call will go here
-      console.log('Form data:', formData)
-      
-      // Simulate API call
-      await new Promise(resolve => setTimeout(resolve, 1000))
-      
-      setSubmitted(true)
-      setFormData({
-        client_name: '',
-        client_email: '',
-        client_phone: '',
-        event_summary: '',
-        urgency_level: 'Low'
+      const query = locale ? `?lang=${locale}` : ''
+      const response = await fetch(`${API_URL}/intake${query}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Accept-Language': i18n.language || '' },
+        body: JSON.stringify(formData)
       })
-      
+
+      if (response.status === 422) {
+        // Same catalog as the client-side messages; covers rules the
+        // browser can't check and a schema that changed since loading
+        const { detail } = await response.json()
+        setErrors(Object.fromEntries(detail.filter(error => error.field).map(error => [error.field, error.msg])))
+        return
+      }
+      if (!response.ok) throw new Error(`Intake failed with ${response.status}`)
+
+      setSubmitted(true)
+      setFormData(EMPTY_FORM)
+      setErrors({})
+
       setTimeout(() => setSubmitted(false), 3000)
     } catch (error) {
       alert(t('ticketForm.error'))
@@ -67,53 +145,57 @@ function TicketForm() {
       <h2 className="text-3xl font-bold text-gray-800 mb-6">
         {t('ticketForm.title')}
       </h2>
-      
-      <form onSubmit={handleSubmit}>
+
+      <form onSubmit={handleSubmit} noValidate={contract !== null}>
         <Input
           label={t('ticketForm.name')}
           placeholder={t('ticketForm.namePlaceholder')}
           value={formData.client_name}
-          onChange={(e) => setFormData({...formData, client_name: e.target.value})}
+          onChange={updateField('client_name')}
+          error={errors.client_name}
           required
         />
-        
+
         <Input
           type="email"
           label={t('ticketForm.email')}
           placeholder={t('ticketForm.emailPlaceholder')}
           value={formData.client_email}
-          onChange={(e) => setFormData({...formData, client_email: e.target.value})}
+          onChange={updateField('client_email')}
+          error={errors.client_email}
           required
         />
-        
+
         <Input
           type="tel"
           label={t('ticketForm.phone')}
           placeholder={t('ticketForm.phonePlaceholder')}
           value={formData.client_phone}
-          onChange={(e) => setFormData({...formData, client_phone: e.target.value})}
+          onChange={updateField('client_phone')}
+          error={errors.client_phone}
           required
         />
-        
+
         <TextArea
           label={t('ticketForm.summary')}
           placeholder={t('ticketForm.summaryPlaceholder')}
           value={formData.event_summary}
-          onChange={(e) => setFormData({...formData, event_summary: e.target.value})}
+          onChange={updateField('event_summary')}
+          error={errors.event_summary}
           rows={6}
           required
         />
-        
+
         <Select
           label={t('ticketForm.urgency')}
           options={urgencyOptions}
           value={formData.urgency_level}
-          onChange={(e) => setFormData({...formData, urgency_level: e.target.value})}
+          onChange={updateField('urgency_level')}
           required
         />
-        
-        <Button 
-          type="submit" 
+
+        <Button
+          type="submit"
           disabled={loading}
           className="w-full"
         >
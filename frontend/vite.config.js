@@ -4,4 +4,10 @@ import react from '@vitejs/plugin-react'
 // https://vite.dev/config/
 export default defineConfig({
   plugins: [react()],
+  server: {
+    // The intake form calls the API same-origin (GET /intake/schema, POST /intake)
+    proxy: {
+      '/intake': process.env.VITE_API_PROXY || 'http://localhost:8000',
+    },
+  },
 })
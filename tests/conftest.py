@@ -0,0 +1,169 @@
+"""
+Shared fixtures: the real app (app.main:app) on an in-memory SQLite database,
+driven in-process through httpx's ASGI transport - no server, no Postgres.
+
+Isolation: the schema and two seeded lawyers (one per firm) are created once
+per session. Each test runs inside one outer transaction that is rolled back
+afterwards; every session the app opens joins it through a SAVEPOINT, so the
+app's own commit()/rollback() calls behave normally but nothing leaks between
+tests.
+
+Async tests use the anyio pytest plugin (ships with anyio, which httpx and
+Starlette already depend on): mark them with pytest.mark.anyio.
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import base64
+import os
+
+# Fixed test keys and firms; must be set before app.core.config is imported
+os.environ.setdefault("PII_DATA_KEY", base64.b64encode(b"d" * 32).decode())
+os.environ.setdefault("PII_BLIND_INDEX_KEY", base64.b64encode(b"i" * 32).decode())
+os.environ.setdefault("FIRM_IDS", "default,other-firm")
+
+import re
+from contextlib import contextmanager
+from typing import Iterator, List
+import httpx
+import pytest
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.core import audit, dedupe, escalation, webhooks
+from app.core.blobstore import LocalBlobStore, get_blob_store
+from app.core.database import Base, get_db
+from app.core.security import create_access_token, hash_password
+from app.core.tenancy import resolve_firm_id
+from app.main import app
+from app.models import User
+
+FIRM = "default"
+OTHER_FIRM = "other-firm"
+LAWYER_EMAIL = "lawyer@example.com"
+LAWYER_PASSWORD = "SecurePassword123!"
+
+# Transaction bookkeeping the harness itself emits; not counted as queries
+_BOOKKEEPING = re.compile(r"^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b", re.IGNORECASE)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # Session scope: one event loop shared by the session-wide engine and every test
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINT; take it over
+    # (https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl)
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_implicit_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    # bcrypt is deliberately slow: hash once, seed one lawyer per firm
+    hashed = hash_password(LAWYER_PASSWORD)
+    async with AsyncSession(engine) as db:
+        db.add_all([User(firm_id=firm, email=LAWYER_EMAIL, hashed_password=hashed) for firm in (FIRM, OTHER_FIRM)])
+        await db.commit()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def connection(engine) -> AsyncConnection:
+    """One connection per test, inside a transaction that is always rolled back."""
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            yield connection
+        finally:
+            await transaction.rollback()
+
+
+@pytest.fixture
+def session_for(connection):
+    """Firm-scoped session factory bound to the test transaction (like ShardRouter.session)."""
+    def session_for(firm_id: str) -> AsyncSession:
+        return AsyncSession(
+            bind=connection,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+            info={"firm_id": firm_id}
+        )
+    return session_for
+
+
+@pytest.fixture
+async def client(session_for, monkeypatch, tmp_path) -> httpx.AsyncClient:
+    """The app with get_db (and the background subsystems' sessions) on the test transaction."""
+    async def override_get_db(request: Request):
+        async with session_for(resolve_firm_id(request)) as session:
+            yield session
+
+    # Process-wide singletons hold ticket ids and queued work; start each test fresh
+    dispatcher = webhooks.WebhookDispatcher(session_for)
+    monkeypatch.setattr(dedupe, "_indexes", {})
+    monkeypatch.setattr(escalation, "_scheduler", None)
+    monkeypatch.setattr(webhooks, "_dispatcher", dispatcher)
+    monkeypatch.setattr(audit, "_audit_log", audit.AuditLog(session_for))
+
+    blob_store = LocalBlobStore(tmp_path / "blobs")
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_blob_store] = lambda: blob_store
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        await dispatcher.close(drain_timeout=0)
+
+
+@pytest.fixture
+def auth_headers():
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': LAWYER_EMAIL, 'firm': FIRM})}"}
+
+
+@pytest.fixture
+def other_firm_headers():
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': LAWYER_EMAIL, 'firm': OTHER_FIRM})}"}
+
+
+@pytest.fixture
+def count_queries(engine):
+    """
+    Context manager collecting the SQL statements run inside it:
+
+        with count_queries() as queries:
+            await client.get("/tickets", headers=auth_headers)
+        assert len(queries) == 2
+    """
+    @contextmanager
+    def count_queries() -> Iterator[List[str]]:
+        queries: List[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if not _BOOKKEEPING.match(statement):
+                queries.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            yield queries
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    return count_queries
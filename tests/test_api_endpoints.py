@@ -0,0 +1,248 @@
+"""
+API tests against the in-process app on SQLite (see conftest.py), with a
+query budget per endpoint so N+1 regressions fail in CI.
+Run from project root: python -m pytest tests/test_api_endpoints.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pytest
+from app.core import webhooks
+from app.core.audit import get_audit_log
+from app.core.blobstore import get_blob_store
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+LEAD = {
+    "client_name": "Dana Levi",
+    "client_email": "dana@example.com",
+    "client_phone": "050-123-4567",
+    "event_summary": "I was fired two days after reporting harassment by my manager.",
+    "urgency_level": "High",
+}
+
+
+async def _submit(client, path="/intake", **overrides) -> int:
+    response = await client.post(path, json={**LEAD, **overrides})
+    assert response.status_code == 201, response.text
+    return response.json()["ticket_id"]
+
+
+async def test_register_and_login(client, count_queries):
+    credentials = {"email": "new.lawyer@example.com", "password": "SecurePassword123!"}
+    with count_queries() as queries:
+        response = await client.post("/auth/register", json=credentials)
+    assert response.status_code == 201
+    assert len(queries) == 3   # duplicate check, insert, refresh
+
+    response = await client.post("/auth/register", json=credentials)
+    assert response.status_code == 400
+
+    with count_queries() as queries:
+        response = await client.post(
+            "/auth/token",
+            data={"username": credentials["email"], "password": credentials["password"]}
+        )
+    assert response.status_code == 200
+    assert len(queries) == 1
+    token = response.json()["access_token"]
+
+    response = await client.get("/tickets", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+
+async def test_protected_routes_require_a_token(client):
+    assert (await client.get("/tickets")).status_code == 401
+    assert (await client.get("/tickets", headers={"Authorization": "Bearer garbage"})).status_code == 401
+
+
+async def test_intake_creates_ticket_in_three_queries(client, auth_headers, count_queries):
+    # Earlier tests' rows were rolled back
+    assert (await client.get("/tickets", headers=auth_headers)).json() == []
+
+    with count_queries() as queries:
+        ticket_id = await _submit(client)
+    assert len(queries) == 3   # insert, refresh, stats upsert
+
+    tickets = (await client.get("/tickets", headers=auth_headers)).json()
+    assert [(t["id"], t["client_email"], t["status"]) for t in tickets] == [(ticket_id, LEAD["client_email"], "New")]
+
+
+async def test_ticket_list_query_count_is_constant(client, auth_headers, count_queries):
+    for n in range(5):
+        await _submit(client, client_email=f"client{n}@example.com", event_summary=f"Unrelated matter number {n}")
+
+    with count_queries() as queries:
+        response = await client.get("/tickets", headers=auth_headers)
+    assert len(response.json()) == 5
+    assert len(queries) == 2   # current user, tickets page - never one per ticket
+
+
+async def test_status_change_updates_stats(client, auth_headers, count_queries):
+    ticket_id = await _submit(client)
+
+    with count_queries() as queries:
+        response = await client.patch(
+            f"/tickets/{ticket_id}/status",
+            json={"status": "Acknowledged"},
+            headers=auth_headers
+        )
+    assert response.status_code == 200
+    assert response.json()["status"] == "Acknowledged"
+    assert len(queries) == 6   # user, ticket, update, two rollup upserts, refresh
+
+    stats = (await client.get("/stats", headers=auth_headers)).json()
+    assert stats["total"] == 1 and stats["acknowledged"] == 1
+
+    response = await client.patch("/tickets/999/status", json={"status": "Closed"}, headers=auth_headers)
+    assert response.status_code == 404
+
+    # Unknown statuses would become new rollup buckets
+    response = await client.patch(f"/tickets/{ticket_id}/status", json={"status": "Archived"}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+async def test_client_history_and_stats_are_single_queries(client, auth_headers, count_queries):
+    await _submit(client)
+    await _submit(client, client_email="DANA@Example.com", event_summary="Follow-up about my severance pay.")
+
+    with count_queries() as queries:
+        history = await client.get("/clients/dana@example.com/tickets", headers=auth_headers)
+    assert len(history.json()) == 2
+    assert len(queries) == 2
+
+    with count_queries() as queries:
+        stats = await client.get("/stats", headers=auth_headers)
+    assert stats.json()["total"] == 2
+    assert len(queries) == 2
+
+
+async def test_attachment_upload_and_list(client, auth_headers, count_queries):
+    response = await client.post("/intake", json=LEAD)
+    ticket_id, upload_token = response.json()["ticket_id"], response.json()["upload_token"]
+    upload = {"files": {"file": ("police-report.txt", b"report body", "text/plain")}}
+
+    # Ticket ids are guessable; the token returned by /intake is what authorizes uploads
+    other_token = (await client.post("/intake", json=LEAD)).json()["upload_token"]
+    for headers in ({}, {"X-Upload-Token": other_token}, auth_headers):
+        response = await client.post(f"/intake/{ticket_id}/attachments", headers=headers, **upload)
+        assert response.status_code == 401
+
+    with count_queries() as queries:
+        response = await client.post(
+            f"/intake/{ticket_id}/attachments",
+            headers={"X-Upload-Token": upload_token},
+            **upload
+        )
+    assert response.status_code == 201
+    assert len(queries) == 4   # ticket check, existing attachment, insert, re-read
+
+    # An upload token is not a lawyer login
+    response = await client.get("/tickets", headers={"Authorization": f"Bearer {upload_token}"})
+    assert response.status_code == 401
+
+    with count_queries() as queries:
+        listed = await client.get(f"/tickets/{ticket_id}/attachments", headers=auth_headers)
+    assert [a["filename"] for a in listed.json()] == ["police-report.txt"]
+    assert len(queries) == 2
+
+
+async def test_attachment_download_streams_from_non_file_backends(client, auth_headers, monkeypatch):
+    response = await client.post("/intake", json=LEAD)
+    ticket_id, upload_token = response.json()["ticket_id"], response.json()["upload_token"]
+    response = await client.post(
+        f"/intake/{ticket_id}/attachments",
+        headers={"X-Upload-Token": upload_token},
+        files={"file": ("police-report.txt", b"0123456789", "text/plain")}
+    )
+    url = f"/tickets/{ticket_id}/attachments/{response.json()['id']}"
+
+    # Pretend the store is remote: no local path, bytes only through iter_chunks()
+    store = app.dependency_overrides[get_blob_store]()
+    monkeypatch.setattr(store, "local_path", lambda sha256: None)
+
+    response = await client.get(url, headers=auth_headers)
+    assert response.status_code == 200 and response.content == b"0123456789"
+    assert response.headers["accept-ranges"] == "bytes"
+
+    response = await client.get(url, headers={**auth_headers, "Range": "bytes=2-5"})
+    assert response.status_code == 206 and response.content == b"2345"
+    assert response.headers["content-range"] == "bytes 2-5/10"
+
+    response = await client.get(url, headers={**auth_headers, "Range": "bytes=-3"})
+    assert response.content == b"789"
+
+    response = await client.get(url, headers={**auth_headers, "Range": "bytes=10-"})
+    assert response.status_code == 416 and response.headers["content-range"] == "bytes */10"
+
+
+async def test_views_are_audited_without_request_path_writes(client, auth_headers, count_queries):
+    ticket_id = await _submit(client)
+
+    with count_queries() as queries:
+        await client.get("/tickets", headers=auth_headers)
+    assert not any(q.lstrip().upper().startswith("INSERT") for q in queries)
+
+    await get_audit_log().flush()
+    with count_queries() as queries:
+        events = (await client.get("/audit", params={"ticket_id": ticket_id}, headers=auth_headers)).json()
+    assert [(e["action"], e["ticket_id"]) for e in events] == [("tickets.list", ticket_id)]
+    assert len(queries) == 2
+
+    # Own history by default; a colleague's history is off limits
+    own = (await client.get("/audit", headers=auth_headers)).json()
+    assert [e["ticket_id"] for e in own] == [ticket_id]
+    other_user_id = own[0]["user_id"] + 1
+    response = await client.get("/audit", params={"user_id": other_user_id}, headers=auth_headers)
+    assert response.status_code == 403
+
+
+async def test_webhook_subscription_lifecycle(client, auth_headers, count_queries, monkeypatch):
+    async def _resolve(host, port):
+        return {"crm.example.com": ["93.184.216.34"], "internal.example.com": ["10.0.0.7"]}[host]
+
+    monkeypatch.setattr(webhooks, "_resolve", _resolve)
+    for url in ("http://crm.example.com/hooks", "https://internal.example.com/hooks", "https://127.0.0.1:9/crm"):
+        rejected = await client.post("/webhooks", json={"url": url}, headers=auth_headers)
+        assert rejected.status_code == 400
+
+    with count_queries() as queries:
+        created = await client.post("/webhooks", json={"url": "https://crm.example.com/hooks"}, headers=auth_headers)
+    assert created.status_code == 201 and created.json()["secret"]
+    assert len(queries) == 3
+
+    subscription_id = created.json()["id"]
+    with count_queries() as queries:
+        listed = await client.get("/webhooks", headers=auth_headers)
+    assert [s["id"] for s in listed.json()] == [subscription_id]
+    assert len(queries) == 2
+
+    response = await client.delete(f"/webhooks/{subscription_id}", headers=auth_headers)
+    assert response.status_code == 204
+    assert (await client.get("/webhooks", headers=auth_headers)).json() == []
+
+
+async def test_firms_only_see_their_own_tickets(client, auth_headers, other_firm_headers):
+    own = await _submit(client)
+    other = await _submit(client, path="/intake/other-firm")
+
+    assert [t["id"] for t in (await client.get("/tickets", headers=auth_headers)).json()] == [own]
+    assert [t["id"] for t in (await client.get("/tickets", headers=other_firm_headers)).json()] == [other]
+
+    response = await client.patch(f"/tickets/{own}/status", json={"status": "Closed"}, headers=other_firm_headers)
+    assert response.status_code == 404
+    assert (await client.post("/intake/Not A Firm", json=LEAD)).status_code == 404
+    assert (await client.post("/intake/unlisted-firm", json=LEAD)).status_code == 404
+    assert (await client.post("/intake/schema", json=LEAD)).status_code == 404
+
+
+async def test_notification_stats_are_served_by_their_own_router(client, auth_headers):
+    response = await client.get("/notifications/stats", headers=auth_headers)
+    assert response.status_code == 200 and "sent" in response.json()
+    assert (await client.get("/stats/notifications", headers=auth_headers)).status_code == 404
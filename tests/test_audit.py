@@ -0,0 +1,97 @@
+"""
+Tests for the buffered access audit log.
+Run from project root: python -m pytest tests/test_audit.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import asyncio
+import datetime
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.core.audit import DROP_NEWEST, DROP_OLDEST, AuditBuffer, AuditLog, query_audit_events
+from app.core.database import Base
+
+TS = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _records(*ticket_ids):
+    return [("default", TS, 1, "tickets.list", ticket_id) for ticket_id in ticket_ids]
+
+
+def test_buffer_overflow_policies_bound_and_count_loss():
+    oldest = AuditBuffer(capacity=3, overflow_policy=DROP_OLDEST)
+    oldest.extend(_records(1, 2))
+    oldest.extend(_records(3, 4, 5))
+    assert [r[4] for r in oldest.take(10)] == [3, 4, 5]
+    assert oldest.dropped == 2
+
+    newest = AuditBuffer(capacity=3, overflow_policy=DROP_NEWEST)
+    newest.extend(_records(1, 2))
+    newest.extend(_records(3, 4, 5))
+    assert [r[4] for r in newest.take(10)] == [1, 2, 3]
+    assert newest.dropped == 2
+
+    with pytest.raises(ValueError):
+        AuditBuffer(capacity=3, overflow_policy="block")
+
+
+def test_requeue_keeps_order_within_capacity():
+    buffer = AuditBuffer(capacity=4)
+    buffer.extend(_records(1, 2, 3))
+    batch = buffer.take(2)
+    buffer.extend(_records(4, 5))
+    buffer.requeue(batch)   # room for one of the two
+    assert [r[4] for r in buffer.take(10)] == [2, 3, 4, 5]
+    assert buffer.dropped == 1
+
+
+async def _flush_and_query():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    def session_for(firm_id):
+        return session_factory(info={"firm_id": firm_id})
+
+    audit = AuditLog(session_for, capacity=100, batch_size=2, flush_interval=60)
+    audit.record("alpha", 1, "tickets.list", [10, 11, 12])
+    audit.record("alpha", 2, "attachments.download", [11])
+    audit.record("beta", 1, "tickets.list", [11])
+    assert len(audit.buffer) == 5   # nothing written on the request path
+    written = await audit.flush()
+
+    async with session_for("alpha") as db:
+        by_user = await query_audit_events(db, user_id=1)
+        by_ticket = await query_audit_events(db, ticket_id=11)
+    return written, audit.stats(), by_user, by_ticket
+
+
+def test_flush_bulk_writes_and_query_by_user_and_ticket():
+    written, stats, by_user, by_ticket = asyncio.run(_flush_and_query())
+    assert written == 5
+    assert stats["buffered"] == 0 and stats["written"] == 5 and stats["dropped"] == 0
+    assert sorted(e.ticket_id for e in by_user) == [10, 11, 12]
+    assert sorted((e.user_id, e.action) for e in by_ticket) == [(1, "tickets.list"), (2, "attachments.download")]
+
+
+def test_failed_flush_keeps_records_buffered():
+    def broken_session(firm_id):
+        raise ConnectionError("database unavailable")
+
+    async def run():
+        audit = AuditLog(broken_session, capacity=100, batch_size=10, flush_interval=60)
+        audit.record("default", 1, "tickets.list", [1, 2, 3])
+        with pytest.raises(ConnectionError):
+            await audit.flush()
+        return audit.stats()
+
+    stats = asyncio.run(run())
+    assert stats["buffered"] == 3 and stats["failed_flushes"] == 1 and stats["dropped"] == 0
@@ -0,0 +1,50 @@
+"""
+Tests for the content-addressed local blob store.
+Run from project root: python -m pytest tests/test_blobstore.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import asyncio
+import hashlib
+from app.core.blobstore import LocalBlobStore
+
+
+async def _store(store: LocalBlobStore, data: bytes, chunk_size: int = 4) -> str:
+    writer = store.open_writer()
+    for i in range(0, len(data), chunk_size):
+        await writer.write(data[i:i + chunk_size])
+    return await writer.commit()
+
+
+def test_chunked_write_hashes_and_dedupes(tmp_path):
+    """Identical content written twice is stored once under its SHA-256."""
+    store = LocalBlobStore(str(tmp_path))
+    data = b"court notice contents"
+
+    first = asyncio.run(_store(store, data))
+    second = asyncio.run(_store(store, data, chunk_size=7))
+
+    assert first == second == hashlib.sha256(data).hexdigest()
+    assert store.local_path(first).read_bytes() == data
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_abort_discards_partial_upload(tmp_path):
+    """Aborted uploads leave nothing behind."""
+    store = LocalBlobStore(str(tmp_path))
+
+    async def _partial():
+        writer = store.open_writer()
+        await writer.write(b"partial")
+        await writer.abort()
+        return writer.sha256
+
+    digest = asyncio.run(_partial())
+    assert not asyncio.run(store.exists(digest))
+    assert list((tmp_path / "tmp").iterdir()) == []
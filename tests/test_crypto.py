@@ -0,0 +1,57 @@
+"""
+Tests for field-level PII encryption and blind indexes.
+Run from project root: python -m pytest tests/test_crypto.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pytest
+from cryptography.exceptions import InvalidTag
+from app.core import crypto
+from app.core.crypto import CIPHERTEXT_PREFIX, blind_index, get_field_cipher
+
+
+def test_encrypt_round_trip_is_randomized():
+    """Same plaintext encrypts differently each time but decrypts back."""
+    cipher = get_field_cipher()
+    first = cipher.encrypt("ישראל ישראלי", b"tickets.client_name")
+    second = cipher.encrypt("ישראל ישראלי", b"tickets.client_name")
+
+    assert first.startswith(CIPHERTEXT_PREFIX)
+    assert first != second
+    assert cipher.decrypt(first, b"tickets.client_name") == "ישראל ישראלי"
+
+
+def test_ciphertext_is_bound_to_its_column():
+    """A value copied into another column fails authentication."""
+    cipher = get_field_cipher()
+    stored = cipher.encrypt("050-1234567", b"tickets.client_phone")
+    with pytest.raises(InvalidTag):
+        cipher.decrypt(stored, b"tickets.client_email")
+
+
+def test_plaintext_is_only_returned_while_allowed():
+    cipher = get_field_cipher()
+    with pytest.raises(ValueError):
+        cipher.decrypt("jane@example.com", b"tickets.client_email")
+    # Migration 004 reads not-yet-encrypted rows explicitly
+    assert cipher.decrypt("jane@example.com", allow_plaintext=True) == "jane@example.com"
+
+
+def test_missing_keys_fail_unless_dev_keys_are_allowed(monkeypatch):
+    monkeypatch.setattr(crypto, "ALLOW_DEV_PII_KEYS", False)
+    with pytest.raises(RuntimeError):
+        crypto._load_key("", b"label")
+    monkeypatch.setattr(crypto, "ALLOW_DEV_PII_KEYS", True)
+    assert len(crypto._load_key("", b"label")) == 32
+
+
+def test_blind_index_is_deterministic_and_normalized():
+    assert blind_index(" Jane@Example.com ") == blind_index("jane@example.com")
+    assert blind_index("jane@example.com") != blind_index("john@example.com")
+    assert blind_index(None) is None
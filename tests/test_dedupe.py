@@ -0,0 +1,67 @@
+"""
+Tests for MinHash/LSH near-duplicate and spam detection.
+Run from project root: python -m pytest tests/test_dedupe.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from app.core.dedupe import MinHashLSHIndex, cluster_signatures, estimated_jaccard, minhash_signature
+
+SUMMARY = (
+    "I was fired from my job after reporting harassment by my manager, "
+    "and I need advice about a wrongful termination claim."
+)
+REWORDED = SUMMARY.replace("advice", "legal advice").upper() + "!!"
+UNRELATED = "Car accident on the highway, the other driver ran a red light."
+
+
+def test_signature_is_stable_and_similarity_tracks_text():
+    assert (minhash_signature(SUMMARY) == minhash_signature(SUMMARY)).all()
+    assert estimated_jaccard(minhash_signature(SUMMARY), minhash_signature(REWORDED)) > 0.7
+    assert estimated_jaccard(minhash_signature(SUMMARY), minhash_signature(UNRELATED)) < 0.2
+
+
+def test_same_client_rewording_links_to_earliest_ticket():
+    index = MinHashLSHIndex(threshold=0.7, capacity=100, spam_min_clients=3)
+    index.add(1, minhash_signature(SUMMARY), "client-a")
+    index.add(2, minhash_signature(UNRELATED), "client-b")
+
+    verdict = index.check(minhash_signature(REWORDED), "client-a")
+    assert verdict.duplicate_of_id == 1
+    assert not verdict.is_spam
+
+
+def test_same_text_from_many_clients_is_spam():
+    index = MinHashLSHIndex(threshold=0.7, capacity=100, spam_min_clients=3)
+    index.add(1, minhash_signature(SUMMARY), "bot-1")
+    index.add(2, minhash_signature(REWORDED), "bot-2")
+
+    assert index.check(minhash_signature(SUMMARY), "bot-3").is_spam
+
+
+def test_short_generic_summaries_are_never_spam():
+    index = MinHashLSHIndex(threshold=0.7, capacity=100, spam_min_clients=3, spam_min_length=80)
+    index.add(1, minhash_signature("I was fired"), "client-a")
+    index.add(2, minhash_signature("I was fired!"), "client-b")
+
+    verdict = index.check(minhash_signature("i was fired"), "client-c", summary_length=len("i was fired"))
+    assert not verdict.is_spam
+
+
+def test_capacity_evicts_oldest_entries():
+    index = MinHashLSHIndex(threshold=0.7, capacity=1)
+    index.add(1, minhash_signature(SUMMARY))
+    index.add(2, minhash_signature(UNRELATED))
+
+    assert len(index) == 1
+    assert index.matches(minhash_signature(SUMMARY)) == []
+
+
+def test_cluster_signatures_groups_near_duplicates():
+    entries = [(i, minhash_signature(text)) for i, text in [(1, SUMMARY), (2, UNRELATED), (3, REWORDED)]]
+    assert cluster_signatures(entries) == [[1, 3]]
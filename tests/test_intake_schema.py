@@ -0,0 +1,74 @@
+"""
+Tests for the precomputed intake schema and localized intake validation errors.
+Run from project root: python -m pytest tests/test_intake_schema.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pytest
+from app.core.intake_schema import INTAKE_SCHEMA
+
+pytestmark = pytest.mark.anyio
+
+INVALID_LEAD = {
+    "client_name": "Dana Levi",
+    "client_email": "not-an-email",
+    "client_phone": "050-123-4567",
+    "event_summary": "I was fired two days after reporting harassment by my manager.",
+    "urgency_level": "Whenever",
+}
+
+
+async def test_schema_is_served_from_memory_with_etag(client, count_queries):
+    with count_queries() as queries:
+        response = await client.get("/intake/schema")
+    assert response.status_code == 200
+    assert queries == []
+
+    document = response.json()
+    assert document["version"] == INTAKE_SCHEMA.version
+    assert response.headers["etag"] == f'"{INTAKE_SCHEMA.version}"'
+    assert set(document["schema"]["required"]) == {"client_name", "client_email", "client_phone", "event_summary"}
+    assert document["schema"]["properties"]["urgency_level"]["enum"] == ["Low", "Medium", "High", "Court Date Soon"]
+    assert document["messages"]["en"]["client_name"]["string_too_long"] == "Cannot be longer than 200 characters"
+
+    response = await client.get("/intake/schema", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304 and response.content == b""
+
+
+async def test_versioned_schema_is_immutable_and_stale_versions_redirect(client):
+    response = await client.get(f"/intake/schema/{INTAKE_SCHEMA.version}")
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+
+    response = await client.get("/intake/schema/0000000000000000")
+    assert response.status_code == 307
+    assert response.headers["location"] == f"/intake/schema/{INTAKE_SCHEMA.version}"
+
+
+async def test_validation_errors_use_the_schema_catalog(client):
+    response = await client.post("/intake", json=INVALID_LEAD)
+    assert response.status_code == 422
+    assert response.headers["content-language"] == "he"
+    body = response.json()
+    assert body["schema_version"] == INTAKE_SCHEMA.version
+    errors = {e["field"]: e["msg"] for e in body["detail"]}
+    assert errors["client_email"] == "נא להזין כתובת דוא״ל תקינה"
+    assert "not-an-email" not in response.text
+
+    catalog = (await client.get("/intake/schema")).json()["messages"]
+    response = await client.post("/intake", json=INVALID_LEAD, headers={"Accept-Language": "ru, en-US;q=0.8"})
+    assert response.headers["content-language"] == "en"
+    errors = {e["field"]: e["msg"] for e in response.json()["detail"]}
+    assert errors == {
+        "client_email": catalog["en"]["client_email"]["value_error"],
+        "urgency_level": catalog["en"]["urgency_level"]["literal_error"],
+    }
+
+    response = await client.post("/intake?lang=en", json={})
+    assert {e["msg"] for e in response.json()["detail"]} == {"This field is required"}
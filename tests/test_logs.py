@@ -0,0 +1,109 @@
+"""
+Tests for the JSON logging pipeline, sampling, slow-query log and request ids.
+Run from project root: python -m pytest tests/test_logs.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import io
+import json
+import logging
+import pytest
+from sqlalchemy import create_engine, text
+from app.core.logs import SamplingFilter, parse_sampling, request_id_var, setup_logging, shutdown_logging
+
+
+def _record(name: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, "msg", None, None)
+
+
+def test_sampling_keeps_exact_fraction_per_logger_and_all_warnings():
+    sampler = SamplingFilter(parse_sampling("app.access:0.25, app:1"))
+
+    kept = [sampler.filter(_record("app.access")) for _ in range(100)]
+    assert sum(kept) == 25 and kept[0]
+    assert all(sampler.filter(_record("app.access", logging.WARNING)) for _ in range(10))
+    assert all(sampler.filter(_record("app.core.audit")) for _ in range(10))   # rate 1
+    assert all(sampler.filter(_record("uvicorn")) for _ in range(10))          # not configured
+
+
+def _run_pipeline(emit, **kwargs):
+    stream = io.StringIO()
+    setup_logging(level="INFO", stream=stream, **kwargs)
+    try:
+        emit()
+    finally:
+        shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_pipeline_writes_json_with_request_id_extras_and_tracebacks():
+    def emit():
+        token = request_id_var.set("req-1")
+        try:
+            logging.getLogger("app.test").info("lead %s queued", 7, extra={"ticket_id": 7})
+            try:
+                raise RuntimeError("smtp down")
+            except RuntimeError:
+                logging.getLogger("app.test").exception("send failed")
+        finally:
+            request_id_var.reset(token)
+        logging.getLogger("app.test").debug("below level")
+
+    lines = _run_pipeline(emit)
+    assert [(line["level"], line["message"]) for line in lines] == [("INFO", "lead 7 queued"), ("ERROR", "send failed")]
+    assert lines[0]["request_id"] == "req-1" and lines[0]["ticket_id"] == 7
+    assert "RuntimeError: smtp down" in lines[1]["exc_info"]
+
+
+def test_sql_is_only_logged_when_slow():
+    engine = create_engine("sqlite://")
+
+    def query():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    assert _run_pipeline(query) == []   # off by default
+    assert _run_pipeline(query, slow_query_ms=60_000) == []
+    lines = _run_pipeline(query, slow_query_ms=1e-9)
+    assert [(line["logger"], line["statement"]) for line in lines] == [("app.sql.slow", "SELECT 1")]
+
+
+def test_failed_statements_do_not_leak_start_times():
+    engine = create_engine("sqlite://")
+
+    def fail():
+        with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(Exception):
+                    conn.execute(text("SELECT * FROM missing"))
+            assert conn.info.get("query_start") == []
+
+    assert _run_pipeline(fail, slow_query_ms=60_000) == []
+
+
+def test_uvicorn_access_lines_are_dropped_when_the_app_writes_its_own():
+    def emit():
+        logging.getLogger("uvicorn.access").info("GET / 200")
+        logging.getLogger("uvicorn.error").info("Started server")
+
+    try:
+        lines = _run_pipeline(emit, access_log=True)
+    finally:
+        logging.getLogger("uvicorn.access").setLevel(logging.NOTSET)
+    assert [line["logger"] for line in lines] == ["uvicorn.error"]
+
+
+@pytest.mark.anyio
+async def test_request_id_is_echoed_or_generated(client):
+    response = await client.get("/", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["x-request-id"] == "abc-123"
+
+    response = await client.get("/", headers={"X-Request-ID": "not valid\tid"})
+    generated = response.headers["x-request-id"]
+    assert generated != "not valid\tid" and len(generated) == 32
@@ -0,0 +1,32 @@
+"""
+Tests for client identifier normalization.
+Run from project root: python -m pytest tests/test_normalize.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from app.core.normalize import normalize_email, normalize_phone
+
+
+def test_phone_variants_share_one_e164_form():
+    """International, 00-prefixed and national formats all converge."""
+    variants = ["+972-50-123-4567", "00972 50 1234567", "050-1234567", "972501234567", "(050) 123 4567"]
+    assert {normalize_phone(v) for v in variants} == {"+972501234567"}
+
+
+def test_foreign_numbers_keep_their_country_code():
+    assert normalize_phone("+1 (415) 555-0100") == "+14155550100"
+
+
+def test_unusable_phone_returns_none():
+    assert normalize_phone("12") is None
+    assert normalize_phone("not a phone") is None
+
+
+def test_email_is_lowercased_and_trimmed():
+    assert normalize_email("  Jane.Doe@Example.COM ") == "jane.doe@example.com"
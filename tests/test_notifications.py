@@ -0,0 +1,135 @@
+"""
+Tests for the pooled SMTP lead notifier, against a local aiosmtpd stand-in.
+Run from project root: python -m pytest tests/test_notifications.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import asyncio
+import socket
+from email import message_from_bytes, policy
+from aiosmtpd.controller import Controller
+from app.core.notifications import (
+    Lead,
+    LeadNotifier,
+    SMTPPool,
+    header_safe,
+    parse_recipient_firms,
+    parse_recipients,
+    render_leads,
+)
+
+
+class _Inbox:
+    """aiosmtpd handler that just keeps every message it receives."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(message_from_bytes(envelope.content, policy=policy.default))
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _lead(ticket_id: int) -> Lead:
+    return Lead(ticket_id, "דנה כהן", f"client{ticket_id}@example.com", "Court Date Soon")
+
+
+def test_parse_recipients_defaults_to_hebrew():
+    assert parse_recipients("a@firm.com, b@firm.com:en") == {"a@firm.com": "he", "b@firm.com": "en"}
+
+
+def test_recipients_only_get_their_own_firms_leads():
+    raw = "a@firm.com:he, b@other.com:en:Other-Firm, ops@host.com:en:*"
+    assert parse_recipient_firms(raw) == {"a@firm.com": "default", "b@other.com": "other-firm", "ops@host.com": "*"}
+
+    notifier = LeadNotifier(None, parse_recipients(raw), "intake@test.local", 0, parse_recipient_firms(raw))
+    assert notifier._recipients_for("default") == ["a@firm.com", "ops@host.com"]
+    assert notifier._recipients_for("other-firm") == ["b@other.com", "ops@host.com"]
+    assert notifier._recipients_for("third-firm") == ["ops@host.com"]
+
+
+def test_render_single_and_digest():
+    subject, body = render_leads([_lead(1)], "en")
+    assert subject == "New lead #1 (Court Date Soon)"
+    assert "client1@example.com" in body
+
+    subject, body = render_leads([_lead(1), _lead(2)], "he")
+    assert subject == "2 פניות חדשות"
+    assert "#2 | דנה כהן" in body
+
+    spam = Lead(3, "Bot", "bot@example.com", "Low", suspected_spam=True)
+    assert render_leads([spam], "en")[0] == "[Suspected spam] New lead #3 (Low)"
+    assert "[חשד לספאם] #3 | Bot" in render_leads([_lead(1), spam], "he")[1]
+
+
+def test_burst_is_sent_as_one_digest_per_lawyer_over_pooled_connection():
+    inbox = _Inbox()
+    port = _free_port()
+    controller = Controller(inbox, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        async def _run():
+            pool = SMTPPool("127.0.0.1", port, size=1)
+            notifier = LeadNotifier(
+                pool,
+                recipients={"he@firm.com": "he", "en@firm.com": "en"},
+                sender="intake@test.local",
+                window_seconds=0.05
+            )
+            for ticket_id in range(1, 4):
+                notifier.notify_new_lead(_lead(ticket_id))
+            await asyncio.sleep(0.2)
+            notifier.notify_new_lead(_lead(4))
+            await notifier.close()
+            return pool, notifier
+
+        pool, notifier = asyncio.run(_run())
+    finally:
+        controller.stop()
+
+    subjects = sorted(str(m["Subject"]) for m in inbox.messages)
+    assert subjects == ["3 new leads", "3 פניות חדשות", "New lead #4 (Court Date Soon)", "פנייה חדשה #4 (Court Date Soon)"]
+    assert pool.connections_opened == 1
+    assert notifier.latency.summary()["sent"] == 4
+
+
+def test_header_injection_is_neutralized_and_build_errors_are_contained():
+    assert header_safe("New lead #1 (High\r\nBcc: x@evil.test)") == "New lead #1 (High Bcc: x@evil.test)"
+
+    class _RecordingPool:
+        def __init__(self):
+            self.sent = []
+
+        async def send(self, message):
+            self.sent.append(message)
+
+        async def close(self):
+            pass
+
+    async def _run():
+        pool = _RecordingPool()
+        notifier = LeadNotifier(pool, recipients={"en@firm.com": "en"}, sender="intake@test.local", window_seconds=0)
+        notifier.notify_new_lead(Lead(1, "Dana", "d@example.com", "High\r\nBcc: x@evil.test"))
+        await notifier.close()
+
+        # A lead whose fields break rendering is counted as a failure, not a lost task
+        notifier.notify_new_lead(Lead(3, "Dana", "d@example.com", "High"))
+        notifier._build_message = lambda recipient, leads: 1 / 0
+        await notifier.close()
+        return pool, notifier
+
+    pool, notifier = asyncio.run(_run())
+    assert [str(m["Subject"]) for m in pool.sent] == ["New lead #1 (High Bcc: x@evil.test)"]
+    assert "Bcc" not in pool.sent[0] and notifier.latency.failures == 1
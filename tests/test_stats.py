@@ -0,0 +1,28 @@
+"""
+Tests for the analytics rollup helpers.
+Run from project root: python -m pytest tests/test_stats.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from datetime import date, datetime, timedelta, timezone
+from app.core.stats import bucket_day, seconds_between
+
+
+def test_bucket_day_uses_utc():
+    """Tickets are bucketed by their UTC day, whatever the stored offset."""
+    israel = timezone(timedelta(hours=3))
+    assert bucket_day(datetime(2026, 1, 2, 1, 30, tzinfo=israel)) == date(2026, 1, 1)
+    assert bucket_day(datetime(2026, 1, 2, 1, 30)) == date(2026, 1, 2)
+
+
+def test_seconds_between_mixed_naive_and_aware():
+    """Naive timestamps (e.g. from SQLite) are treated as UTC."""
+    created = datetime(2026, 1, 1, 12, 0)
+    acknowledged = datetime(2026, 1, 1, 12, 5, tzinfo=timezone.utc)
+    assert seconds_between(created, acknowledged) == 300
@@ -0,0 +1,114 @@
+"""
+Tests for multi-tenant shard routing and firm scoping.
+Run from project root: python -m pytest tests/test_tenancy.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import asyncio
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import StaticPool
+from app.core import tenancy
+from app.core.database import Base
+from app.core.tenancy import ShardRouter, firm_from_host, parse_firm_ids, parse_shards, rendezvous_shard
+from app.models import WebhookSubscription
+
+FIRMS = [f"firm-{n}" for n in range(200)]
+
+
+def test_rendezvous_only_moves_firms_onto_a_new_shard():
+    before = {firm: rendezvous_shard(firm, ["s1", "s2", "s3"]) for firm in FIRMS}
+    after = {firm: rendezvous_shard(firm, ["s1", "s2", "s3", "s4"]) for firm in FIRMS}
+
+    moved = [firm for firm in FIRMS if before[firm] != after[firm]]
+    assert moved and all(after[firm] == "s4" for firm in moved)
+    assert len(set(before.values())) == 3   # every shard gets firms
+
+
+def test_overrides_pin_firms_to_dedicated_shards():
+    router = ShardRouter(
+        {"s1": "sqlite+aiosqlite://", "s2": "sqlite+aiosqlite://", "big": "sqlite+aiosqlite://"},
+        overrides={"big-firm": "big"}
+    )
+    assert router.shard_for("big-firm") == "big"
+    # The dedicated shard is taken out of the hash ring
+    assert {router.shard_for(firm) for firm in FIRMS} == {"s1", "s2"}
+
+    with pytest.raises(ValueError):
+        ShardRouter({"s1": "sqlite+aiosqlite://"}, overrides={"big-firm": "missing"})
+
+
+def test_parse_shards_defaults_to_single_shard():
+    assert parse_shards("", default_url="sqlite://") == {"default": "sqlite://"}
+    assert parse_shards(" a=postgresql://h1/db , b=postgresql://h2/db") == {
+        "a": "postgresql://h1/db",
+        "b": "postgresql://h2/db",
+    }
+
+
+def test_firm_ids_are_required_for_multi_tenant_routing():
+    assert parse_firm_ids("") == {"default"}
+    assert parse_firm_ids("Cohen, levi") == {"cohen", "levi", "default"}
+    with pytest.raises(ValueError):
+        parse_firm_ids("", multi_tenant=True)
+    with pytest.raises(ValueError):
+        parse_firm_ids("cohen,schema")
+
+
+def test_firm_from_host(monkeypatch):
+    monkeypatch.setattr(tenancy, "_FIRM_HOSTS", {"intake.cohen-law.co.il": "cohen"})
+    monkeypatch.setattr(tenancy, "TENANT_BASE_DOMAIN", "intake.example.com")
+
+    assert firm_from_host("intake.cohen-law.co.il:443") == "cohen"
+    assert firm_from_host("Levi.intake.example.com") == "levi"
+    assert firm_from_host("a.b.intake.example.com") is None
+    assert firm_from_host("localhost:8000") is None
+
+
+async def _scoped_queries():
+    router = ShardRouter({"s1": "sqlite+aiosqlite://"}, poolclass=StaticPool)
+    async with router.engine("s1").begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    for firm in ("alpha", "beta"):
+        async with router.session(firm) as db:
+            db.add(WebhookSubscription(url=f"http://{firm}", secret="s", event_types="ticket.created"))
+            await db.commit()
+
+    async with router.session("alpha") as db:
+        rows = (await db.execute(select(WebhookSubscription))).scalars().all()
+        count = (await db.execute(select(func.count()).select_from(WebhookSubscription))).scalar()
+        updated = (await db.execute(
+            update(WebhookSubscription).values(is_active=False).returning(WebhookSubscription.id)
+        )).all()
+        await db.commit()
+        db.add(WebhookSubscription(firm_id="beta", url="http://x", secret="s", event_types="ticket.created"))
+        with pytest.raises(ValueError):
+            await db.flush()
+
+    async with router.shard_session("s1") as db:
+        # Unscoped sessions don't stamp a firm, and there is no default to fall back on
+        db.add(WebhookSubscription(url="http://unowned", secret="s", event_types="ticket.created"))
+        with pytest.raises(IntegrityError):
+            await db.flush()
+        await db.rollback()
+        everything = (await db.execute(
+            select(WebhookSubscription.firm_id, WebhookSubscription.is_active).order_by(WebhookSubscription.id)
+        )).all()
+    await router.dispose()
+    return rows, count, updated, everything
+
+
+def test_firm_sessions_only_see_and_write_their_own_rows():
+    rows, count, updated, everything = asyncio.run(_scoped_queries())
+    assert [(row.firm_id, row.url) for row in rows] == [("alpha", "http://alpha")]
+    assert count == 1
+    assert len(updated) == 1
+    assert everything == [("alpha", False), ("beta", True)]
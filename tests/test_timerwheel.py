@@ -0,0 +1,101 @@
+"""
+Tests for the hierarchical timer wheel and SLA config parsing.
+Run from project root: python -m pytest tests/test_timerwheel.py
+"""
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import pytest
+
+from app.core.escalation import EscalationScheduler, parse_actions, parse_sla
+from app.core.timerwheel import HierarchicalTimerWheel
+
+
+def _run(wheel, until, step=1):
+    """Advance tick by tick, returning {key: tick it fired on}."""
+    fired = {}
+    while wheel.current_tick < until:
+        tick = min(wheel.current_tick + step, until)
+        for key, _ in wheel.advance(tick):
+            fired[key] = tick
+    return fired
+
+
+def test_timers_fire_exactly_on_their_tick_across_levels():
+    wheel = HierarchicalTimerWheel(start_tick=1000, slot_bits=3, levels=3)
+    rng = random.Random(7)
+    expiries = {key: 1000 + rng.randint(1, 600) for key in range(300)}
+    for key, expiry in expiries.items():
+        wheel.schedule(key, expiry, payload=key)
+    assert len(wheel) == 300
+
+    fired = _run(wheel, 1700)
+    assert fired == expiries
+    assert len(wheel) == 0
+
+
+def test_cancel_and_reschedule():
+    wheel = HierarchicalTimerWheel(start_tick=0, slot_bits=2, levels=2)
+    wheel.schedule("a", 5)
+    wheel.schedule("b", 9)
+    assert wheel.cancel("a") is True
+    assert wheel.cancel("a") is False
+    wheel.schedule("b", 3)   # replaces the earlier deadline
+
+    assert _run(wheel, 20) == {"b": 3}
+    assert "b" not in wheel
+
+
+def test_past_and_out_of_range_timers():
+    wheel = HierarchicalTimerWheel(start_tick=100, slot_bits=2, levels=2)   # covers 16 ticks
+    wheel.schedule("overdue", 50, payload="x")
+    wheel.schedule("far", 140)
+    assert wheel.advance(100) == [("overdue", "x")]
+
+    # Coarse advances still deliver the far timer on the first call past it
+    assert _run(wheel, 200, step=7) == {"far": 142}
+
+
+def test_parse_sla_and_actions():
+    assert parse_sla("Court Date Soon:60, High:240,*:1440") == {
+        "Court Date Soon": 3600, "High": 14400, "*": 86400
+    }
+    assert parse_actions("renotify, bump_priority") == {"renotify", "bump_priority"}
+    with pytest.raises(ValueError):
+        parse_actions("reassign")
+
+
+def test_stalled_escalation_does_not_hold_up_later_deadlines():
+    async def _run():
+        scheduler = EscalationScheduler(None, {"*": 60}, set(), tick_seconds=0.01, batch_timeout=0.1)
+        escalated = []
+
+        async def escalate(keys):
+            keys = list(keys)
+            if ("a", 1) in keys:
+                await asyncio.sleep(10)   # e.g. stuck waiting on a row lock
+            escalated.extend(keys)
+
+        scheduler.escalate = escalate
+        now = scheduler.wheel.current_tick
+        scheduler.wheel.schedule(("a", 1), now + 2, "Low")
+        scheduler.wheel.schedule(("a", 2), now + 6, "Low")
+        task = asyncio.create_task(scheduler._run())
+        await asyncio.sleep(0.3)
+        escalated_while_stalled = list(escalated)
+        # The stalled batch timed out and its ticket was re-armed for a retry
+        retried = ("a", 1) in scheduler.wheel
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return escalated_while_stalled, retried
+
+    escalated, retried = asyncio.run(_run())
+    assert escalated == [("a", 2)]
+    assert retried
@@ -0,0 +1,225 @@
+"""
+Tests for outbound webhooks, against a local HTTP/1.1 stand-in receiver.
+Run from project root: python -m pytest tests/test_webhooks.py
+"""
+import sys
+from pathlib import Path
+
+# Ensure project root is in path (for running directly with python)
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import asyncio
+import json
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.core import webhooks
+from app.core.database import Base
+from app.core.webhooks import (
+    CircuitBreaker,
+    Subscriber,
+    UnsafeWebhookURL,
+    WebhookDispatcher,
+    WebhookEvent,
+    backoff_delay,
+    check_webhook_url,
+    verify_signature,
+)
+from app.models import WebhookDelivery, WebhookSubscription
+
+SECRET = "test-secret-0123456789"
+
+
+class _Receiver:
+    """Minimal keep-alive HTTP server that records requests and replies with scripted statuses."""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.requests = []
+        self.connections = 0
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/crm"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests.append((headers, body))
+                status = self.statuses.pop(0) if self.statuses else 200
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Length: 0\r\n\r\n".encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+async def _log_db(active=True):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add(WebhookSubscription(id=1, firm_id="alpha", url="http://crm", secret=SECRET, event_types="ticket.created", is_active=active))
+        await db.commit()
+    return session_factory
+
+
+def _event(n: int) -> WebhookEvent:
+    return WebhookEvent(id=f"evt-{n}", type="ticket.created", created_at="2026-01-01T00:00:00+00:00", data={"ticket_id": n})
+
+
+async def _deliver(receiver, batch_size, events, active=True, **dispatcher_kwargs):
+    url = await receiver.start()
+    session_factory = await _log_db(active)
+    dispatcher_kwargs.setdefault("allow_private_urls", True)
+    dispatcher = WebhookDispatcher(
+        lambda firm_id: session_factory(info={"firm_id": firm_id}),
+        batch_window=0.2,
+        backoff=lambda attempt: 0,
+        **dispatcher_kwargs
+    )
+    dispatcher.add(Subscriber(1, "alpha", url, SECRET, frozenset({"ticket.created"}), batch_size))
+    for event in events:
+        dispatcher.publish("alpha", event)
+    dispatcher.publish("beta", _event(99))   # other firm: never delivered to alpha's CRM
+    await dispatcher.close(drain_timeout=5)
+    await receiver.stop()
+    async with session_factory() as db:
+        log = (await db.execute(select(WebhookDelivery).order_by(WebhookDelivery.id))).scalars().all()
+    return log
+
+
+def test_batched_signed_delivery_over_one_connection():
+    receiver = _Receiver()
+    log = asyncio.run(_deliver(receiver, batch_size=10, events=[_event(n) for n in range(5)]))
+
+    assert len(receiver.requests) == 1
+    headers, body = receiver.requests[0]
+    assert verify_signature(SECRET, headers["x-webhook-signature"], body)
+    assert not verify_signature("wrong-secret", headers["x-webhook-signature"], body)
+    assert [e["data"]["ticket_id"] for e in json.loads(body)["events"]] == [0, 1, 2, 3, 4]
+    assert [(row.attempt, row.succeeded, row.event_count) for row in log] == [(1, True, 5)]
+
+
+def test_retries_until_success_and_logs_every_attempt():
+    receiver = _Receiver(statuses=[503, 503])
+    log = asyncio.run(_deliver(receiver, batch_size=1, events=[_event(1)]))
+
+    assert len(receiver.requests) == 3
+    assert receiver.connections == 1   # pooled keep-alive connection reused across retries
+    assert [(row.attempt, row.status_code) for row in log] == [(1, 503), (2, 503), (3, 200)]
+    assert len({row.delivery_id for row in log}) == 1
+    assert json.loads(receiver.requests[-1][1])["id"] == "evt-1"
+
+
+def test_client_errors_are_not_retried():
+    receiver = _Receiver(statuses=[400])
+    log = asyncio.run(_deliver(receiver, batch_size=1, events=[_event(1)]))
+    assert len(receiver.requests) == 1
+    assert [(row.succeeded, row.status_code) for row in log] == [(False, 400)]
+
+
+def test_private_targets_are_blocked_at_delivery_time():
+    receiver = _Receiver()
+    log = asyncio.run(_deliver(receiver, batch_size=1, events=[_event(1)], allow_private_urls=False))
+    assert receiver.requests == []
+    assert [(row.succeeded, row.error.split(":")[0]) for row in log] == [(False, "Blocked")]
+
+
+def test_deleted_subscription_is_not_delivered_to():
+    # Deleted through another worker: this dispatcher still holds the subscriber
+    receiver = _Receiver()
+    log = asyncio.run(_deliver(receiver, batch_size=1, events=[_event(1)], active=False))
+    assert receiver.requests == [] and log == []
+
+
+def test_delivery_dials_the_checked_address_not_a_rebound_one(monkeypatch):
+    # First lookup (the check) is public; a second lookup would be rebound to the metadata service
+    answers = [["93.184.216.34"], ["169.254.169.254"]]
+
+    async def _resolve(host, port):
+        return answers.pop(0)
+
+    sent = []
+
+    def _handler(request):
+        sent.append(request)
+        return httpx.Response(200)
+
+    monkeypatch.setattr(webhooks, "_resolve", _resolve)
+
+    async def _run():
+        session_factory = await _log_db()
+        dispatcher = WebhookDispatcher(
+            lambda firm_id: session_factory(info={"firm_id": firm_id}),
+            client=httpx.AsyncClient(transport=httpx.MockTransport(_handler)),
+            batch_window=0,
+            allow_private_urls=False
+        )
+        dispatcher.add(Subscriber(1, "alpha", "https://crm.example.com/hooks", SECRET, frozenset({"ticket.created"}), 1))
+        dispatcher.publish("alpha", _event(1))
+        await dispatcher.close(drain_timeout=5)
+
+    asyncio.run(_run())
+    [request] = sent
+    assert request.url.host == "93.184.216.34"
+    assert request.headers["host"] == "crm.example.com"
+    assert request.extensions["sni_hostname"] == "crm.example.com"
+    assert answers == [["169.254.169.254"]]   # the host was resolved once, by the check
+
+
+def test_check_webhook_url(monkeypatch):
+    addresses = {"crm.example.com": ["93.184.216.34"], "metadata.example.com": ["169.254.169.254"],
+                 "mapped.example.com": ["::ffff:10.0.0.1"]}
+
+    async def _resolve(host, port):
+        return addresses[host]
+
+    monkeypatch.setattr(webhooks, "_resolve", _resolve)
+
+    async def _check(url):
+        await check_webhook_url(url, allow_private=False)
+
+    asyncio.run(_check("https://crm.example.com/hooks"))
+    for url in ("http://crm.example.com/hooks", "https://metadata.example.com/", "https://mapped.example.com/"):
+        with pytest.raises(UnsafeWebhookURL):
+            asyncio.run(_check(url))
+
+
+def test_circuit_breaker_and_backoff():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.retry_after() == 30
+
+    now[0] = 30
+    assert breaker.state == "half_open"
+    breaker.record_failure()   # failed trial re-opens immediately
+    assert breaker.state == "open"
+    now[0] = 60
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+    assert backoff_delay(4, base=1, cap=300, rng=lambda: 1.0) == 8
+    assert backoff_delay(20, base=1, cap=300, rng=lambda: 1.0) == 300
+    assert backoff_delay(3, base=1, cap=300, rng=lambda: 0.0) == 0